@@ -0,0 +1,159 @@
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+""" pytest-benchmark suite for the bittensor_config hot paths, with peak memory recorded under tracemalloc.
+    Not collected by the test run, pass the file explicitly:
+
+    pytest benchmarks/bench_config.py
+
+    Recording a baseline, once per release on the reference machine, run from openconfig/:
+
+    pytest benchmarks/bench_config.py --benchmark-storage=benchmarks/baselines --benchmark-save=release
+
+    Checking for regressions against the latest baseline, failing on 25% slower means or 25% more peak memory:
+
+    pytest benchmarks/bench_config.py --benchmark-storage=benchmarks/baselines --benchmark-compare \\
+        --benchmark-compare-fail=mean:25% --memory-baseline=benchmarks/baselines/<machine>/<run>_release.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from copy import deepcopy
+from typing import Dict, Tuple
+
+import pytest
+import yaml
+
+pytest.importorskip( 'pytest_benchmark' )
+
+from bittensor_config import Config, config
+
+SIZES = ( 10, 100, 1000 )
+
+_parsers: Dict[Tuple[int, bool], argparse.ArgumentParser] = {}
+
+def make_parser( n_args: int, subparsers: bool ) -> argparse.ArgumentParser:
+    """ Parser with n_args options in sections of 10, half of them under two sub-commands if subparsers is set.
+    """
+    key = ( n_args, subparsers )
+    if key not in _parsers:
+        parser = argparse.ArgumentParser()
+        n_top = n_args // 2 if subparsers else n_args
+        for i in range( n_top ):
+            parser.add_argument( '--section{}.key{}'.format( i // 10, i ), type=int, default=i )
+        if subparsers:
+            commands = parser.add_subparsers( dest='command' )
+            for c in range( 2 ):
+                command = commands.add_parser( 'cmd{}'.format( c ) )
+                for i in range( ( n_args - n_top ) // 2 ):
+                    command.add_argument( '--cmd{}.key{}'.format( c, i ), default='value' )
+        _parsers[key] = parser
+    return _parsers[key]
+
+def make_config( n_leaves: int ) -> Config:
+    """ Config with n_leaves leaves in sections of 10, every other one set on the command line.
+    """
+    _config = Config()
+    for i in range( n_leaves ):
+        _config.set_path( 'section{}.key{}'.format( i // 10, i ), i if i % 2 else 'value{}'.format( i ) )
+    _config['__is_set'] = { 'section{}.key{}'.format( i // 10, i ): True for i in range( 0, n_leaves, 2 ) }
+    return _config
+
+@pytest.fixture( scope='module' )
+def config_file( tmp_path_factory ) -> str:
+    """ --config file overriding every other option of the largest parser.
+    """
+    path = tmp_path_factory.mktemp( 'bench' ) / 'config.yaml'
+    with open( path, 'w' ) as f:
+        yaml.dump( { 'section{}.key{}'.format( i // 10, i ): -i for i in range( 0, max( SIZES ), 2 ) }, f )
+    return os.path.relpath( path )
+
+@pytest.mark.parametrize( 'n_args', SIZES )
+@pytest.mark.parametrize( 'variant', [ 'plain', 'subparsers', 'yaml' ] )
+def test_config( measure, config_file, n_args, variant ):
+    parser = make_parser( n_args, subparsers = variant == 'subparsers' )
+    args = [ '--section0.key1', '1' ]
+    if variant == 'subparsers':
+        args += [ 'cmd0', '--cmd0.key0', 'other' ]
+    elif variant == 'yaml':
+        args += [ '--config', config_file ]
+    _config = measure( lambda: config( parser, args=args ) )
+    assert _config.section0.key1 == 1
+
+@pytest.mark.parametrize( 'n_leaves', SIZES )
+def test_deepcopy( measure, n_leaves ):
+    _config = make_config( n_leaves )
+    assert measure( deepcopy, _config ) == _config
+
+@pytest.mark.parametrize( 'n_leaves', SIZES )
+def test_merge( measure, n_leaves ):
+    target = make_config( n_leaves )
+    other = make_config( n_leaves )
+    other.set_path( 'section0.key0', 'merged' )
+    assert measure( Config._merge, target, other ).section0.key0 == 'merged'
+
+@pytest.mark.parametrize( 'n_leaves', SIZES )
+def test_str( measure, n_leaves ):
+    _config = make_config( n_leaves )
+    def uncached():
+        # A change invalidates the cached YAML.
+        _config['touched'] = True
+        return str( _config )
+    assert 'section0' in measure( uncached )
+
+@pytest.mark.parametrize( 'n_leaves', SIZES )
+def test_str_cached( measure, n_leaves ):
+    _config = make_config( n_leaves )
+    assert 'section0' in measure( str, _config )
+
+@pytest.mark.parametrize( 'n_leaves', SIZES )
+def test_is_set( measure, n_leaves ):
+    _config = make_config( n_leaves )
+    paths = [ 'section{}.key{}'.format( i // 10, i ) for i in range( n_leaves ) ]
+    def is_set_all():
+        return sum( _config.is_set( path ) for path in paths )
+    assert measure( is_set_all ) == ( n_leaves + 1 ) // 2
+
+@pytest.mark.parametrize( 'frozen', [ False, True ], ids=[ 'config', 'frozen' ] )
+def test_attribute_access( measure, frozen ):
+    _config = make_config( 1000 )
+    if frozen:
+        _config = _config.freeze()
+    def read_1000():
+        # 1000 reads of nested values, as request handlers do.
+        total = 0
+        for _ in range( 100 ):
+            total += _config.section0.key1 + _config.section50.key501 + _config.section99.key999 + _config.section10.key101 + _config.section5.key51
+            total += _config.section1.key11 + _config.section2.key21 + _config.section3.key31 + _config.section4.key41 + _config.section6.key61
+        return total
+    assert measure( read_1000 ) > 0
+
+def test_import_time():
+    """ A cold import of bittensor_config stays within the time of tests/import_budget.json, which the test
+        run only checks the imported modules against, as the time depends on the machine.
+    """
+    with open( os.path.join( os.path.dirname( __file__ ), os.pardir, 'tests', 'import_budget.json' ) ) as f:
+        budget = json.load( f )
+    env = dict( os.environ, PYTHONPATH=os.pathsep.join( sys.path ) )
+    # The first run may have to compile the modules, the second is what a new process pays.
+    for _ in range( 2 ):
+        result = subprocess.run( [ sys.executable, '-X', 'importtime', '-c', 'import bittensor_config' ], env=env, capture_output=True, text=True, check=True )
+    import_time = [ int( line.split('|')[1] ) for line in result.stderr.splitlines() if line.split('|')[-1].strip() == 'bittensor_config' ][0]
+    assert import_time <= budget['import_time_us'], import_time
@@ -0,0 +1,90 @@
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+""" Compares copy-on-write Config copies against deep copies on a 10k key config.
+
+    python benchmarks/bench_copy.py
+"""
+
+import argparse
+import timeit
+import tracemalloc
+from copy import deepcopy
+
+from bittensor_config import Config
+
+def make_config( n_groups: int = 100, n_keys: int = 100 ) -> Config:
+    """ Config with n_groups nested sections of n_keys leaves each, plus a wallet section.
+    """
+    _config = Config()
+    _config.wallet = Config()
+    _config.wallet.name = 'default'
+    _config.wallet.hotkey = 'default'
+    _config.wallet.path = '~/.bittensor/wallets/'
+    for g in range( n_groups ):
+        group = Config()
+        for k in range( n_keys ):
+            group[ 'key{}'.format( k ) ] = 'value{}'.format( k )
+        _config[ 'group{}'.format( g ) ] = group
+    return _config
+
+def previous_deepcopy( _config: Config ) -> Config:
+    """ What Config.__deepcopy__ did before: a new root over the same subtrees plus a copied is_set map.
+    """
+    config_copy = Config()
+    config_copy.__setstate__( _config.__getstate__() )
+    config_copy['__is_set'] = deepcopy( _config['__is_set'] )
+    return config_copy
+
+def wallet_copy( _config: Config, copy ) -> Config:
+    """ The copy bittensor_wallet.wallet() makes before overriding the wallet fields.
+    """
+    config_copy = copy( _config )
+    config_copy.wallet.name = 'other'
+    config_copy.wallet.hotkey = 'other'
+    config_copy.wallet.path = '/tmp/wallets'
+    return config_copy
+
+def measure( _config: Config, copy, number: int ):
+    """ Returns ( seconds per copy, bytes kept alive per copy ).
+    """
+    seconds = min( timeit.repeat( lambda: wallet_copy( _config, copy ), number=number, repeat=5 ) ) / number
+    tracemalloc.start()
+    copies = [ wallet_copy( _config, copy ) for _ in range( number ) ]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del copies
+    return seconds, size / number
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument( '--number', type=int, default=20 )
+    options = arg_parser.parse_args()
+
+    _config = make_config()
+    print( 'wallet copy of a {} key config'.format( sum( len( group ) for group in _config.values() ) ) )
+    for name, copy in (
+            ( 'deepcopy (previous)', previous_deepcopy ),
+            ( 'deepcopy', deepcopy ),
+            ( 'copy-on-write', Config.copy ),
+        ):
+        seconds, size = measure( _config, copy, options.number )
+        print( '  {:20} {:10.1f} us {:12.0f} bytes'.format( name, seconds * 1e6, size ) )
+    print( 'deepcopy (previous) shares every subtree with the source, its wallet writes leak into it.' )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+""" Compares attribute reads and memory of a Config against its frozen view.
+
+    python benchmarks/bench_frozen.py
+"""
+
+import argparse
+import timeit
+import tracemalloc
+
+from bittensor_config import Config
+
+def make_config( n_groups: int = 100, n_keys: int = 20 ) -> Config:
+    """ Config with n_groups nested sections of n_keys leaves each.
+    """
+    _config = Config()
+    _config.wallet = Config()
+    _config.wallet.name = 'default'
+    for g in range( n_groups ):
+        group = Config()
+        for k in range( n_keys ):
+            group[ 'key{}'.format( k ) ] = k
+        _config[ 'group{}'.format( g ) ] = group
+    return _config
+
+def allocated( build ) -> int:
+    """ Bytes still allocated by the object build returns.
+    """
+    tracemalloc.start()
+    obj = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return size
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument( '--number', type=int, default=1000000 )
+    options = arg_parser.parse_args()
+
+    _config = make_config()
+    frozen = _config.freeze()
+    assert frozen.wallet.name == _config.wallet.name
+
+    munch_read = min( timeit.repeat( 'c.wallet.name', globals={ 'c': _config }, number=options.number, repeat=5 ) )
+    frozen_read = min( timeit.repeat( 'c.wallet.name', globals={ 'c': frozen }, number=options.number, repeat=5 ) )
+    munch_miss = min( timeit.repeat( 'c.wallet.missing', globals={ 'c': _config }, number=options.number, repeat=5 ) )
+    frozen_miss = min( timeit.repeat( 'c.wallet.missing', globals={ 'c': frozen }, number=options.number, repeat=5 ) )
+
+    munch_bytes = allocated( make_config )
+    frozen_bytes = allocated( lambda: make_config().freeze() )
+    n_nodes = len( frozen ) - 1
+
+    print( 'config.wallet.name      munch {:7.1f} ns   frozen {:7.1f} ns   {:5.1f}x'.format(
+        munch_read / options.number * 1e9, frozen_read / options.number * 1e9, munch_read / frozen_read ) )
+    print( 'config.wallet.missing   munch {:7.1f} ns   frozen {:7.1f} ns   {:5.1f}x'.format(
+        munch_miss / options.number * 1e9, frozen_miss / options.number * 1e9, munch_miss / frozen_miss ) )
+    print( 'bytes per node          munch {:7.0f}      frozen {:7.0f}'.format( munch_bytes / n_nodes, frozen_bytes / n_nodes ) )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+""" Compares spawned workers building their config again from argv and the --config file
+    against rebuilding the one their parent handed over with Config.export_for_child().
+
+    python benchmarks/bench_handoff.py --workers 64
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+from bittensor_config import Config, config
+
+def make_parser( n_args: int ) -> argparse.ArgumentParser:
+    """ Parser with n_args arguments spread over sections of 10.
+    """
+    parser = argparse.ArgumentParser()
+    for i in range( n_args ):
+        parser.add_argument( '--section{}.key{}'.format( i // 10, i ), type=int, default=i )
+    return parser
+
+def child( mode: str, n_args: int, args: list ):
+    """ Runs in the worker, prints the CPU time building the config took, wall time is mostly waiting for siblings.
+    """
+    start = time.process_time()
+    if mode == 'reparse':
+        _config = config( make_parser( n_args ), args=args )
+    else:
+        _config = Config.from_parent()
+    assert _config.section0.key0 == 1
+    print( time.process_time() - start )
+
+def spawn( mode: str, n_workers: int, n_args: int, args: list, env: dict, pass_fds = () ):
+    """ Starts n_workers workers at once, returns the wall time and their build times.
+    """
+    command = [ sys.executable, __file__, '--child', mode, '--args', str( n_args ), '--' ] + args
+    start = time.perf_counter()
+    workers = [ subprocess.Popen( command, env=env, stdout=subprocess.PIPE, pass_fds=pass_fds ) for _ in range( n_workers ) ]
+    # config() reports the file it loads on stdout as well, the time is the last line.
+    build_times = [ float( worker.communicate()[0].split()[-1] ) for worker in workers ]
+    return time.perf_counter() - start, build_times
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument( '--workers', type=int, default=64 )
+    arg_parser.add_argument( '--args', type=int, default=500 )
+    arg_parser.add_argument( '--child' )
+    options, rest = arg_parser.parse_known_args()
+    rest = [ arg for arg in rest if arg != '--' ]
+    if options.child:
+        return child( options.child, options.args, rest )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join( directory, 'config.yaml' )
+        with open( path, 'w' ) as f:
+            yaml.dump( { 'section{}.key{}'.format( i // 10, i ): i + 1 for i in range( options.args ) }, f )
+        args = [ '--config', os.path.relpath( path ) ]
+        _config = config( make_parser( options.args ), args=args )
+
+        print( 'spawning {} workers, {} arguments'.format( options.workers, options.args ) )
+        for name, fd in ( ( 'reparse', None ), ( 'handoff', False ), ( 'handoff fd', True ) ):
+            env = dict( os.environ )
+            pass_fds = ()
+            if fd != None:
+                handoff = _config.export_for_child( fd=fd, environ=env )
+                if fd:
+                    pass_fds = ( int( handoff.split( ':' )[1] ), )
+            wall, build_times = spawn( name.split()[0], options.workers, options.args, args, env, pass_fds )
+            build_times.sort()
+            print( '  {:12} build cpu median {:8.3f} ms  max {:8.3f} ms  wall {:8.3f} s'.format(
+                name, build_times[ len( build_times ) // 2 ] * 1e3, build_times[-1] * 1e3, wall ) )
+
+if __name__ == "__main__":
+    main()
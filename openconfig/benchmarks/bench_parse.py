@@ -0,0 +1,89 @@
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+""" Compares bittensor_config.config against the previous parse / deepcopy / re-parse implementation.
+
+    python benchmarks/bench_parse.py
+"""
+
+import argparse
+import timeit
+from copy import deepcopy
+
+from bittensor_config import config, Config
+
+def make_parser( n_args: int = 500, n_commands: int = 4 ) -> argparse.ArgumentParser:
+    """ Parser with n_args options, half at the top level and the rest spread over n_commands sub-commands.
+    """
+    parser = argparse.ArgumentParser()
+    n_top = n_args // 2
+    for i in range( n_top ):
+        parser.add_argument( '--neuron.group{}.arg{}'.format( i % 10, i ), type=int, default=i )
+    subparsers = parser.add_subparsers( dest='command' )
+    per_command = ( n_args - n_top ) // n_commands
+    for c in range( n_commands ):
+        command_parser = subparsers.add_parser( 'cmd{}'.format( c ) )
+        for i in range( per_command ):
+            command_parser.add_argument( '--cmd{}.arg{}'.format( c, i ), default='value' )
+    return parser
+
+def legacy_config( parser: argparse.ArgumentParser, args ) -> Config:
+    """ The is_set bookkeeping config() did before single pass parsing, kept here as the reference point.
+    """
+    for flag, kwargs in ( ( '--config', dict( type=str ) ), ( '--strict', dict( action='store_true', default=False ) ) ):
+        try:
+            parser.add_argument( flag, **kwargs )
+        except argparse.ArgumentError:
+            pass
+    parser.parse_known_args( args )
+    parser.parse_known_args( args )
+    params = parser.parse_known_args( args )[0]
+    _config = Config()
+    config.__split_params__( params=params, _config=_config )
+    parser_no_defaults = deepcopy( parser )
+    default_params = parser.parse_args( args=[_config.get('command')] if _config.get('command') != None else [] )
+    defaults_as_suppress = { key: argparse.SUPPRESS for key in default_params.__dict__ }
+    parser_no_defaults.set_defaults( **defaults_as_suppress )
+    parser_no_defaults._defaults.clear()
+    for action in parser_no_defaults._subparsers._actions:
+        if isinstance( action, argparse._SubParsersAction ):
+            for cmd_parser in action.choices.values():
+                cmd_parser.set_defaults( **defaults_as_suppress )
+                cmd_parser._defaults.clear()
+    params_no_defaults = parser_no_defaults.parse_known_args( args )[0]
+    _config['__is_set'] = { key: True for key, value in params_no_defaults.__dict__.items() if value != argparse.SUPPRESS }
+    return _config
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument( '--n_args', type=int, default=500 )
+    arg_parser.add_argument( '--repeat', type=int, default=20 )
+    options = arg_parser.parse_args()
+
+    parser = make_parser( options.n_args )
+    args = [ '--neuron.group1.arg1', '11', 'cmd2', '--cmd2.arg3', 'set' ]
+    assert legacy_config( parser, args )['__is_set'] == config( parser, args=args )['__is_set']
+
+    legacy = min( timeit.repeat( lambda: legacy_config( parser, args ), number=1, repeat=options.repeat ) )
+    single = min( timeit.repeat( lambda: config( parser, args=args ), number=1, repeat=options.repeat ) )
+    print( '{} arguments with sub-commands'.format( options.n_args ) )
+    print( '  parse + deepcopy + re-parse: {:8.2f} ms'.format( legacy * 1e3 ) )
+    print( '  single pass:                 {:8.2f} ms'.format( single * 1e3 ) )
+    print( '  speedup:                     {:8.1f}x'.format( legacy / single ) )
+
+if __name__ == "__main__":
+    main()
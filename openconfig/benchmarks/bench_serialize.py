@@ -0,0 +1,81 @@
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+""" Compares the cached and binary Config serializations against the previous toDict() + yaml.dump path.
+
+    python benchmarks/bench_serialize.py
+"""
+
+import argparse
+import timeit
+
+import yaml
+
+from bittensor_config import Config
+
+def make_config( n_groups: int = 100, n_keys: int = 100 ) -> Config:
+    """ Config with n_groups nested sections of n_keys leaves each.
+    """
+    _config = Config()
+    for g in range( n_groups ):
+        group = Config()
+        for k in range( n_keys ):
+            group[ 'key{}'.format( k ) ] = k if k % 2 else 'value{}'.format( k )
+        _config[ 'group{}'.format( g ) ] = group
+    return _config
+
+def previous_str( _config: Config ) -> str:
+    """ What Config.__str__ did on every call before caching.
+    """
+    config_dict = _config.toDict()
+    config_dict.pop( '__is_set' )
+    return "\n" + yaml.dump( config_dict )
+
+def uncached( serialize ):
+    """ Runs serialize on a config whose cache was just invalidated.
+    """
+    def run( _config: Config ):
+        _config['__touch'] = None
+        return serialize( _config )
+    return run
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument( '--repeat', type=int, default=5 )
+    options = arg_parser.parse_args()
+
+    _config = make_config()
+    n_keys = len( _config.to_flat_dict() )
+    data = _config.to_bytes()
+    assert Config.from_bytes( data ).to_flat_dict() == _config.to_flat_dict()
+
+    print( 'serializing a {} key config'.format( n_keys ) )
+    for name, serialize in (
+            ( 'toDict + yaml.dump (previous)', previous_str ),
+            ( '__str__', uncached( str ) ),
+            ( '__str__ cached', str ),
+            ( 'to_json', uncached( Config.to_json ) ),
+            ( 'to_bytes', uncached( Config.to_bytes ) ),
+            ( 'from_bytes', lambda _: Config.from_bytes( data ) ),
+        ):
+        seconds = min( timeit.repeat( lambda: serialize( _config ), number=1, repeat=options.repeat ) )
+        print( '  {:30} {:10.3f} ms'.format( name, seconds * 1e3 ) )
+    print( '  {:30} {:10d} bytes'.format( 'YAML size', len( str( _config ) ) ) )
+    print( '  {:30} {:10d} bytes'.format( 'to_bytes size', len( data ) ) )
+
+if __name__ == "__main__":
+    main()
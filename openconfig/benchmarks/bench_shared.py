@@ -0,0 +1,112 @@
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+""" Reader threads reading a config while a writer thread keeps updating it, comparing a global lock
+    around every read of a Config against SharedConfig snapshots.
+
+    python benchmarks/bench_shared.py --readers 32
+"""
+
+import argparse
+import threading
+import time
+
+from bittensor_config import Config, SharedConfig
+
+def make_config( n_groups: int = 20, n_keys: int = 50 ) -> Config:
+    """ Config with n_groups nested sections of n_keys leaves each.
+    """
+    _config = Config()
+    for g in range( n_groups ):
+        group = Config()
+        for k in range( n_keys ):
+            group[ 'key{}'.format( k ) ] = k
+        _config[ 'group{}'.format( g ) ] = group
+    return _config
+
+def run( n_readers: int, seconds: float, read, write ):
+    """ Runs n_readers threads calling read() and one calling write() every millisecond for seconds, returns the counts.
+    """
+    reads = [ 0 ] * n_readers
+    writes = [ 0 ]
+    start = threading.Barrier( n_readers + 1 )
+    deadline = [ 0.0 ]
+
+    def reader( i: int ):
+        if start.wait() == 0:
+            deadline[0] = time.perf_counter() + seconds
+        n = 0
+        # Every thread watches the clock itself, stopping does not depend on one thread being scheduled.
+        while not deadline[0] or time.perf_counter() < deadline[0]:
+            read()
+            n += 1
+        reads[i] = n
+
+    def writer():
+        if start.wait() == 0:
+            deadline[0] = time.perf_counter() + seconds
+        value = 0
+        while not deadline[0] or time.perf_counter() < deadline[0]:
+            value += 1
+            write( value )
+            writes[0] += 1
+            time.sleep( 0.001 )
+
+    threads = [ threading.Thread( target=reader, args=( i, ) ) for i in range( n_readers ) ] + [ threading.Thread( target=writer ) ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum( reads ), writes[0]
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument( '--readers', type=int, default=32 )
+    arg_parser.add_argument( '--seconds', type=float, default=3.0 )
+    options = arg_parser.parse_args()
+
+    _config = make_config()
+    lock = threading.Lock()
+
+    def locked_read():
+        # A handler reading a few related values, consistent only because of the lock.
+        with lock:
+            return _config.group0.key0 + _config.group10.key1 + _config.group19.key49
+
+    def locked_write( value: int ):
+        with lock:
+            _config.group0.key0 = value
+            _config.group10.key1 = value
+
+    shared = SharedConfig( make_config() )
+
+    def snapshot_read():
+        snapshot = shared.snapshot()
+        return snapshot.group0.key0 + snapshot.group10.key1 + snapshot.group19.key49
+
+    def snapshot_write( value: int ):
+        with shared.write() as draft:
+            draft.group0.key0 = value
+            draft.group10.key1 = value
+
+    print( '{} reader threads, one writer updating every millisecond, {} s each'.format( options.readers, options.seconds ) )
+    for name, read, write in ( ( 'global lock', locked_read, locked_write ), ( 'SharedConfig', snapshot_read, snapshot_write ) ):
+        reads, writes = run( options.readers, options.seconds, read, write )
+        print( '  {:14} {:12,.0f} reads/s {:8,.0f} writes/s'.format( name, reads / options.seconds, writes / options.seconds ) )
+
+if __name__ == "__main__":
+    main()
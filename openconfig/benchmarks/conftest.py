@@ -0,0 +1,65 @@
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+""" Fixtures of the pytest-benchmark suite in bench_config.py, see its docstring. """
+
+import json
+import tracemalloc
+from typing import Any, Callable, Dict, Optional
+
+import pytest
+
+# Allowed growth of peak memory over the baseline before a benchmark fails.
+MEMORY_TOLERANCE = 0.25
+
+def pytest_addoption( parser ):
+    parser.addoption( '--memory-baseline', default=None, help='pytest-benchmark JSON whose recorded peak memory the run must stay within.' )
+
+_baselines: Dict[str, Dict[str, int]] = {}
+
+def _memory_baseline( path: Optional[str] ) -> Dict[str, int]:
+    """ Returns the peak memory recorded per benchmark in a pytest-benchmark JSON file.
+    """
+    if not path:
+        return {}
+    if path not in _baselines:
+        with open( path ) as f:
+            report = json.load( f )
+        _baselines[path] = {
+            bench['fullname']: bench['extra_info']['peak_memory'] for bench in report['benchmarks'] if 'peak_memory' in bench.get( 'extra_info', {} )
+        }
+    return _baselines[path]
+
+@pytest.fixture
+def measure( benchmark, request ) -> Callable[..., Any]:
+    """ Benchmarks a function, then records its peak memory under tracemalloc in the report's extra_info.
+        Fails if the peak grew more than MEMORY_TOLERANCE over the --memory-baseline.
+    """
+    def run( function: Callable[..., Any], *args: Any ) -> Any:
+        result = benchmark( function, *args )
+        tracemalloc.start()
+        try:
+            function( *args )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info['peak_memory'] = peak
+        baseline = _memory_baseline( request.config.getoption( '--memory-baseline', default=None ) ).get( request.node.nodeid )
+        if baseline != None and peak > baseline * ( 1 + MEMORY_TOLERANCE ):
+            pytest.fail( 'Peak memory {} bytes, baseline {} bytes'.format( peak, baseline ) )
+        return result
+    return run
@@ -19,14 +19,68 @@
 
 __version__ = "0.0.0"
 
+import importlib
 import os
 import sys
-import argparse
-from typing import List, Optional
-from copy import deepcopy
-
-import yaml
-from .config_impl import Config as Config, DefaultConfig as DefaultConfig
+from typing import TYPE_CHECKING, Any, List, Optional
+
+if TYPE_CHECKING:
+    import argparse
+    from .config_impl import Config as Config, DefaultConfig as DefaultConfig
+    from .frozen_impl import FrozenConfig as FrozenConfig
+    from .merge_impl import ChangeSet as ChangeSet, Patch as Patch
+    from .schema_impl import Schema as Schema, Field as Field, InvalidConfig as InvalidConfig
+    from .watcher_impl import ConfigWatcher as ConfigWatcher
+    from .shared_impl import SharedConfig as SharedConfig
+    from .registry_impl import Argument as Argument, ArgumentRegistry as ArgumentRegistry, registry as registry
+    from .sources_impl import environment as environment, refresh_environment as refresh_environment
+    from .deferred_impl import Deferred as Deferred
+    from .interpolation_impl import InterpolationError as InterpolationError
+    from .timing_impl import timing as timing, Timings as Timings, LoggingSink as LoggingSink, JsonLinesSink as JsonLinesSink
+    from . import config_impl, parser_impl, loader_impl, sources_impl
+
+# Public names and the module defining them. They are imported on first access (PEP 562), so importing the
+# package stays cheap for tools which never build a config, munch and yaml are only loaded when needed.
+_LAZY = {
+    'Config': 'config_impl',
+    'DefaultConfig': 'config_impl',
+    'FrozenConfig': 'frozen_impl',
+    'ChangeSet': 'merge_impl',
+    'Patch': 'merge_impl',
+    'Schema': 'schema_impl',
+    'Field': 'schema_impl',
+    'InvalidConfig': 'schema_impl',
+    'ConfigWatcher': 'watcher_impl',
+    'SharedConfig': 'shared_impl',
+    'Deferred': 'deferred_impl',
+    'InterpolationError': 'interpolation_impl',
+    'Argument': 'registry_impl',
+    'ArgumentRegistry': 'registry_impl',
+    'registry': 'registry_impl',
+    'environment': 'sources_impl',
+    'refresh_environment': 'sources_impl',
+    'timing': 'timing_impl',
+    'Timings': 'timing_impl',
+    'LoggingSink': 'timing_impl',
+    'JsonLinesSink': 'timing_impl',
+    'parser_impl': 'parser_impl',
+    'loader_impl': 'loader_impl',
+    'sources_impl': 'sources_impl',
+}
+
+__all__ = [ 'config', 'InvalidConfigFile' ] + list( _LAZY )
+
+def __getattr__( name: str ) -> Any:
+    module_name = _LAZY.get( name )
+    if module_name == None:
+        raise AttributeError( 'module {!r} has no attribute {!r}'.format( __name__, name ) )
+    module = importlib.import_module( '.' + module_name, __name__ )
+    value = module if name == module_name else getattr( module, name )
+    globals()[name] = value
+    return value
+
+def __dir__() -> List[str]:
+    return sorted( set( globals() ) | set( _LAZY ) )
 
 
 class InvalidConfigFile(Exception):
@@ -39,7 +93,7 @@ class config:
     Create and init the config class, which manages the config of different bittensor modules.
     """
 
-    def __new__( cls, parser: argparse.ArgumentParser = None, strict: bool = False, args: Optional[List[str]] = None ) -> config_impl.Config:
+    def __new__( cls, parser: 'argparse.ArgumentParser' = None, strict: bool = False, args: Optional[List[str]] = None, env_prefix: Optional[str] = None ) -> 'config_impl.Config':
         r""" Translates the passed parser into a nested Bittensor config.
         Args:
             parser (argparse.ArgumentParser):
@@ -48,124 +102,99 @@ class config:
                 If true, the command line arguments are strictly parsed.
             args (list of str):
                 Command line arguments.
+            env_prefix (str, optional):
+                If set, environment variables override the defaults and the --config file, the variable for
+                --wallet.name with env_prefix 'BT_' is BT_WALLET_NAME. The command line still takes precedence.
+                --config and --strict are only taken from the command line.
         Returns:
             config (config_impl.Config):
                 Nested config object created from parser arguments.
         """
+        from . import config_impl, loader_impl, parser_impl, sources_impl, timing_impl
         if parser == None:
             return config_impl.Config()
 
-        # Optionally add config specific arguments
-        try:
-            parser.add_argument('--config', type=str, help='If set, defaults are overridden by passed file.')
-        except:
-            # this can fail if the --config has already been added.
-            pass
-        try:
-            parser.add_argument('--strict',  action='store_true', help='''If flagged, config will check that only exact arguemnts have been set.''', default=False )
-        except:
-            # this can fail if the --config has already been added.
-            pass
+        # None unless timing is enabled, see timing_impl.
+        timer = timing_impl.start()
 
-        # Get args from argv if not passed in.
-        if args == None:
-            args = sys.argv[1:]
-
-        # 1.1 Optionally load defaults if the --config is set.
         try:
-            config_file_path = str(os.getcwd()) + '/' + vars(parser.parse_known_args(args)[0])['config']
-        except Exception as e:
-            config_file_path = None
-        
-        # Parse args not strict
-        config_params = cls.__parse_args__(args=args, parser=parser, strict=False)
-
-        # 2. Optionally check for --strict
-        ## strict=True when passed in OR when --strict is set
-        strict = config_params.strict or strict
-
-        if config_file_path != None:
-            config_file_path = os.path.expanduser(config_file_path)
-            try:
-                with open(config_file_path) as f:
-                    params_config = yaml.safe_load(f)
+            # Adds --config and --strict, built once per parser and reused by every call.
+            prepared = parser_impl.prepare( parser )
+            if timer != None:
+                timer.mark( 'prepare' )
+
+            # Get args from argv if not passed in.
+            if args == None:
+                args = sys.argv[1:]
+
+            # 1. Parse args once, recording which destinations are explicitly set on the command line.
+            params, unrecognized, explicit = parser_impl.parse_tracked( parser, args )
+            if timer != None:
+                timer.mark( 'parse' )
+
+            # 2. Optionally check for --strict
+            ## strict=True when passed in OR when --strict is set
+            strict = params.strict or strict
+            if strict and unrecognized:
+                parser.error( 'unrecognized arguments: {}'.format( ' '.join( unrecognized ) ) )
+
+            # 3. Optionally load defaults if the --config is set.
+            params_config = None
+            if getattr( params, 'config', None ) != None:
+                config_file_path = os.path.expanduser( str(os.getcwd()) + '/' + params.config )
+                try:
+                    params_config = loader_impl.load_config_file( config_file_path )
                     print('Loading config defaults from: {}'.format(config_file_path))
-                    parser.set_defaults(**params_config)
+                except Exception as e:
+                    print('Error in loading: {} using default parser settings'.format(e))
+                if timer != None:
+                    timer.mark( 'load_file' )
+
+            # 4. Resolve every destination through the defaults, the file, the environment and the command line.
+            convert = prepared.convert
+            try:
+                values, sources = sources_impl.resolve( params.__dict__, explicit, params_config, env_prefix, convert, parser_impl.INTERNAL_DESTS )
+            except ValueError as e:
+                parser.error( str( e ) )
             except Exception as e:
                 print('Error in loading: {} using default parser settings'.format(e))
-
-        # 2. Continue with loading in params.
-        params = cls.__parse_args__(args=args, parser=parser, strict=strict)
-
-        _config = config_impl.Config()
-
-        # Splits params and add to config
-        cls.__split_params__(params=params, _config=_config)
-
-        # Make the is_set map
-        _config['__is_set'] = {}
-
-        ## Reparse args using default of unset
-        parser_no_defaults = deepcopy(parser)
-        ## Get all args by name
-        default_params = parser.parse_args(
-                args=[_config.get('command')] # Only command as the arg, else no args
-                    if _config.get('command') != None
-                    else []
-        )
-        all_default_args = default_params.__dict__.keys() | []
-        ## Make a dict with keys as args and values as argparse.SUPPRESS
-        defaults_as_suppress = {
-            key: argparse.SUPPRESS for key in all_default_args
-        }
-        ## Set the defaults to argparse.SUPPRESS, should remove them from the namespace
-        parser_no_defaults.set_defaults(**defaults_as_suppress)
-        parser_no_defaults._defaults.clear() # Needed for quirk of argparse
-
-        ### Check for subparsers and do the same
-        if parser_no_defaults._subparsers != None:
-            for action in parser_no_defaults._subparsers._actions:
-                # Should only be the "command" subparser action
-                if isinstance(action, argparse._SubParsersAction):
-                    # Set the defaults to argparse.SUPPRESS, should remove them from the namespace
-                    # Each choice is the keyword for a command, we need to set the defaults for each of these
-                    ## Note: we also need to clear the _defaults dict for each, this is a quirk of argparse
-                    cmd_parser: argparse.ArgumentParser
-                    for cmd_parser in action.choices.values():
-                        cmd_parser.set_defaults(**defaults_as_suppress)
-                        cmd_parser._defaults.clear() # Needed for quirk of argparse
-                
-        ## Reparse the args, but this time with the defaults as argparse.SUPPRESS
-        params_no_defaults = cls.__parse_args__(args=args, parser=parser_no_defaults, strict=strict)
-
-        ## Diff the params and params_no_defaults to get the is_set map
-        _config['__is_set'] = {
-            arg_key: True 
-                for arg_key in [k for k, _ in filter(lambda kv: kv[1] != argparse.SUPPRESS, params_no_defaults.__dict__.items())]
-        }
-
-        return _config
+                values, sources = sources_impl.resolve( params.__dict__, explicit, None, env_prefix, convert, parser_impl.INTERNAL_DESTS )
+            params.__dict__.update( values )
+            if timer != None:
+                timer.mark( 'resolve' )
+
+            _config = config_impl.Config()
+
+            # Splits params and add to config
+            cls.__split_params__(params=params, _config=_config, layout=prepared.layout)
+            if timer != None:
+                timer.mark( 'split_params' )
+
+            # Make the is_set map
+            _config['__is_set'] = {
+                arg_key: True for arg_key in params.__dict__ if arg_key in explicit
+            }
+            # Where each value came from, see Config.source_of
+            _config['__sources'] = sources
+
+            if timer != None:
+                timer.mark( 'is_set' )
+            return _config
+        finally:
+            # Also when parser.error() exits, the phases timed so far are delivered.
+            if timer != None:
+                timer.finish()
     
     @staticmethod
-    def __split_params__(params: argparse.Namespace, _config: config_impl.Config):
+    def __split_params__(params: 'argparse.Namespace', _config: 'config_impl.Config', layout: Optional['config_impl.PathLayout'] = None):
         # Splits params on dot syntax i.e neuron.axon_port and adds to _config
-        for arg_key, arg_val in params.__dict__.items():
-            split_keys = arg_key.split('.')
-            head = _config
-            keys = split_keys
-            while len(keys) > 1:
-                if hasattr(head, keys[0]) and head[keys[0]] != None: # Needs to be Config
-                    head = getattr(head, keys[0])
-                    keys = keys[1:]
-                else:
-                    head[keys[0]] = config_impl.Config()
-                    head = head[keys[0]]
-                    keys = keys[1:]
-            if len(keys) == 1:
-                head[keys[0]] = arg_val
+        if layout != None:
+            layout.fill( _config, params.__dict__ )
+        else:
+            _config.set_paths( params.__dict__ )
 
     @staticmethod
-    def __parse_args__( args: List[str], parser: argparse.ArgumentParser = None, strict: bool = False) -> argparse.Namespace:
+    def __parse_args__( args: List[str], parser: 'argparse.ArgumentParser' = None, strict: bool = False) -> 'argparse.Namespace':
         """Parses the passed args use the passed parser.
         Args:
             args (List[str]):
@@ -20,10 +20,37 @@ Implementation of the config class, which manages the config of different bitten
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
-import yaml
+import importlib
+import itertools
+import json
+import marshal
+import pickle
+import sys
+import threading
+import weakref
 from munch import DefaultMunch
-from typing import Dict, Any, Optional, TypeVar, Type
-from copy import deepcopy
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar, Type
+from copy import copy, deepcopy
+
+from . import deferred_impl, fingerprint_impl, frozen_impl, handoff_impl, interpolation_impl, merge_impl, shared_impl
+
+
+# Bumped whenever the layout of Config.to_bytes() changes.
+_BYTES_VERSION = 3
+
+# Bookkeeping maps kept in the root of a config by config(), they are not config values.
+_HIDDEN_KEYS = ( '__is_set', '__sources' )
+
+def _has_entries( node: Any ) -> bool:
+    """ Returns True if node holds anything besides the is_set and source maps.
+    """
+    return any( key not in _HIDDEN_KEYS for key in node.keys() )
+
+# Marks a path with no leaf under it.
+_NOT_A_LEAF = object()
+
+# Hands out increasing versions, a config takes a new one whenever it or anything below it changes.
+_versions = itertools.count( 1 )
 
 class Config ( DefaultMunch ):
     """
@@ -46,29 +73,352 @@ class Config ( DefaultMunch ):
 
     def __deepcopy__(self, memo) -> 'Config':
         _default = self.__default__
-        
-        config_state = self.__getstate__()
-        config_copy = Config()
+
+        # Keeps subclasses such as DefaultConfig, without calling their __init__.
+        config_copy = self.__class__.__new__( self.__class__ )
         memo[id(self)] = config_copy
 
-        config_copy.__setstate__(config_state)
+        # Reads the shared state directly, a deep copy never needs a copy-on-write clone of its own.
+        for key, value in dict.items( self ):
+            value = deepcopy( value, memo )
+            dict.__setitem__( config_copy, key, value )
+            config_copy._adopt( value )
         config_copy.__default__ = _default
-    
-        config_copy['__is_set'] = deepcopy(self['__is_set'], memo)
-        
+        if self._deferred:
+            config_copy._mark_deferred()
+
         return config_copy
-        
+
+    def __copy__(self) -> 'Config':
+        # Shallow, sub-configs are shared with this config.
+        config_copy = self.__class__.__new__( self.__class__ )
+        object.__setattr__( config_copy, '__default__', self.__default__ )
+        self._cow_detach_all()
+        # Deferred values are not computed, each copy gets its own which computes from the copy.
+        for key, value in dict.items( self ):
+            if isinstance( value, deferred_impl.Deferred ):
+                value = copy( value )
+            dict.__setitem__( config_copy, key, value )
+            config_copy._adopt( value )
+        if self._deferred:
+            config_copy._mark_deferred()
+        return config_copy
+
+    def __reduce__(self):
+        # Pickles as the compact to_bytes() form, which is cached while the config is unchanged.
+        return ( _from_bytes, ( self.__class__, self.to_bytes() ) )
+
+    def export_for_child(self, fd: bool = False, environ: Optional[Dict[str, str]] = None) -> str:
+        r""" Hands the config to child processes, which rebuild it with from_parent() without parsing argv or YAML.
+            Small configs travel in the BT_CONFIG_HANDOFF environment variable itself, larger ones in a private
+            temporary file it names, removed when this process exits.
+            Args:
+                fd (bool):
+                    If True, the config is written to an unlinked file whose inheritable descriptor the variable names.
+                    Children must inherit it, through fork or subprocess' pass_fds.
+                environ (Dict[str, str], optional):
+                    Environment to set the variable in, defaults to os.environ.
+            Returns:
+                handoff (str):
+                    Value of the variable.
+        """
+        return handoff_impl.export( self.to_bytes(), fd = fd, environ = environ )
+
+    @classmethod
+    def from_parent(cls, environ: Optional[Dict[str, str]] = None) -> Optional['Config']:
+        r""" Rebuilds the config a parent process handed over with export_for_child().
+            Args:
+                environ (Dict[str, str], optional):
+                    Environment to read the BT_CONFIG_HANDOFF variable from, defaults to os.environ.
+            Returns:
+                config (Optional[Config]):
+                    The parent's config, None if it did not hand one over.
+        """
+        data = handoff_impl.load( environ = environ )
+        if data == None:
+            return None
+        return cls.from_bytes( data )
+
+    # Copy-on-write bookkeeping, see copy().
+    # Keys whose values are still shared with the config this one was copied from.
+    _cow_pending: Optional[Set[str]] = None
+    # Keys whose values are shared with copies of this config which have not cloned them yet.
+    _cow_sharers: Optional[Dict[str, List['weakref.ref[Config]']]] = None
+
+    def copy(self) -> 'Config':
+        """ Returns a copy-on-write copy of the config.
+            The copy shares every subtree with this config, a subtree is cloned (one level at a time)
+            the first time either config reaches into it, so writes through either config never show in the other.
+            Sub-configs fetched before copying are still shared, write through the root after copying.
+        """
+        return _cow_clone( self )
+
+    # True once a deferred value was stored in this config, see deferred_impl.Deferred.
+    _deferred: bool = False
+    # True while the config has copy-on-write bookkeeping or deferred values, the only flag plain reads and writes check.
+    _hooked: bool = False
+
+    def _mark_deferred(self):
+        object.__setattr__( self, '_deferred', True )
+        object.__setattr__( self, '_hooked', True )
+
+    def __getitem__(self, key: str) -> Any:
+        if not self._hooked:
+            try:
+                return dict.__getitem__( self, key )
+            except KeyError:
+                return self.__default__
+        self._cow_detach( key )
+        value = super().__getitem__( key )
+        if self._deferred and isinstance( value, deferred_impl.Deferred ):
+            return value.resolve( self )
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        # Overriding __iter__ also keeps dict(), {**config} and dict.update() off the C fast path
+        # which copies the shared values without __getitem__, they go through keys() and __getitem__ instead.
+        if self._hooked:
+            self._cow_detach_all()
+        return dict.__iter__( self )
+
+    def __setitem__(self, key: str, value: Any):
+        self._store( key, value )
+        self._touch()
+
+    def _store(self, key: str, value: Any):
+        """ Sets key like __setitem__, without giving the config a new version.
+        """
+        if self._hooked:
+            self._cow_forget( key )
+        old = dict.get( self, key )
+        if isinstance( old, Config ):
+            self._disown( old )
+        dict.__setitem__( self, key, value )
+        if isinstance( value, Config ):
+            self._adopt( value )
+        elif isinstance( value, deferred_impl.Deferred ):
+            self._mark_deferred()
+
+    def __delitem__(self, key: str):
+        if self._hooked:
+            self._cow_forget( key )
+        self._disown( dict.get( self, key ) )
+        super().__delitem__( key )
+        self._touch()
+
+    def items(self):
+        self._cow_detach_all()
+        if self._deferred:
+            return { key: self[key] for key in dict.keys( self ) }.items()
+        return super().items()
+
+    def values(self):
+        self._cow_detach_all()
+        if self._deferred:
+            return [ self[key] for key in dict.keys( self ) ]
+        return super().values()
+
+    def pop(self, key: str, *default: Any) -> Any:
+        if self._hooked:
+            self._cow_detach( key )
+            self._cow_forget( key )
+        if key not in self:
+            return super().pop( key, *default )
+        value = super().pop( key )
+        self._disown( value )
+        self._touch()
+        return value
+
+    def popitem(self):
+        self._cow_detach_all()
+        key, value = super().popitem()
+        self._cow_forget( key )
+        self._disown( value )
+        self._touch()
+        return key, value
+
+    def clear(self):
+        object.__setattr__( self, '_cow_pending', None )
+        object.__setattr__( self, '_cow_sharers', None )
+        object.__setattr__( self, '_hooked', self._deferred )
+        for value in dict.values( self ):
+            self._disown( value )
+        super().clear()
+        self._touch()
+
+    # Change tracking, every node knows the configs it is stored in so a change anywhere below
+    # a config gives it a new version. Caches built from a config are valid while its version is unchanged.
+    _version: int = 0
+    _parents: Optional[List['weakref.ref[Config]']] = None
+
+    def _touch(self):
+        """ Gives this config and every config above it a new version.
+        """
+        if not self._parents:
+            object.__setattr__( self, '_version', next( _versions ) )
+            return
+        _touch_all( [ self ] )
+
+    def _adopt(self, value: Any):
+        """ Registers this config as a parent of value, if value is a config.
+        """
+        if not isinstance( value, Config ):
+            return
+        parents = value._parents
+        if parents == None:
+            object.__setattr__( value, '_parents', [ weakref.ref( self ) ] )
+        elif not any( ref() is self for ref in parents ):
+            # Drop parents which are gone while we are here.
+            parents[:] = [ ref for ref in parents if ref() != None ]
+            parents.append( weakref.ref( self ) )
+
+    def _disown(self, value: Any):
+        """ Removes this config from the parents of value, which is no longer stored in it.
+        """
+        if isinstance( value, Config ) and value._parents:
+            value._parents[:] = [ ref for ref in value._parents if ref() is not self and ref() != None ]
+
+    def _cow_detach(self, key: str):
+        """ Makes sure the value under key is not shared with another config before it is handed out.
+        """
+        pending = self._cow_pending
+        if pending and key in pending:
+            # Shared with the config we were copied from, take our own clone.
+            pending.discard( key )
+            clone = _cow_clone( dict.__getitem__( self, key ) )
+            dict.__setitem__( self, key, clone )
+            self._adopt( clone )
+        sharers = self._cow_sharers
+        if sharers and key in sharers:
+            # Shared with copies of us, they clone the value while it is still unchanged.
+            value = dict.__getitem__( self, key )
+            for ref in sharers.pop( key ):
+                other = ref()
+                if other != None and other._cow_pending and key in other._cow_pending and dict.get( other, key ) is value:
+                    other._cow_detach( key )
+        self._cow_settle()
+
+    def _cow_detach_all(self):
+        """ Detaches every shared value, before the values are handed out in bulk.
+        """
+        if self._cow_pending:
+            for key in list( self._cow_pending ):
+                self._cow_detach( key )
+        if self._cow_sharers:
+            for key in list( self._cow_sharers ):
+                self._cow_detach( key )
+
+    def _cow_forget(self, key: str):
+        """ Stops tracking the value under key, which is about to be replaced or removed.
+        """
+        if self._cow_pending:
+            self._cow_pending.discard( key )
+        if self._cow_sharers:
+            self._cow_sharers.pop( key, None )
+        self._cow_settle()
+
+    def _cow_settle(self):
+        """ Takes the config back to plain dict reads and writes once nothing in it is shared any more.
+        """
+        if not self._cow_pending and not self._cow_sharers and not self._deferred:
+            object.__setattr__( self, '_hooked', False )
+
     def __repr__(self) -> str:
         return self.__str__()
 
     def __str__(self) -> str:
-        config_dict = self.toDict()
-        config_dict.pop("__is_set")
-        return "\n" + yaml.dump(config_dict)
+        return self._serialized( 'yaml', self._to_yaml )
+
+    def to_json(self) -> str:
+        r""" Returns the config as a JSON object, without the is_set map. Much faster than the YAML of __str__.
+            Values JSON has no type for are written as their str().
+            Returns:
+                json (str):
+                    JSON text of the config.
+        """
+        return self._serialized( 'json', self._to_json )
+
+    def to_bytes(self) -> bytes:
+        r""" Returns a compact binary form of the config, is_set map included, for passing it to other processes.
+            The bytes are marshal data, tied to the Python version, or pickle data if a value cannot be marshalled.
+            Returns:
+                data (bytes):
+                    The config, read back with from_bytes().
+        """
+        return self._serialized( 'bytes', self._to_bytes )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Config':
+        r""" Rebuilds a config from the output of to_bytes(). Like pickle, only load data from a trusted process.
+            Args:
+                data (bytes):
+                    Output of to_bytes().
+            Returns:
+                config (Config):
+                    Copy of the config the bytes were made from.
+            Raises:
+                ValueError:
+                    Raised if data was not made by to_bytes().
+        """
+        kind, payload = data[:1], data[1:]
+        if kind == b'm':
+            state = marshal.loads( payload )
+        elif kind == b'p':
+            state = pickle.loads( payload )
+        else:
+            raise ValueError( 'Not a serialized Config' )
+        if not isinstance( state, tuple ) or len( state ) != 6 or state[0] != _BYTES_VERSION:
+            raise ValueError( 'Unsupported serialized Config version' )
+        _, shape, values, is_set, sources, default = state
+        _config = _decode_shape( _new_config( cls, default ), shape, iter( values ) )
+        _config['__is_set'] = is_set
+        if sources != None:
+            _config['__sources'] = sources
+        return _config
+
+    # ( version, [ ( mutable leaf, copy of it ) ], format -> serialized config ), see _serialized().
+    _serial: Optional[Tuple[int, List[Tuple[Any, Any]], Dict[str, Any]]] = None
+
+    def _serialized(self, kind: str, serialize: Callable[[], Any]) -> Any:
+        """ Returns the config serialized by serialize, reusing the last result while the config is unchanged.
+            Lists and dicts changed in place do not change the version, they are compared against copies instead.
+        """
+        serial = self._serial
+        if serial == None or serial[0] != self._version or any( value != snapshot for value, snapshot in serial[1] ):
+            mutable = [ value for value in self._flat_index().values() if isinstance( value, ( dict, list, set, bytearray ) ) ]
+            for key in _HIDDEN_KEYS:
+                if isinstance( dict.get( self, key ), dict ):
+                    mutable.append( dict.get( self, key ) )
+            serial = ( self._version, [ ( value, deepcopy( value ) ) for value in mutable ], {} )
+            object.__setattr__( self, '_serial', serial )
+        if kind not in serial[2]:
+            serial[2][kind] = serialize()
+        return serial[2][kind]
+
+    def _to_yaml(self) -> str:
+        config_dict = { key: value for key, value in self.items() if key not in _HIDDEN_KEYS }
+        import yaml
+        return "\n" + yaml.dump( config_dict, Dumper = _dumper() )
+
+    def _to_json(self) -> str:
+        return json.dumps( _public_dict( self ), default = str )
+
+    def _to_bytes(self) -> bytes:
+        # The tree's shape with each key once, and its leaves in the order the shape visits them.
+        values = []
+        shape = _encode_shape( self, values )
+        is_set = dict.get( self, '__is_set' )
+        sources = dict.get( self, '__sources' )
+        state = ( _BYTES_VERSION, shape, values, dict( is_set or {} ), dict( sources ) if sources != None else None, self.__default__ )
+        try:
+            return b'm' + marshal.dumps( state )
+        except ValueError:
+            return b'p' + pickle.dumps( state, protocol = pickle.HIGHEST_PROTOCOL )
 
     def to_string(self, items) -> str:
         """ Get string from items
         """
+        import yaml
         return "\n" + yaml.dump(items.toDict())
 
     def update_with_kwargs( self, kwargs ):
@@ -92,19 +442,540 @@ class Config ( DefaultMunch ):
                 a[key] = b[key]
         return a
 
-    def merge(self, b):
-        """ Merge two configs
+    def merge(self, *others: Any) -> 'merge_impl.ChangeSet':
+        r""" Merges other configs into this one in place, later configs taking precedence.
+            Args:
+                others (Config or dict):
+                    Configs or nested dicts to merge, applied in one pass.
+            Returns:
+                changes (merge_impl.ChangeSet):
+                    Dotted paths of the leaves which were added, removed or changed.
+        """
+        return merge_impl.merge( self, others )
+
+    def diff(self, other: 'Config') -> 'merge_impl.Patch':
+        r""" Returns the patch which turns this config into other, see apply_patch().
+            Args:
+                other (Config):
+                    Config the patch leads to.
+            Returns:
+                patch (merge_impl.Patch):
+                    Leaf values which differ, keyed by dotted path, and the paths of the leaves to remove.
+        """
+        return merge_impl.diff( self, other )
+
+    def apply_patch(self, patch: 'merge_impl.Patch') -> 'merge_impl.ChangeSet':
+        r""" Applies a patch made by diff() in place, touching only the leaves it names.
+            Args:
+                patch (merge_impl.Patch):
+                    Patch to apply.
+            Returns:
+                changes (merge_impl.ChangeSet):
+                    Dotted paths of the leaves which were added, removed or changed.
+        """
+        return merge_impl.apply( self, patch.values, patch.removed )
+
+    # ( version, frozen view ), sub-configs which did not change since they were last frozen reuse their view.
+    _frozen: Optional[Tuple[int, 'frozen_impl.FrozenConfig']] = None
+
+    def freeze(self) -> 'frozen_impl.FrozenConfig':
+        """ Returns an immutable, slot backed view of the config for fast attribute reads.
+            Later changes to the config are not reflected in the view, freeze again to pick them up.
         """
-        self = self._merge( self, b )
+        return frozen_impl.freeze( self )
+
+    def share(self) -> 'shared_impl.SharedConfig':
+        """ Returns a SharedConfig for threads to read while others update it, starting from a copy of this config.
+        """
+        return shared_impl.SharedConfig( self )
+
+    # ( version, digest, mutable leaves and sub-configs holding some ), see fingerprint_impl.node_digest().
+    _fingerprint: Optional[Tuple[int, bytes, List[Tuple[Any, Any]]]] = None
+
+    def fingerprint(self) -> str:
+        r""" Returns a stable digest of the config's values, for keying caches of what was built from it.
+            Equal configs have equal fingerprints in any process, whatever the order their keys were set in.
+            Sub-configs keep their digest while unchanged, so after an update only the sub-configs on the path
+            from the change to the root are hashed again. Lists and dicts changed in place are noticed, they are
+            hashed again on every call.
+            Returns:
+                fingerprint (str):
+                    Hex digest, the is_set and source maps are left out.
+        """
+        return fingerprint_impl.node_digest( self ).hex()
+
+    def subtree_fingerprint(self, path: str) -> Optional[str]:
+        r""" Returns the fingerprint of the sub-config or value under a dotted path, see fingerprint().
+            Components depending on part of the config key their caches with it, changes elsewhere leave it as it is.
+            Args:
+                path (str):
+                    Dot separated keys, leading from this config to the sub-config or value.
+            Returns:
+                fingerprint (Optional[str]):
+                    Hex digest, None if nothing is stored under path.
+        """
+        node = self.get_path( path, _NOT_A_LEAF )
+        if node is _NOT_A_LEAF:
+            return None
+        if isinstance( node, Config ):
+            return fingerprint_impl.node_digest( node ).hex()
+        return fingerprint_impl.value_digest( node ).hex()
 
     def is_set(self, param_name: str) -> bool:
         """
         Returns a boolean indicating whether the parameter has been set or is still the default.
         """
-        if param_name not in self.get('__is_set'):
+        is_set = self.get('__is_set')
+        if is_set == None or param_name not in is_set:
             return False
+        return is_set[param_name]
+
+    def source_of(self, path: str) -> Optional[str]:
+        r""" Returns where the value of an argument came from when config() built this config.
+            Args:
+                path (str):
+                    Dotted destination of the argument, such as 'wallet.name'.
+            Returns:
+                source (Optional[str]):
+                    'default', 'file', 'env' or 'cli', None if the config was not built by config() or has no such argument.
+        """
+        sources = self.get('__sources')
+        if sources == None:
+            return None
+        return sources.get( path )
+
+    # ( version, dotted path -> leaf value ), see _flat_index().
+    _flat: Optional[Tuple[int, Dict[str, Any]]] = None
+
+    def _flat_index(self) -> Dict[str, Any]:
+        """ Returns the index from dotted path to leaf value, rebuilding it if the config changed since it was built.
+            Leaves are the values which are not configs, and empty sub-configs. is_set and source maps are left out.
+        """
+        flat = self._flat
+        if flat != None and flat[0] == self._version:
+            return flat[1]
+        index = {}
+        stack = [ ( '', self ) ]
+        while stack:
+            prefix, node = stack.pop()
+            # items() detaches copy-on-write values, the index hands them out.
+            for key, value in node.items():
+                if key in _HIDDEN_KEYS:
+                    continue
+                if isinstance( value, Config ) and _has_entries( value ):
+                    stack.append( ( prefix + key + '.', value ) )
+                else:
+                    index[prefix + key] = value
+        object.__setattr__( self, '_flat', ( self._version, index ) )
+        return index
+
+    def get_path(self, path: str, default: Any = None) -> Any:
+        r""" Returns the value under a dotted path such as 'neuron.axon.port'.
+            Args:
+                path (str):
+                    Dot separated keys, leading from this config to the value.
+                default (Any):
+                    Returned if nothing is stored under path.
+            Returns:
+                value (Any):
+                    The value under path, sub-configs are returned as they are.
+        """
+        index = self._flat_index()
+        if path in index:
+            return index[path]
+        # Not a leaf, walk down to the sub-config.
+        node = self
+        for key in path.split('.'):
+            if not isinstance( node, dict ) or key not in node:
+                return default
+            node = node[key]
+        return node
+
+    # Interpolation graph of the config, built by the first interpolate() call.
+    _interpolation: Optional['interpolation_impl.Interpolation'] = None
+
+    def interpolate(self, path: str, default: Any = None) -> Any:
+        r""" Returns the value under a dotted path with its ${dotted.path} references to other leaves replaced.
+            References are relative to this config, $${ is a literal ${. A value which is a single reference keeps
+            the type of the value it refers to, otherwise referred values are formatted with str().
+            Resolved values are cached, and only resolved again once a value they depend on is replaced.
+            Args:
+                path (str):
+                    Dot separated keys, leading from this config to the value.
+                default (Any):
+                    Returned if nothing is stored under path.
+            Returns:
+                value (Any):
+                    The resolved value under path, sub-configs are returned as they are, see interpolated().
+            Raises:
+                interpolation_impl.InterpolationError:
+                    Raised if a reference names a value which is not set, or references form a cycle.
+        """
+        value = self._interpolator().get( path, _NOT_A_LEAF )
+        if value is _NOT_A_LEAF:
+            return self.get_path( path, default )
+        return value
+
+    def interpolated(self) -> 'Config':
+        r""" Returns a copy of the config with every reference resolved, see interpolate().
+            Returns:
+                config (Config):
+                    Deep copy of the config holding the resolved values.
+            Raises:
+                interpolation_impl.InterpolationError:
+                    Raised if a reference names a value which is not set, or references form a cycle.
+        """
+        resolved = self._interpolator().resolved()
+        _config = deepcopy( self )
+        _config.set_paths( resolved )
+        return _config
+
+    def _interpolator(self) -> 'interpolation_impl.Interpolation':
+        interpolation = self._interpolation
+        if interpolation == None:
+            interpolation = interpolation_impl.Interpolation( self )
+            object.__setattr__( self, '_interpolation', interpolation )
+        return interpolation
+
+    def set_path(self, path: str, value: Any):
+        r""" Stores value under a dotted path such as 'neuron.axon.port', creating the sub-configs on the way.
+            Args:
+                path (str):
+                    Dot separated keys, leading from this config to the value.
+                value (Any):
+                    Value to store.
+        """
+        flat = self._flat
+        if flat != None and flat[0] != self._version:
+            flat = None
+        self.set_paths( { path: value } )
+        # Replacing a leaf with another leaf keeps the index valid, anything else rebuilds it on the next read.
+        if flat != None and path in flat[1] and not isinstance( value, ( Config, deferred_impl.Deferred ) ):
+            flat[1][path] = value
+            object.__setattr__( self, '_flat', ( self._version, flat[1] ) )
+
+    def set_paths(self, flat: Dict[str, Any]):
+        r""" Stores every value of a flat dict under its dotted path, in one pass over the keys.
+            Each sub-config on the way is looked up once, however many paths go through it.
+            Args:
+                flat (Dict[str, Any]):
+                    Values keyed by dotted path.
+        """
+        nodes = { '': self }
+        # Sub-configs written into, they take one new version together at the end rather than one per value.
+        changed = []
+        for path, value in flat.items():
+            prefix, _, key = path.rpartition('.')
+            node = nodes.get( prefix )
+            if node == None:
+                node = self._path_node( prefix, nodes )
+            if isinstance( node, Config ):
+                node._store( key, value )
+                if not changed or changed[-1] is not node:
+                    changed.append( node )
+            else:
+                node[key] = value
+            if path in nodes:
+                # A sub-config was replaced, forget it and everything looked up below it.
+                nodes = { '': self }
+        _touch_all( changed )
+
+    def _path_node(self, prefix: str, nodes: Dict[str, dict]) -> dict:
+        """ Returns the sub-config under prefix, creating it if missing. Sub-configs are remembered in nodes.
+            Plain dicts already on the path, as loaded from a config file, are written into as they are.
+        """
+        parent_prefix, _, key = prefix.rpartition('.')
+        parent = nodes.get( parent_prefix )
+        if parent == None:
+            parent = self._path_node( parent_prefix, nodes )
+        node = parent[key] if key in parent else None
+        if not isinstance( node, dict ):
+            node = parent[key] = Config()
+        nodes[prefix] = node
+        return node
+
+    def to_flat_dict(self) -> Dict[str, Any]:
+        r""" Returns the config as a flat dict of leaf values keyed by dotted path, the inverse of from_flat_dict.
+            Returns:
+                flat (Dict[str, Any]):
+                    Leaf values keyed by dotted path, is_set and source maps are left out.
+        """
+        return dict( self._flat_index() )
+
+    @classmethod
+    def from_flat_dict(cls, flat: Dict[str, Any], default: Optional[Any] = None) -> 'Config':
+        r""" Builds a config from a flat dict of values keyed by dotted path, the inverse of to_flat_dict.
+            Args:
+                flat (Dict[str, Any]):
+                    Values keyed by dotted path.
+                default (Optional[Any]):
+                    Default value of the new config.
+            Returns:
+                config (Config):
+                    Config holding every value of flat.
+        """
+        _config = cls( default = default )
+        _config.set_paths( flat )
+        return _config
+
+
+_Dumper: Optional[type] = None
+
+def _dumper() -> type:
+    """ Returns the YAML dumper for configs, yaml is only imported the first time a config is printed.
+    """
+    global _Dumper
+    if _Dumper == None:
+        import yaml
+        # libyaml's dumper is several times faster than the pure python one, it is missing when PyYAML was built without it.
+        base = getattr( yaml, 'CDumper', yaml.Dumper )
+        # Dumps configs as the plain mappings toDict() would turn them into, without making the copy.
+        dumper = type( '_Dumper', ( base, ), {} )
+        dumper.add_multi_representer( Config, yaml.representer.SafeRepresenter.represent_dict )
+        _Dumper = dumper
+    return _Dumper
+
+
+def _encode_shape( node: Config, values: List[Any] ) -> Dict[str, Any]:
+    """ Returns the shape of node, None for a leaf and the nested shape for a sub-config. Leaves go into values.
+    """
+    shape = {}
+    for key, value in node.items():
+        if key in _HIDDEN_KEYS:
+            continue
+        if type( key ) is str:
+            # Keys repeated across sub-configs are then written once, marshal refers back to them.
+            key = sys.intern( key )
+        if isinstance( value, Config ):
+            shape[key] = _encode_shape( value, values )
+            if type( value ) is not Config or value.__default__ != None:
+                shape[key] = ( _class_path( type( value ) ), value.__default__, shape[key] )
+        else:
+            shape[key] = None
+            values.append( value )
+    return shape
+
+def _decode_shape( node: Config, shape: Dict[str, Any], values: Iterator[Any] ) -> Config:
+    """ Fills the new config node following shape, taking the leaves from values.
+    """
+    for key, child_shape in shape.items():
+        if child_shape == None:
+            dict.__setitem__( node, key, next( values ) )
         else:
-            return self.get('__is_set')[param_name]
+            if isinstance( child_shape, tuple ):
+                class_path, default, child_shape = child_shape
+                child = _new_config( _import_class( class_path ), default )
+            else:
+                child = Config()
+            child = _decode_shape( child, child_shape, values )
+            dict.__setitem__( node, key, child )
+            node._adopt( child )
+    return node
+
+
+class PathLayout:
+    """
+    Precompiled placement of a set of dotted paths, such as the destinations of a parser.
+    Filling a config through it sets each value straight into its sub-config, without splitting paths
+    or tracking changes value by value, which is what most of building a config from a parse costs.
+    Paths it was not compiled with, such as keys only a --config file has, are compiled the first time they are filled.
+    """
+    def __init__(self, paths: Iterable[str]):
+        r""" Compiles the layout.
+            Args:
+                paths (Iterable[str]):
+                    Dotted paths. Paths which are also the prefix of another path are left to set_paths().
+        """
+        paths = list( dict.fromkeys( paths ) )
+        prefixes = set()
+        for path in paths:
+            end = path.find( '.' )
+            while end != -1:
+                prefixes.add( path[:end] )
+                end = path.find( '.', end + 1 )
+        # Sub-configs as ( index of the parent, key ), root first, and path -> ( index of its sub-config, key ).
+        self.nodes: List[Tuple[int, str]] = [ ( -1, '' ) ]
+        self.slots: Dict[str, Tuple[int, str]] = {}
+        # Prefix -> index of its sub-config.
+        self._node_index = node_index = { '': 0 }
+        for path in paths:
+            if path in prefixes:
+                continue
+            prefix, _, key = path.rpartition('.')
+            self.slots[path] = ( self._node( prefix, node_index ), key )
+        # Layouts are shared by the threads parsing with the same parser.
+        self._lock = threading.Lock()
+
+    def _node( self, prefix: str, node_index: Dict[str, int] ) -> int:
+        index = node_index.get( prefix )
+        if index == None:
+            parent_prefix, _, key = prefix.rpartition('.')
+            parent = self._node( parent_prefix, node_index )
+            index = node_index[prefix] = len( self.nodes )
+            self.nodes.append( ( parent, key ) )
+        return index
+
+    def fill( self, _config: 'Config', values: Dict[str, Any] ):
+        r""" Stores every value under its dotted path, like _config.set_paths( values ).
+            Args:
+                _config (Config):
+                    Empty config to fill.
+                values (Dict[str, Any]):
+                    Values keyed by dotted path, paths the layout does not know are set with set_paths().
+        """
+        nodes: List[Optional[Config]] = [ None ] * len( self.nodes )
+        nodes[0] = _config
+        slots = self.slots
+        items = iter( values.items() )
+        for path, value in items:
+            slot = slots.get( path )
+            if slot == None:
+                slot = self._learn( path )
+            if slot == None:
+                # Keeps the order of values, the rest goes through the general path.
+                rest = { path: value }
+                rest.update( items )
+                _config.set_paths( rest )
+                break
+            index, key = slot
+            if index >= len( nodes ):
+                nodes.extend( [ None ] * ( len( self.nodes ) - len( nodes ) ) )
+            node = nodes[index]
+            if node == None:
+                node = self._create( index, nodes )
+            dict.__setitem__( node, key, value )
+            if isinstance( value, Config ):
+                node._adopt( value )
+            elif isinstance( value, deferred_impl.Deferred ):
+                node._mark_deferred()
+        _config._touch()
+
+    def _learn( self, path: str ) -> Optional[Tuple[int, str]]:
+        """ Compiles a path the layout does not know yet. Returns None for a path which is also the prefix
+            of a known path or goes through a known leaf, set_paths() places those.
+        """
+        with self._lock:
+            slot = self.slots.get( path )
+            if slot != None or path in self._node_index:
+                return slot
+            end = path.find( '.' )
+            while end != -1:
+                if path[:end] in self.slots:
+                    return None
+                end = path.find( '.', end + 1 )
+            prefix, _, key = path.rpartition('.')
+            slot = ( self._node( prefix, self._node_index ), key )
+            self.slots[path] = slot
+            return slot
+
+    def _create( self, index: int, nodes: List[Optional['Config']] ) -> 'Config':
+        parent_index, key = self.nodes[index]
+        parent = nodes[parent_index]
+        if parent == None:
+            parent = self._create( parent_index, nodes )
+        # What Config() makes, without tracking each step.
+        node = Config.__new__( Config )
+        object.__setattr__( node, '__default__', None )
+        dict.__setitem__( node, '__is_set', {} )
+        dict.__setitem__( parent, key, node )
+        parent._adopt( node )
+        nodes[index] = node
+        return node
+
+
+def _new_config( cls: Type['Config'], default: Any ) -> 'Config':
+    """ Returns an empty config of class cls without running a subclass __init__, which may fill in values.
+    """
+    _config = cls.__new__( cls )
+    Config.__init__( _config, default = default )
+    return _config
+
+def _class_path( cls: type ) -> str:
+    return cls.__module__ + ':' + cls.__qualname__
+
+def _import_class( class_path: str ) -> Type['Config']:
+    """ Returns the config class named by _class_path().
+    """
+    module_name, _, qualname = class_path.partition( ':' )
+    cls = importlib.import_module( module_name )
+    for name in qualname.split( '.' ):
+        cls = getattr( cls, name )
+    if not isinstance( cls, type ) or not issubclass( cls, Config ):
+        raise ValueError( '{} is not a Config class'.format( class_path ) )
+    return cls
+
+def _from_bytes( cls: Type['Config'], data: bytes ) -> 'Config':
+    """ Unpickles a config reduced by Config.__reduce__.
+    """
+    return cls.from_bytes( data )
+
+
+def _touch_all( nodes: List['Config'] ):
+    """ Gives the configs and every config above them one new version, each config is visited once.
+    """
+    version = next( _versions )
+    stack = list( nodes )
+    while stack:
+        node = stack.pop()
+        if node._version == version:
+            continue
+        object.__setattr__( node, '_version', version )
+        if node._parents:
+            for ref in node._parents:
+                parent = ref()
+                if parent != None:
+                    stack.append( parent )
+
+
+def _public_dict( node: 'Config' ) -> Dict[str, Any]:
+    """ Returns the config as nested dicts without the hidden bookkeeping maps, at every level.
+        Only configs are rebuilt, the C JSON encoder walks other values as they are.
+    """
+    return { key: _public_dict( value ) if isinstance( value, Config ) else value for key, value in node.items() if key not in _HIDDEN_KEYS }
+
+
+def _cow_clone( value: Any ) -> Any:
+    """ Clones a shared value for copy-on-write. Configs are copied one level deep with their
+        children shared again, any other mutable value is deep copied.
+    """
+    if not isinstance( value, Config ):
+        return deepcopy( value ) if isinstance( value, ( dict, list, set ) ) else value
+
+    # Values still shared with our own source are cloned first, so sharing is only ever one hop.
+    if value._cow_pending:
+        for key in list( value._cow_pending ):
+            value._cow_detach( key )
+
+    clone = type( value ).__new__( type( value ) )
+    # Raw items, so deferred values are copied as they are and nothing is detached.
+    dict.update( clone, dict.items( value ) )
+    object.__setattr__( clone, '__default__', value.__default__ )
+    if value._deferred:
+        # Each clone gets its own deferred values, a value remembers what it was last computed from.
+        for key, child in dict.items( value ):
+            if isinstance( child, deferred_impl.Deferred ):
+                dict.__setitem__( clone, key, copy( child ) )
+        clone._mark_deferred()
+
+    pending = set()
+    ref = weakref.ref( clone )
+    sharers = value._cow_sharers
+    for key, child in dict.items( value ):
+        if isinstance( child, ( dict, list, set ) ):
+            pending.add( key )
+            if sharers == None:
+                sharers = {}
+                object.__setattr__( value, '_cow_sharers', sharers )
+            refs = sharers.setdefault( key, [] )
+            if len( refs ) >= 8:
+                # Drop copies which are gone or have cloned the value since.
+                refs[:] = [ r for r in refs if r() != None and key in ( r()._cow_pending or () ) ]
+            refs.append( ref )
+    if pending:
+        object.__setattr__( clone, '_cow_pending', pending )
+        object.__setattr__( clone, '_hooked', True )
+        object.__setattr__( value, '_hooked', True )
+    return clone
 
 
 T = TypeVar('T', bound='DefaultConfig')
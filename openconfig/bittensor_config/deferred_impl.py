@@ -0,0 +1,95 @@
+"""
+Config values computed on first read and remembered until a value they depend on changes.
+"""
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .config_impl import Config
+
+# Marks a dependency missing from the config.
+_MISSING = object()
+
+class Deferred:
+    """
+    A config value computed from the config holding it the first time it is read.
+
+    The result is remembered and handed out again until one of the values under its dependency paths is
+    replaced, then it is computed again on the next read. Reads through the config, attribute or item
+    access, get_path(), items(), serialization and freeze(), all see the computed value.
+    Replace dependencies rather than changing lists or dicts in place, in-place changes are not noticed.
+    """
+    __slots__ = ( 'compute', 'depends', '_keys', '_memo' )
+
+    def __init__(self, compute: Callable[['Config'], Any], depends: Iterable[str] = ()):
+        r""" Declares a deferred value.
+            Args:
+                compute (Callable[[Config], Any]):
+                    Called with the config holding the value, returns the value.
+                depends (Iterable[str]):
+                    Dotted paths of the values compute reads, relative to the config holding the value.
+                    Without any, the value is computed once.
+        """
+        self.compute = compute
+        self.depends: Tuple[str, ...] = tuple( depends )
+        self._keys = tuple( tuple( path.split('.') ) for path in self.depends )
+        # ( version of the config, dependency values, value ) of the last computation.
+        self._memo: Optional[Tuple[int, Tuple[Any, ...], Any]] = None
+
+    def __repr__(self) -> str:
+        return 'Deferred({}, depends={!r})'.format( getattr( self.compute, '__qualname__', self.compute ), list( self.depends ) )
+
+    def __copy__(self) -> 'Deferred':
+        return Deferred( self.compute, self.depends )
+
+    def __deepcopy__(self, memo) -> 'Deferred':
+        # Copies compute again for the config they are copied into.
+        return Deferred( self.compute, self.depends )
+
+    def resolve(self, _config: 'Config') -> Any:
+        r""" Returns the value, computing it if a dependency changed since it was last computed.
+            Args:
+                _config (Config):
+                    Config holding the value.
+            Returns:
+                value (Any):
+                    The value compute returned.
+        """
+        memo = self._memo
+        version = _config._version
+        if memo != None and memo[0] == version:
+            return memo[2]
+        inputs = tuple( _read( _config, keys ) for keys in self._keys )
+        if memo != None and len( inputs ) == len( memo[1] ) and all( a is b for a, b in zip( inputs, memo[1] ) ):
+            # Something else in the config changed.
+            self._memo = ( version, inputs, memo[2] )
+            return memo[2]
+        value = self.compute( _config )
+        self._memo = ( version, inputs, value )
+        return value
+
+
+def _read( node: Any, keys: Tuple[str, ...] ) -> Any:
+    """ Returns the value under keys, _MISSING if there is none.
+    """
+    for key in keys:
+        if not isinstance( node, dict ) or key not in node:
+            return _MISSING
+        node = node[key]
+    return node
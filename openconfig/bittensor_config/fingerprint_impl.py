@@ -0,0 +1,102 @@
+"""
+Stable digests of configs, kept per sub-config so a change only re-hashes the path from it to the root.
+"""
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import hashlib
+from typing import Any, List, Tuple
+
+from . import config_impl
+
+# Bytes per digest, 128 bits.
+DIGEST_SIZE = 16
+
+# Types whose repr() is the same in every process and tells them apart from other types.
+_PRIMITIVES = ( type( None ), bool, int, float, complex, str, bytes )
+
+def node_digest( node: 'config_impl.Config' ) -> bytes:
+    r""" Returns the digest of a config, Merkle style: a hash of its keys, its leaf values and the digests of its sub-configs.
+        Each config remembers its digest with the version it was computed at. A change gives new versions
+        to the changed config and those above it only, so only they are hashed again. Lists, dicts and other
+        objects can change in place without a new version, they are checked against what was hashed on every call.
+        Args:
+            node (config_impl.Config):
+                Config to digest. The is_set and source maps are left out.
+        Returns:
+            digest (bytes):
+                DIGEST_SIZE bytes, the same for equal configs in any process and whatever the key order.
+    """
+    cached = node._fingerprint
+    if cached != None and cached[0] == node._version and _unchanged( cached[2] ):
+        return cached[1]
+    version = node._version
+    entries = []
+    # ( leaf or sub-config, what was hashed of it ) for those which may change without a new version.
+    volatile = []
+    for key, value in node.items():
+        if key in config_impl._HIDDEN_KEYS:
+            continue
+        if isinstance( value, config_impl.Config ):
+            child = node_digest( value )
+            entries.append( ( repr( key ), 'config', child.hex() ) )
+            if value._fingerprint[2]:
+                volatile.append( ( value, child ) )
+        else:
+            canonical = repr( _canonical( value ) )
+            entries.append( ( repr( key ), 'value', canonical ) )
+            if not isinstance( value, _PRIMITIVES ):
+                volatile.append( ( value, canonical ) )
+    entries.sort()
+    digest = _hash( repr( entries ) )
+    object.__setattr__( node, '_fingerprint', ( version, digest, volatile ) )
+    return digest
+
+def _unchanged( volatile: List[Tuple[Any, Any]] ) -> bool:
+    """ Returns True if none of the mutable leaves below a config changed in place since its digest was computed.
+    """
+    for value, hashed in volatile:
+        if isinstance( value, config_impl.Config ):
+            if node_digest( value ) != hashed:
+                return False
+        elif repr( _canonical( value ) ) != hashed:
+            return False
+    return True
+
+def value_digest( value: Any ) -> bytes:
+    """ Returns the digest of a leaf value.
+    """
+    return _hash( repr( _canonical( value ) ) )
+
+def _hash( text: str ) -> bytes:
+    return hashlib.blake2b( text.encode( 'utf-8', 'surrogatepass' ), digest_size = DIGEST_SIZE ).digest()
+
+def _canonical( value: Any ) -> Any:
+    """ Returns value as nested tuples of primitives whose repr() is stable, dicts and sets in sorted order.
+        Other objects are represented by their type and repr().
+    """
+    if isinstance( value, _PRIMITIVES ):
+        return value
+    if isinstance( value, config_impl.Config ):
+        return ( 'config', node_digest( value ).hex() )
+    if isinstance( value, dict ):
+        return ( 'dict', tuple( sorted( ( ( _canonical( k ), _canonical( v ) ) for k, v in value.items() ), key = repr ) ) )
+    if isinstance( value, ( list, tuple ) ):
+        return ( type( value ).__name__, tuple( _canonical( item ) for item in value ) )
+    if isinstance( value, ( set, frozenset ) ):
+        return ( 'set', tuple( sorted( ( _canonical( item ) for item in value ), key = repr ) ) )
+    return ( type( value ).__module__ + '.' + type( value ).__qualname__, repr( value ) )
@@ -0,0 +1,197 @@
+"""
+Immutable, slot backed views of a Config compiled from its shape.
+"""
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+from typing import Any, Dict, FrozenSet, Iterator, Optional, Tuple
+
+from . import config_impl, deferred_impl
+
+class FrozenConfig:
+    """
+    Immutable view of a Config. Each distinct set of keys compiles to its own subclass with one slot per key,
+    so attribute reads are plain slot lookups and nodes carry no per-instance dict.
+    Keys which cannot be slots (private, non identifier or shadowing a method) are kept in a side dict.
+    Leaf values are shared with the Config the view was frozen from, not copied.
+    """
+    __slots__ = ( '__default__', '_extra' )
+
+    # Set on the compiled subclasses.
+    _keys: Tuple[str, ...] = ()
+    _key_set: FrozenSet[str] = frozenset()
+    _fields: FrozenSet[str] = frozenset()
+
+    def __getattr__(self, key: str) -> Any:
+        # Only reached for keys which are not slots.
+        if key[:2] == '__' and key[-2:] == '__':
+            raise AttributeError( key )
+        extra = object.__getattribute__( self, '_extra' )
+        if extra != None and key in extra:
+            return extra[key]
+        return object.__getattribute__( self, '__default__' )
+
+    def __setattr__(self, key: str, value: Any):
+        raise AttributeError( 'FrozenConfig is immutable, thaw() it to make changes' )
+
+    def __delattr__(self, key: str):
+        raise AttributeError( 'FrozenConfig is immutable, thaw() it to make changes' )
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._fields:
+            return object.__getattribute__( self, key )
+        return self.__getattr__( key )
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._key_set
+
+    def __iter__(self) -> Iterator[str]:
+        return iter( self._keys )
+
+    def __len__(self) -> int:
+        return len( self._keys )
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance( other, FrozenConfig ):
+            return self._keys == other._keys and all( self[key] == other[key] for key in self._keys )
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return ( freeze, ( self.thaw(), ) )
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __str__(self) -> str:
+        return self.thaw().__str__()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """ Returns the value under key, or default if the key is not present.
+        """
+        if key not in self._key_set:
+            return default
+        return self[key]
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._keys
+
+    def values(self) -> Tuple[Any, ...]:
+        return tuple( self[key] for key in self._keys )
+
+    def items(self) -> Tuple[Tuple[str, Any], ...]:
+        return tuple( ( key, self[key] ) for key in self._keys )
+
+    def is_set(self, param_name: str) -> bool:
+        """
+        Returns a boolean indicating whether the parameter has been set or is still the default.
+        """
+        is_set = self.get('__is_set')
+        if is_set == None or param_name not in is_set:
+            return False
+        return is_set[param_name]
+
+    def source_of(self, path: str) -> Optional[str]:
+        """ Returns where the value of an argument came from, see Config.source_of.
+        """
+        sources = self.get('__sources')
+        if sources == None:
+            return None
+        return sources.get( path )
+
+    def toDict(self) -> Dict[str, Any]:
+        """ Recursively converts the view into nested dictionaries.
+        """
+        return self.thaw().toDict()
+
+    def thaw(self) -> 'config_impl.Config':
+        """ Returns a new mutable Config with the contents of this view.
+        """
+        _config = config_impl.Config( default = self.__default__ )
+        for key in self._keys:
+            value = self[key]
+            if isinstance( value, FrozenConfig ):
+                value = value.thaw()
+            elif key in config_impl._HIDDEN_KEYS:
+                value = dict( value )
+            _config[key] = value
+        return _config
+
+
+_classes: Dict[Tuple[str, ...], type] = {}
+
+def _compile( keys: Tuple[str, ...] ) -> type:
+    """ Returns the FrozenConfig subclass for nodes with exactly these keys, in this order.
+    """
+    frozen_class = _classes.get( keys )
+    if frozen_class == None:
+        fields = tuple(
+            key for key in keys
+                if key.isidentifier() and not key.startswith('_') and not hasattr( FrozenConfig, key )
+        )
+        frozen_class = type( 'FrozenConfig', ( FrozenConfig, ), {
+            '__slots__': fields, '_keys': keys, '_key_set': frozenset( keys ), '_fields': frozenset( fields )
+        })
+        _classes[keys] = frozen_class
+    return frozen_class
+
+def freeze( _config: 'config_impl.Config' ) -> FrozenConfig:
+    r""" Compiles the current shape of a Config into an immutable FrozenConfig.
+        Args:
+            _config (config_impl.Config):
+                Config to freeze.
+        Returns:
+            frozen (FrozenConfig):
+                Immutable view of the config, nested configs are frozen as well.
+    """
+    cached = _config._frozen
+    if cached != None and cached[0] == _config._version and _hidden_unchanged( _config, cached[1] ):
+        return cached[1]
+
+    # Nested configs carry an empty is_set map which Config() restores on thaw, leave it out of the shape.
+    keys = tuple( key for key in _config.keys() if key != '__is_set' or _config['__is_set'] )
+    frozen_class = _compile( keys )
+    frozen = object.__new__( frozen_class )
+    extra = None
+    for key in keys:
+        value = dict.__getitem__( _config, key )
+        if _config._deferred and isinstance( value, deferred_impl.Deferred ):
+            value = value.resolve( _config )
+        if isinstance( value, config_impl.Config ):
+            value = freeze( value )
+        elif key in config_impl._HIDDEN_KEYS:
+            value = dict( value )
+        if key in frozen_class._fields:
+            object.__setattr__( frozen, key, value )
+        else:
+            if extra == None:
+                extra = {}
+            extra[key] = value
+    object.__setattr__( frozen, '_extra', extra )
+    object.__setattr__( frozen, '__default__', getattr( _config, '__default__', None ) )
+    object.__setattr__( _config, '_frozen', ( _config._version, frozen ) )
+    return frozen
+
+def _hidden_unchanged( _config: 'config_impl.Config', frozen: FrozenConfig ) -> bool:
+    """ Returns True if the is_set and source maps, copied into the view and updated in place, still match it.
+    """
+    for key in config_impl._HIDDEN_KEYS:
+        value = dict.get( _config, key )
+        if ( value or None ) != ( frozen.get( key ) or None ):
+            return False
+    return True
@@ -0,0 +1,109 @@
+"""
+Hands a parsed config from a parent process to the workers it spawns, through an environment variable.
+"""
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import atexit
+import base64
+import os
+import tempfile
+from typing import IO, List, MutableMapping, Optional
+
+# Names where the parent's config is, read by Config.from_parent().
+HANDOFF_ENV = 'BT_CONFIG_HANDOFF'
+
+# Larger configs go through a file, environments are limited in size (128KB per variable on Linux).
+INLINE_LIMIT = 32 * 1024
+
+# Handoff files written by this process, removed when it exits.
+_files: List[str] = []
+# Unlinked handoff files, kept open for the life of the process so children can read their inherited copy.
+_descriptors: List[IO[bytes]] = []
+
+def export( data: bytes, fd: bool = False, environ: Optional[MutableMapping[str, str]] = None ) -> str:
+    r""" Stores a config encoded with Config.to_bytes() where child processes find it, see Config.export_for_child().
+        Args:
+            data (bytes):
+                Encoded config.
+            fd (bool):
+                If True, the data is written to an unlinked temporary file left open and inheritable.
+            environ (MutableMapping[str, str], optional):
+                Environment to set HANDOFF_ENV in, defaults to os.environ.
+        Returns:
+            handoff (str):
+                Value HANDOFF_ENV was set to.
+    """
+    if environ == None:
+        environ = os.environ
+    if fd:
+        f = tempfile.TemporaryFile()
+        f.write( data )
+        f.flush()
+        _descriptors.append( f )
+        os.set_inheritable( f.fileno(), True )
+        handoff = 'fd:{}'.format( f.fileno() )
+    elif len( data ) <= INLINE_LIMIT:
+        handoff = 'b64:' + base64.b64encode( data ).decode( 'ascii' )
+    else:
+        # mkstemp creates the file readable by this user only.
+        file_fd, path = tempfile.mkstemp( prefix = 'bt_config_', suffix = '.bin' )
+        with os.fdopen( file_fd, 'wb' ) as f:
+            f.write( data )
+        if not _files:
+            atexit.register( _remove_files )
+        _files.append( path )
+        handoff = 'file:' + path
+    environ[HANDOFF_ENV] = handoff
+    return handoff
+
+def load( environ: Optional[MutableMapping[str, str]] = None ) -> Optional[bytes]:
+    r""" Returns the config data a parent process stored with export(), None if there is none.
+        Args:
+            environ (MutableMapping[str, str], optional):
+                Environment to read HANDOFF_ENV from, defaults to os.environ.
+        Returns:
+            data (Optional[bytes]):
+                Encoded config.
+        Raises:
+            ValueError:
+                Raised if HANDOFF_ENV is not understood.
+            OSError:
+                Raised if the file or descriptor it names cannot be read.
+    """
+    handoff = ( os.environ if environ == None else environ ).get( HANDOFF_ENV )
+    if not handoff:
+        return None
+    kind, _, location = handoff.partition( ':' )
+    if kind == 'b64':
+        return base64.b64decode( location )
+    if kind == 'file':
+        with open( location, 'rb' ) as f:
+            return f.read()
+    if kind == 'fd':
+        # pread leaves the shared offset alone, siblings read the same descriptor.
+        fd = int( location )
+        size = os.fstat( fd ).st_size
+        return os.pread( fd, size, 0 )
+    raise ValueError( 'Invalid {}: {}'.format( HANDOFF_ENV, handoff ) )
+
+def _remove_files():
+    for path in _files:
+        try:
+            os.remove( path )
+        except OSError:
+            pass
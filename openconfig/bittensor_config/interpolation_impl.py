@@ -0,0 +1,185 @@
+"""
+${dotted.path} interpolation of config values, through a dependency graph kept in step with the config.
+"""
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import re
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .config_impl import Config
+
+# ${dotted.path}, or $${ for a literal ${.
+_REFERENCE = re.compile( r'\$(\$?)\{([^${}]*)\}' )
+
+# Marks a leaf missing from the config.
+_MISSING = object()
+
+# ( ( literal before the reference, dotted path of the reference ), ... ), literal after the last reference
+Template = Tuple[Tuple[Tuple[str, str], ...], str]
+
+class InterpolationError(ValueError):
+    """ Raised when a ${dotted.path} reference cannot be resolved.
+    """
+    pass
+
+
+class Interpolation:
+    """
+    Interpolated values of a config, see Config.interpolate().
+
+    Every string leaf holding references is parsed once into a template, and each leaf knows the templates
+    which refer to it. Resolved values are cached. When the config changes, its leaves are compared with
+    those the graph was built from, only changed templates are parsed again and only the leaves which depend
+    on a changed leaf, directly or through other references, are resolved again.
+    Replace leaves rather than changing lists or dicts in place, in-place changes are not noticed.
+    """
+    def __init__(self, _config: 'Config'):
+        self.config = _config
+        # Version of the config and copy of its flat index the graph was built from.
+        self._version = -1
+        self._index: Dict[str, Any] = {}
+        # Leaf -> its parsed references, for the string leaves which hold any.
+        self._templates: Dict[str, Template] = {}
+        # Leaf -> the templated leaves which refer to it.
+        self._dependents: Dict[str, Set[str]] = {}
+        # Templated leaf -> resolved value.
+        self._resolved: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def get(self, path: str, default: Any = _MISSING) -> Any:
+        r""" Returns the leaf under path with its references resolved.
+            Args:
+                path (str):
+                    Dotted path of a leaf.
+                default (Any, optional):
+                    Returned if there is no leaf under path, InterpolationError is raised if not given.
+            Returns:
+                value (Any):
+                    The resolved value.
+            Raises:
+                InterpolationError:
+                    Raised if a reference names a missing leaf, or references form a cycle.
+        """
+        with self._lock:
+            self._sync()
+            if path not in self._index:
+                if default is _MISSING:
+                    raise InterpolationError( '{} is not set'.format( path ) )
+                return default
+            return self._resolve( path, [] )
+
+    def resolved(self) -> Dict[str, Any]:
+        r""" Resolves every templated leaf.
+            Returns:
+                resolved (Dict[str, Any]):
+                    Resolved value of each leaf holding references, keyed by dotted path.
+            Raises:
+                InterpolationError:
+                    Raised if a reference names a missing leaf, or references form a cycle.
+        """
+        with self._lock:
+            self._sync()
+            return { path: self._resolve( path, [] ) for path in self._templates }
+
+    def _sync(self):
+        """ Brings the graph up to date with the config, invalidating what depends on the leaves which changed.
+        """
+        version = self.config._version
+        if version == self._version:
+            return
+        index = self.config._flat_index()
+        old = self._index
+        changed = [ path for path, value in index.items() if old.get( path, _MISSING ) is not value ]
+        changed.extend( path for path in old if path not in index )
+
+        for path in changed:
+            old_template = self._templates.pop( path, None )
+            if old_template != None:
+                for _, reference in old_template[0]:
+                    dependents = self._dependents.get( reference )
+                    if dependents != None:
+                        dependents.discard( path )
+            value = index.get( path, _MISSING )
+            template = _parse( value ) if isinstance( value, str ) else None
+            if template != None:
+                self._templates[path] = template
+                for _, reference in template[0]:
+                    self._dependents.setdefault( reference, set() ).add( path )
+
+        # Forget what was resolved from the changed leaves, transitively.
+        stack = list( changed )
+        while stack:
+            path = stack.pop()
+            self._resolved.pop( path, None )
+            for dependent in self._dependents.get( path, () ):
+                if dependent in self._resolved:
+                    stack.append( dependent )
+
+        # The flat index is updated in place by set_path(), keep a copy to compare against.
+        self._index = dict( index )
+        self._version = version
+
+    def _resolve(self, path: str, chain: List[str]) -> Any:
+        """ Returns the resolved value of the leaf under path. chain holds the leaves being resolved, for cycles.
+        """
+        resolved = self._resolved.get( path, _MISSING )
+        if resolved is not _MISSING:
+            return resolved
+        template = self._templates.get( path )
+        if template == None:
+            return self._index[path]
+        if path in chain:
+            raise InterpolationError( 'Interpolation cycle: {}'.format( ' -> '.join( chain[chain.index( path ):] + [ path ] ) ) )
+        chain.append( path )
+        parts, tail = template
+        values = []
+        for _, reference in parts:
+            if reference not in self._index:
+                raise InterpolationError( '{} refers to ${{{}}}, which is not set'.format( path, reference ) )
+            values.append( self._resolve( reference, chain ) )
+        chain.pop()
+
+        if len( parts ) == 1 and parts[0][0] == '' and tail == '':
+            # The whole value is one reference, it keeps the type of the value referred to.
+            value = values[0]
+        else:
+            value = ''.join( literal + str( part ) for ( literal, _ ), part in zip( parts, values ) ) + tail
+        self._resolved[path] = value
+        return value
+
+
+def _parse( value: str ) -> Optional[Template]:
+    """ Returns the template of a string, None if it holds neither references nor escapes.
+    """
+    if '${' not in value:
+        return None
+    parts = []
+    literal = ''
+    position = 0
+    for match in _REFERENCE.finditer( value ):
+        literal += value[position:match.start()]
+        position = match.end()
+        if match.group( 1 ):
+            # $${ escapes a literal ${.
+            literal += match.group( 0 )[1:]
+        else:
+            parts.append( ( literal, match.group( 2 ).strip() ) )
+            literal = ''
+    return tuple( parts ), literal + value[position:]
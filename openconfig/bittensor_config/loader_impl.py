@@ -0,0 +1,132 @@
+"""
+Process wide cache of parsed --config files.
+"""
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import os
+import pickle
+import stat
+import tempfile
+import threading
+from copy import deepcopy
+from typing import Any, Dict, Optional, Tuple
+
+# Set to 1 to keep a pickled copy of each parsed file next to it, which later processes load instead of the YAML.
+PICKLE_CACHE_ENV = 'BT_CONFIG_PICKLE_CACHE'
+
+# Bumped whenever the layout of the pickled cache files changes.
+_PICKLE_CACHE_VERSION = 1
+
+# realpath -> ( ( inode, mtime_ns, size ), parsed contents )
+_cache: Dict[str, Tuple[Tuple[int, int, int], Any]] = {}
+_lock = threading.Lock()
+
+def load_config_file( path: str, pickle_cache: Optional[bool] = None ) -> Any:
+    r""" Returns the parsed contents of a YAML config file, parsing it only when it changed since the last load.
+        Args:
+            path (str):
+                Path to the YAML file.
+            pickle_cache (bool, optional):
+                If True, loads and refreshes the pickled cache kept next to the file.
+                Defaults to the BT_CONFIG_PICKLE_CACHE environment variable.
+        Returns:
+            contents (Any):
+                Parsed file contents, a copy the caller is free to modify.
+        Raises:
+            OSError:
+                Raised if the file cannot be read.
+            yaml.YAMLError:
+                Raised if the file is not valid YAML.
+    """
+    realpath = os.path.realpath( path )
+    file_stat = os.stat( realpath )
+    identity = ( file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size )
+
+    cached = _cache.get( realpath )
+    if cached != None and cached[0] == identity:
+        return deepcopy( cached[1] )
+
+    if pickle_cache == None:
+        pickle_cache = os.getenv( PICKLE_CACHE_ENV, '' ).lower() in ( '1', 'true', 'yes' )
+
+    contents = _read_pickle_cache( realpath, file_stat ) if pickle_cache else None
+    if contents == None:
+        with open( realpath ) as f:
+            contents = _load_yaml( f )
+        if pickle_cache:
+            _write_pickle_cache( realpath, file_stat, contents )
+
+    with _lock:
+        _cache[realpath] = ( identity, contents )
+    return deepcopy( contents )
+
+def clear_cache():
+    """ Forgets every parsed file, the next load of each file parses it again.
+    """
+    with _lock:
+        _cache.clear()
+
+def pickle_cache_path( path: str ) -> str:
+    """ Returns the path of the pickled cache kept for the YAML file under path.
+    """
+    directory, name = os.path.split( path )
+    return os.path.join( directory, '.' + name + '.pickle' )
+
+def _read_pickle_cache( realpath: str, file_stat: os.stat_result ) -> Optional[Any]:
+    """ Returns the contents stored in the pickled cache if it was written for this version of the file.
+    """
+    cache_path = pickle_cache_path( realpath )
+    try:
+        with open( cache_path, 'rb' ) as f:
+            # Unpickling runs code, only trust files nobody else could have written.
+            cache_stat = os.fstat( f.fileno() )
+            if hasattr( os, 'getuid' ) and cache_stat.st_uid != os.getuid():
+                return None
+            if cache_stat.st_mode & ( stat.S_IWGRP | stat.S_IWOTH ):
+                return None
+            version, mtime_ns, size, contents = pickle.load( f )
+    except Exception:
+        return None
+    if ( version, mtime_ns, size ) != ( _PICKLE_CACHE_VERSION, file_stat.st_mtime_ns, file_stat.st_size ):
+        return None
+    return contents
+
+def _write_pickle_cache( realpath: str, file_stat: os.stat_result, contents: Any ):
+    """ Stores contents in the pickled cache next to the file, silently giving up if the directory is not writable.
+    """
+    cache_path = pickle_cache_path( realpath )
+    try:
+        fd, tmp_path = tempfile.mkstemp( dir = os.path.dirname( cache_path ), prefix = '.tmp', suffix = '.pickle' )
+    except OSError:
+        return
+    try:
+        with os.fdopen( fd, 'wb' ) as f:
+            pickle.dump( ( _PICKLE_CACHE_VERSION, file_stat.st_mtime_ns, file_stat.st_size, contents ), f, protocol = pickle.HIGHEST_PROTOCOL )
+        os.replace( tmp_path, cache_path )
+    except Exception:
+        try:
+            os.remove( tmp_path )
+        except OSError:
+            pass
+
+def _load_yaml( f ) -> Any:
+    """ Parses a YAML stream, yaml is only imported the first time a file is parsed.
+    """
+    import yaml
+    # libyaml's loader is several times faster than the pure python one, it is missing when PyYAML was built without it.
+    return yaml.load( f, Loader = getattr( yaml, 'CSafeLoader', yaml.SafeLoader ) )
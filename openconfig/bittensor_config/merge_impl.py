@@ -0,0 +1,302 @@
+"""
+Merging configs and patching them with deltas, reporting the dotted paths which changed.
+"""
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+from copy import deepcopy
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, NamedTuple, Tuple
+
+from . import config_impl, deferred_impl, frozen_impl
+
+# Marks a path with no leaf under it.
+_MISSING = object()
+
+class ChangeSet:
+    """
+    Dotted paths of the leaves a merge or patch added, removed or changed.
+    Leaves are the values which are not sub-configs, and empty sub-configs, as in Config.to_flat_dict().
+    """
+    __slots__ = ( 'added', 'removed', 'changed' )
+
+    def __init__(self, added: Iterable[str] = (), removed: Iterable[str] = (), changed: Iterable[str] = ()):
+        self.added: FrozenSet[str] = frozenset( added )
+        self.removed: FrozenSet[str] = frozenset( removed )
+        self.changed: FrozenSet[str] = frozenset( changed )
+
+    def __bool__(self) -> bool:
+        return bool( self.added or self.removed or self.changed )
+
+    def __len__(self) -> int:
+        return len( self.added ) + len( self.removed ) + len( self.changed )
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.added
+        yield from self.removed
+        yield from self.changed
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.added or path in self.removed or path in self.changed
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance( other, ChangeSet ):
+            return ( self.added, self.removed, self.changed ) == ( other.added, other.removed, other.changed )
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return 'ChangeSet(added={}, removed={}, changed={})'.format( sorted( self.added ), sorted( self.removed ), sorted( self.changed ) )
+
+    def affects(self, prefix: str) -> bool:
+        """ Returns True if any path in the change set is prefix or lies below it, the empty prefix matches any path.
+        """
+        if not prefix:
+            return bool( self )
+        below = prefix + '.'
+        return any( path == prefix or path.startswith( below ) for path in self )
+
+
+class Patch( NamedTuple ):
+    """
+    Delta between two configs, as returned by Config.diff(). Plain data, it pickles and ships as is.
+    """
+    # Leaf values to set, keyed by dotted path.
+    values: Dict[str, Any]
+    # Dotted paths of the leaves to remove.
+    removed: Tuple[str, ...]
+
+
+def merge( target: 'config_impl.Config', sources: Iterable[Any] ) -> ChangeSet:
+    r""" Merges every source into target in order, later sources taking precedence, like Config._merge.
+        The sources are folded into one set of leaves first, so target is walked once however many sources there are.
+        Args:
+            target (config_impl.Config):
+                Config merged into, in place.
+            sources (Iterable[Any]):
+                Configs or nested dicts to merge.
+        Returns:
+            changes (ChangeSet):
+                Leaves of target which were added or changed, or removed because a source replaced their sub-config.
+    """
+    sources = list( sources )
+    values = fold( target, sources )
+    hidden = { key: {} for key in config_impl._HIDDEN_KEYS }
+    for source in sources:
+        for key, merged in hidden.items():
+            if source.get( key ):
+                merged.update( source.get( key ) )
+    changes = apply( target, values, () )
+    for key, merged in hidden.items():
+        if not merged:
+            continue
+        # Updated in place, is_set and source maps are not part of the flat index.
+        if isinstance( target.get( key ), dict ):
+            target[key].update( merged )
+        else:
+            target[key] = merged
+    return changes
+
+def fold( target: 'config_impl.Config', sources: Iterable[Any] ) -> Dict[str, Any]:
+    r""" Folds the leaves of the sources into the values merging them into target sets, later sources taking precedence.
+        As in Config._merge, an empty mapping adds nothing where a mapping already is.
+        Args:
+            target (config_impl.Config):
+                Config the values are for.
+            sources (Iterable[Any]):
+                Configs or nested dicts.
+        Returns:
+            values (Dict[str, Any]):
+                Leaf values keyed by dotted path, in the order to set them.
+    """
+    values = {}
+    # Empty mappings which replaced nothing, kept only if target has no mapping in their place.
+    empties = set()
+    for source in sources:
+        for path, value in _leaves( source, '', into_dicts = True ):
+            if empties:
+                # A mapping holding path is about to replace the empty one above it.
+                _discard_above( values, empties, path )
+            if _is_empty( value ) and path not in values:
+                below = path + '.'
+                if any( other.startswith( below ) for other in values ):
+                    continue
+                empties.add( path )
+            elif empties:
+                empties.discard( path )
+            # Moved to the end, so it is applied after anything an earlier source set below or above it.
+            values.pop( path, None )
+            values[path] = value
+    for path in empties:
+        if isinstance( target.get_path( path ), ( dict, frozen_impl.FrozenConfig ) ):
+            del values[path]
+    return values
+
+def _discard_above( values: Dict[str, Any], empties: set, path: str ):
+    """ Drops the empty mappings of values on the way to path.
+    """
+    end = path.find( '.' )
+    while end != -1:
+        head = path[:end]
+        if head in empties:
+            empties.discard( head )
+            values.pop( head, None )
+        end = path.find( '.', end + 1 )
+
+def diff( a: 'config_impl.Config', b: 'config_impl.Config' ) -> Patch:
+    r""" Returns the patch which turns a into b.
+        Args:
+            a (config_impl.Config):
+                Config the patch applies to.
+            b (config_impl.Config):
+                Config the patch leads to.
+        Returns:
+            patch (Patch):
+                Leaves of b which are missing or different in a, and leaves of a missing in b.
+    """
+    flat_a = a._flat_index()
+    flat_b = b._flat_index()
+    values = { path: deepcopy( value ) for path, value in flat_b.items() if not _same( flat_a.get( path, _MISSING ), value ) }
+    removed = tuple( path for path in flat_a if path not in flat_b )
+    return Patch( values, removed )
+
+def apply( target: 'config_impl.Config', values: Dict[str, Any], removed: Iterable[str] ) -> ChangeSet:
+    r""" Removes then sets leaves of target by dotted path, keeping its flat index up to date along the way,
+        so patching a config costs the size of the patch once the index exists.
+        Args:
+            target (config_impl.Config):
+                Config to change, in place.
+            values (Dict[str, Any]):
+                Leaf values to set, keyed by dotted path.
+            removed (Iterable[str]):
+                Dotted paths of the leaves to remove. Sub-configs left empty are removed as well.
+        Returns:
+            changes (ChangeSet):
+                Leaves of target which were added, removed or changed.
+    """
+    index = target._flat_index()
+    # Value of every leaf touched, before it was first touched.
+    before = {}
+
+    for path in removed:
+        if path not in index:
+            continue
+        before.setdefault( path, index.pop( path ) )
+        _remove( target, path )
+
+    nodes = { '': target }
+    for path, value in values.items():
+        if isinstance( value, ( dict, list, set ) ):
+            value = deepcopy( value )
+        prefix, _, key = path.rpartition('.')
+        into_dict = bool( prefix ) and _replace_prefix_leaf( index, before, prefix )
+        parent = nodes.get( prefix )
+        if parent == None:
+            parent = target._path_node( prefix, nodes )
+        if not into_dict:
+            old = parent[key] if key in parent else _MISSING
+            if isinstance( old, config_impl.Config ):
+                for leaf_path, leaf in _leaves( old, path + '.' ):
+                    before.setdefault( leaf_path, leaf )
+                    index.pop( leaf_path, None )
+            before.setdefault( path, index.pop( path, _MISSING ) )
+            if isinstance( value, config_impl.Config ) and not _is_empty( value ):
+                for leaf_path, leaf in _leaves( value, path + '.' ):
+                    before.setdefault( leaf_path, _MISSING )
+                    index[leaf_path] = leaf
+            else:
+                index[path] = value
+        parent[key] = value
+        if isinstance( value, deferred_impl.Deferred ):
+            # The index holds what reading the leaf returns.
+            index[path] = parent[key]
+        if path in nodes:
+            nodes = { '': target }
+
+    # Every change went into the index as well, it stays valid.
+    object.__setattr__( target, '_flat', ( target._version, index ) )
+
+    added, removed_paths, changed = [], [], []
+    for path, old in before.items():
+        new = index.get( path, _MISSING )
+        if old is _MISSING:
+            if new is not _MISSING:
+                added.append( path )
+        elif new is _MISSING:
+            removed_paths.append( path )
+        elif not _same( old, new ):
+            changed.append( path )
+    return ChangeSet( added, removed_paths, changed )
+
+def _replace_prefix_leaf( index: Dict[str, Any], before: Dict[str, Any], prefix: str ) -> bool:
+    """ Handles a leaf sitting on the path to a value about to be set. A plain dict leaf is written into and
+        True is returned, any other leaf is replaced by a sub-config.
+    """
+    end = 0
+    while end != -1:
+        end = prefix.find( '.', end + 1 )
+        head = prefix if end == -1 else prefix[:end]
+        if head not in index:
+            continue
+        leaf = index[head]
+        if isinstance( leaf, config_impl.Config ):
+            # An empty sub-config, which stops being a leaf.
+            del index[head]
+            return False
+        if isinstance( leaf, dict ):
+            before.setdefault( head, deepcopy( leaf ) )
+            return True
+        before.setdefault( head, index.pop( head ) )
+        return False
+    return False
+
+def _remove( target: 'config_impl.Config', path: str ):
+    """ Deletes the leaf under path, then every sub-config above it left empty.
+    """
+    keys = path.split('.')
+    chain = [ target ]
+    for key in keys[:-1]:
+        chain.append( chain[-1][key] )
+    del chain[-1][keys[-1]]
+    for depth in range( len( chain ) - 1, 0, -1 ):
+        node = chain[depth]
+        if any( key not in config_impl._HIDDEN_KEYS or node[key] for key in node ):
+            break
+        del chain[depth - 1][keys[depth - 1]]
+
+def _leaves( node: Any, prefix: str, into_dicts: bool = False ) -> Iterator[Tuple[str, Any]]:
+    """ Yields ( dotted path, value ) for every leaf below node. Plain dicts are leaves, unless into_dicts is set.
+        Empty sub-configs are leaves, as in Config._flat_index().
+    """
+    nested = ( dict, frozen_impl.FrozenConfig ) if into_dicts else ( config_impl.Config, frozen_impl.FrozenConfig )
+    for key, value in node.items():
+        if key in config_impl._HIDDEN_KEYS:
+            continue
+        if isinstance( value, nested ) and config_impl._has_entries( value ):
+            yield from _leaves( value, prefix + key + '.', into_dicts )
+        else:
+            yield prefix + key, value
+
+def _is_empty( value: Any ) -> bool:
+    """ Returns True if value is a mapping holding no values.
+    """
+    return isinstance( value, ( dict, frozen_impl.FrozenConfig ) ) and not config_impl._has_entries( value )
+
+def _same( a: Any, b: Any ) -> bool:
+    """ Returns True if a leaf did not change, 1 becoming True counts as a change.
+    """
+    return type( a ) is type( b ) and a == b
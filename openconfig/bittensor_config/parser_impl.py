@@ -0,0 +1,208 @@
+"""
+Single pass argument parsing which records the destinations explicitly supplied on the command line.
+"""
+# The MIT License (MIT)
+# Copyright © 2021 Yuma Rao
+# Copyright © 2022 Opentensor Foundation
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import argparse
+import threading
+from copy import copy
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+from . import config_impl
+
+# Destinations of the arguments prepare() adds, which config() acts on itself. The environment does not set them.
+INTERNAL_DESTS = frozenset( ( 'config', 'strict' ) )
+
+class _TrackingParser:
+    """
+    Mixed into a shallow view of the user's parser. Every action argparse takes while consuming
+    the command line converts its values through _get_values, so that is where explicit destinations are recorded.
+    """
+    _explicit: Set[str]
+
+    def _get_values(self, action: argparse.Action, arg_strings: List[str]) -> Any:
+        values = super()._get_values( action, arg_strings )
+        if action.dest is argparse.SUPPRESS or values is argparse.SUPPRESS:
+            return values
+        # Positionals which consumed nothing fall back to their default, which does not count as set.
+        if not action.option_strings and not arg_strings and action.nargs in ( argparse.OPTIONAL, argparse.ZERO_OR_MORE ):
+            return values
+        self._explicit.add( action.dest )
+        return values
+
+
+class _SubparserViews( dict ):
+    """
+    Stands in for _SubParsersAction._name_parser_map, handing out tracking views of the sub-commands on demand.
+    """
+    def __init__(self, parsers: Dict[str, argparse.ArgumentParser], explicit: Set[str]):
+        super().__init__()
+        self._parsers = parsers
+        self._explicit = explicit
+
+    def __missing__(self, name: str) -> argparse.ArgumentParser:
+        view = self[name] = tracking_view( self._parsers[name], self._explicit )
+        return view
+
+
+_view_classes: Dict[type, type] = {}
+
+def tracking_view( parser: argparse.ArgumentParser, explicit: Set[str] ) -> argparse.ArgumentParser:
+    r""" Returns a shallow view of the parser which adds explicitly set destinations to explicit while parsing.
+        The view shares actions, defaults and sub-parsers with the original, nothing is deep copied and the
+        original parser is never modified.
+        Args:
+            parser (argparse.ArgumentParser):
+                Command line parser object.
+            explicit (Set[str]):
+                Set the view records explicitly supplied destinations into.
+        Returns:
+            view (argparse.ArgumentParser):
+                Parser view of the same class as parser.
+    """
+    parser_class = type(parser)
+    view_class = _view_classes.get( parser_class )
+    if view_class == None:
+        view_class = type( parser_class.__name__, ( _TrackingParser, parser_class ), {} )
+        _view_classes[parser_class] = view_class
+
+    view = object.__new__( view_class )
+    view.__dict__.update( parser.__dict__ )
+    view._explicit = explicit
+
+    # Sub-commands are parsed by the parsers held in the sub-parsers action, swap in one that hands out views.
+    if parser._subparsers != None:
+        actions = []
+        for action in parser._actions:
+            if isinstance( action, argparse._SubParsersAction ):
+                action = copy( action )
+                action._name_parser_map = _SubparserViews( action._name_parser_map, explicit )
+            actions.append( action )
+        view._actions = actions
+
+    return view
+
+def parse_tracked( parser: argparse.ArgumentParser, args: List[str] ) -> Tuple[argparse.Namespace, List[str], Set[str]]:
+    r""" Parses args with parser once, recording which destinations were supplied on the command line.
+        Args:
+            parser (argparse.ArgumentParser):
+                Command line parser object.
+            args (List[str]):
+                List of arguments to parse.
+        Returns:
+            params (argparse.Namespace):
+                Namespace object created from parser arguments, defaults included.
+            unrecognized (List[str]):
+                Arguments the parser did not recognize.
+            explicit (Set[str]):
+                Destinations explicitly set on the command line.
+    """
+    explicit = set()
+    params, unrecognized = tracking_view( parser, explicit ).parse_known_args( args = args )
+    return params, unrecognized, explicit
+
+def value_converter( parser: argparse.ArgumentParser ) -> Callable[[str, Any], Any]:
+    r""" Returns a function converting a string to the type of the parser argument with the given destination,
+        as argparse converts string defaults. Flags such as store_true take 1/0, true/false, yes/no or on/off.
+        Strings for unknown destinations are returned as they are.
+        Args:
+            parser (argparse.ArgumentParser):
+                Command line parser object.
+        Returns:
+            convert (Callable[[str, Any], Any]):
+                Called with the destination and the value.
+    """
+    actions = { action.dest: action for action in parser._actions }
+    def convert( dest: str, value: Any ) -> Any:
+        action = actions.get( dest )
+        if action == None or not isinstance( value, str ):
+            return value
+        # argparse never converts the value of a flag, which takes no argument.
+        if action.nargs == 0 and isinstance( action.default, bool ):
+            return parse_bool( value )
+        return parser._get_value( action, value )
+    return convert
+
+_BOOLEANS = { '1': True, 'true': True, 'yes': True, 'on': True, '0': False, 'false': False, 'no': False, 'off': False }
+
+def parse_bool( value: str ) -> bool:
+    r""" Returns the boolean a flag value from the environment or a config file stands for.
+        Args:
+            value (str):
+                One of 1/0, true/false, yes/no or on/off, in any case.
+        Returns:
+            flag (bool):
+                The value as a boolean.
+        Raises:
+            ValueError:
+                Raised if value is none of those.
+    """
+    flag = _BOOLEANS.get( value.strip().lower() )
+    if flag == None:
+        raise ValueError( 'invalid boolean value: {!r}'.format( value ) )
+    return flag
+
+
+class Prepared:
+    """
+    What config() derives from a parser besides parsing, kept on the parser while its arguments do not change.
+    """
+    __slots__ = ( 'n_actions', 'convert', 'layout' )
+
+    def __init__(self, n_actions: int, convert: Callable[[str, Any], Any], layout: 'config_impl.PathLayout'):
+        self.n_actions = n_actions
+        # See value_converter().
+        self.convert = convert
+        # Where each destination goes in the config.
+        self.layout = layout
+
+
+_prepare_lock = threading.Lock()
+
+def prepare( parser: argparse.ArgumentParser ) -> Prepared:
+    r""" Adds the --config and --strict arguments to parser and compiles what config() needs from it, once.
+        Parsers which gained arguments since are prepared again.
+        Args:
+            parser (argparse.ArgumentParser):
+                Command line parser object.
+        Returns:
+            prepared (Prepared):
+                Converter and destination layout of the parser.
+    """
+    prepared = getattr( parser, '_bittensor_config_prepared', None )
+    if prepared != None and prepared.n_actions == len( parser._actions ):
+        return prepared
+    with _prepare_lock:
+        # Optionally add config specific arguments
+        try:
+            parser.add_argument('--config', type=str, help='If set, defaults are overridden by passed file.')
+        except:
+            # this can fail if the --config has already been added.
+            pass
+        try:
+            parser.add_argument('--strict',  action='store_true', help='''If flagged, config will check that only exact arguemnts have been set.''', default=False )
+        except:
+            # this can fail if the --config has already been added.
+            pass
+        dests = [ action.dest for action in parser._actions if action.dest is not argparse.SUPPRESS ]
+        prepared = Prepared( len( parser._actions ), value_converter( parser ), config_impl.PathLayout( dests ) )
+        # Lives as long as the parser, which the converter refers to.
+        parser._bittensor_config_prepared = prepared
+    return prepared
@@ -0,0 +1,132 @@
+"""
+Registry of the command line arguments components declare, composed into parsers built once per process.
+"""
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import argparse
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from . import parser_impl
+
+class Argument:
+    """
+    Declaration of one command line argument, registered with ArgumentRegistry.register().
+    """
+    __slots__ = ( 'name', 'kwargs' )
+
+    def __init__(self, name: str, **kwargs: Any):
+        r""" Declares an argument.
+            Args:
+                name (str):
+                    Dotted name of the option without the leading dashes or any prefix, for example 'wallet.name'.
+                **kwargs:
+                    Passed on to ArgumentParser.add_argument.
+        """
+        self.name = name
+        self.kwargs = kwargs
+
+    def __repr__(self) -> str:
+        return 'Argument({!r}, {})'.format( self.name, ', '.join( '{}={!r}'.format( *item ) for item in self.kwargs.items() ) )
+
+
+class ArgumentRegistry:
+    """
+    Arguments declared once per component, and the parsers combining them. A parser is built the first time
+    a set of components is asked for, then reused, along with what config() derives from it.
+    """
+    def __init__(self):
+        self._components: Dict[str, Tuple[Argument, ...]] = {}
+        # ( components, prefix ) -> parser
+        self._parsers: Dict[Tuple[Tuple[str, ...], Optional[str]], argparse.ArgumentParser] = {}
+        self._lock = threading.Lock()
+
+    def register(self, component: str, arguments: Iterable[Argument]):
+        r""" Declares the arguments of a component, replacing those it declared before.
+            Args:
+                component (str):
+                    Name of the component, for example 'wallet'.
+                arguments (Iterable[Argument]):
+                    Its arguments.
+        """
+        with self._lock:
+            self._components[component] = tuple( arguments )
+            # Parsers including the component are out of date.
+            self._parsers = { key: parser for key, parser in self._parsers.items() if component not in key[0] }
+
+    def components(self) -> Tuple[str, ...]:
+        """ Returns the registered components, in registration order.
+        """
+        return tuple( self._components )
+
+    def arguments(self, component: str) -> Tuple[Argument, ...]:
+        """ Returns the arguments component declared.
+        """
+        return self._components[component]
+
+    def add_args(self, parser: argparse.ArgumentParser, component: str, prefix: Optional[str] = None):
+        r""" Adds the arguments of a component to a parser, skipping options the parser already has.
+            Args:
+                parser (argparse.ArgumentParser):
+                    Parser to add to.
+                component (str):
+                    Registered component.
+                prefix (str, optional):
+                    Prepended to each option name, '--wallet.name' with prefix 'miner' becomes '--miner.wallet.name'.
+            Raises:
+                KeyError:
+                    Raised if the component is not registered.
+        """
+        prefix_str = '' if prefix == None else prefix + '.'
+        for argument in self._components[component]:
+            option = '--' + prefix_str + argument.name
+            if option not in parser._option_string_actions:
+                parser.add_argument( option, **argument.kwargs )
+
+    def parser(self, components: Optional[Iterable[str]] = None, prefix: Optional[str] = None) -> argparse.ArgumentParser:
+        r""" Returns the parser combining the arguments of components, built on first use and shared afterwards.
+            Args:
+                components (Iterable[str], optional):
+                    Components to include, defaults to every registered component.
+                prefix (str, optional):
+                    Prepended to every option name, see add_args().
+            Returns:
+                parser (argparse.ArgumentParser):
+                    The shared parser, with --config and --strict. Do not add arguments to it.
+            Raises:
+                KeyError:
+                    Raised if a component is not registered.
+        """
+        key = ( tuple( components ) if components != None else tuple( self._components ), prefix )
+        parser = self._parsers.get( key )
+        if parser != None:
+            return parser
+        with self._lock:
+            parser = self._parsers.get( key )
+            if parser == None:
+                parser = argparse.ArgumentParser()
+                for component in key[0]:
+                    self.add_args( parser, component, prefix )
+                # Compiled now rather than by the first config() call.
+                parser_impl.prepare( parser )
+                self._parsers[key] = parser
+        return parser
+
+
+# Process wide registry components declare their arguments in.
+registry = ArgumentRegistry()
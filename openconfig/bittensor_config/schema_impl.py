@@ -0,0 +1,193 @@
+"""
+Declarative schemas for config subtrees, compiled once into a validator.
+"""
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Type, Union
+
+from . import frozen_impl
+
+# Marks a value missing from the config.
+_MISSING = object()
+
+# Validated fingerprints kept per schema, the memo starts over once it is full.
+_MEMO_SIZE = 1024
+
+class InvalidConfig(ValueError):
+    """ Raised when a config does not match its schema.
+    """
+    pass
+
+
+class Field:
+    """
+    Constraints on one value of a config subtree.
+    """
+    __slots__ = ( 'types', 'required', 'nullable', 'choices', 'min', 'max' )
+
+    def __init__(
+            self,
+            types: Union[None, Type, Tuple[Type, ...]] = None,
+            required: bool = False,
+            nullable: bool = False,
+            choices: Optional[Iterable[Any]] = None,
+            min: Optional[Any] = None,
+            max: Optional[Any] = None
+        ):
+        r""" Describes a value.
+            Args:
+                types (Union[Type, Tuple[Type, ...]], optional):
+                    Accepted types, any type if None. bool is not accepted as an int unless listed.
+                required (bool):
+                    If True, the value must be present.
+                nullable (bool):
+                    If True, None is accepted whatever the other constraints.
+                choices (Iterable[Any], optional):
+                    Accepted values.
+                min (Any, optional):
+                    Smallest accepted value.
+                max (Any, optional):
+                    Largest accepted value.
+        """
+        if isinstance( types, type ):
+            types = ( types, )
+        self.types: Optional[Tuple[Type, ...]] = types
+        self.required = required
+        self.nullable = nullable
+        self.choices = frozenset( choices ) if choices != None else None
+        self.min = min
+        self.max = max
+
+    def check(self, value: Any) -> Optional[str]:
+        """ Returns what is wrong with value, None if it is valid.
+        """
+        if value is _MISSING:
+            return 'is required' if self.required else None
+        if value is None and self.nullable:
+            return None
+        if self.types != None and ( not isinstance( value, self.types ) or ( type( value ) is bool and bool not in self.types ) ):
+            return 'expected {}, got {}'.format( ' or '.join( t.__name__ for t in self.types ), type( value ).__name__ )
+        try:
+            if self.choices != None and value not in self.choices:
+                return 'expected one of {}, got {!r}'.format( sorted( self.choices, key = repr ), value )
+            if self.min != None and value < self.min:
+                return 'expected at least {!r}, got {!r}'.format( self.min, value )
+            if self.max != None and value > self.max:
+                return 'expected at most {!r}, got {!r}'.format( self.max, value )
+        except TypeError as e:
+            return str( e )
+        return None
+
+
+class Schema:
+    """
+    Fields of a config subtree keyed by dotted path, validated with validate().
+    The fields are compiled into a validator on first use, and the values of each config which passed are
+    remembered, so validating configs with the same values again only reads them.
+    """
+    def __init__(self, fields: Dict[str, Field], prefix: str = ''):
+        r""" Creates a schema.
+            Args:
+                fields (Dict[str, Field]):
+                    Field of each value, keyed by dotted path below prefix.
+                prefix (str):
+                    Dotted path of the subtree, '' for the whole config. The subtree is required unless empty.
+        """
+        self.fields = dict( fields )
+        self.prefix = prefix
+        self._validator: Optional[Callable[[Any], None]] = None
+        self._lock = threading.Lock()
+
+    def validate(self, _config: Any):
+        r""" Checks a config against the schema.
+            Args:
+                _config (Union[Config, FrozenConfig]):
+                    Config holding the subtree under prefix.
+            Raises:
+                InvalidConfig:
+                    Raised with every problem found if the config does not match.
+        """
+        validator = self._validator
+        if validator == None:
+            validator = self.compile()
+        validator( _config )
+
+    def compile(self) -> Callable[[Any], None]:
+        r""" Compiles the fields into a validator.
+            Returns:
+                validator (Callable[[Union[Config, FrozenConfig]], None]):
+                    Raises InvalidConfig if the config passed does not match.
+        """
+        with self._lock:
+            if self._validator != None:
+                return self._validator
+            prefix_keys = tuple( self.prefix.split('.') ) if self.prefix else ()
+            paths = tuple( self.fields )
+            keys = tuple( tuple( path.split('.') ) for path in paths )
+            fields = tuple( self.fields[path] for path in paths )
+            # Fingerprints of the values which passed.
+            valid: Dict[Tuple[Any, ...], bool] = {}
+            subtree_name = self.prefix or 'config'
+
+            def validator( _config: Any ):
+                subtree = _lookup( _config, prefix_keys )
+                if subtree is _MISSING or not hasattr( subtree, 'get' ):
+                    raise InvalidConfig( 'Invalid config: {} is missing'.format( subtree_name ) )
+                values = tuple( _lookup( subtree, path_keys ) for path_keys in keys )
+                # Types are part of the fingerprint, 1 and True hash alike.
+                fingerprint = values + tuple( map( type, values ) )
+                try:
+                    if fingerprint in valid:
+                        return
+                except TypeError:
+                    # Unhashable values are validated every time.
+                    fingerprint = None
+
+                errors = []
+                for path, field, value in zip( paths, fields, values ):
+                    error = field.check( value )
+                    if error != None:
+                        errors.append( '{}: {}'.format( _join( self.prefix, path ), error ) )
+                if errors:
+                    raise InvalidConfig( 'Invalid config, {}'.format( ', '.join( errors ) ) )
+                if fingerprint != None:
+                    if len( valid ) >= _MEMO_SIZE:
+                        valid.clear()
+                    valid[fingerprint] = True
+
+            self._validator = validator
+            return validator
+
+
+def _lookup( node: Any, keys: Tuple[str, ...] ) -> Any:
+    """ Returns the value under keys, _MISSING if there is none. Reads configs without detaching copy-on-write values.
+    """
+    for key in keys:
+        if isinstance( node, dict ):
+            node = dict.get( node, key, _MISSING )
+        elif isinstance( node, frozen_impl.FrozenConfig ):
+            node = node.get( key, _MISSING )
+        else:
+            return _MISSING
+        if node is _MISSING:
+            return _MISSING
+    return node
+
+def _join( prefix: str, path: str ) -> str:
+    return prefix + '.' + path if prefix else path
@@ -0,0 +1,128 @@
+"""
+A config shared between threads, read through immutable snapshots while writers publish new versions.
+"""
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import threading
+from contextlib import contextmanager
+from copy import deepcopy
+from typing import Any, Dict, Iterator, Optional
+
+from . import config_impl, frozen_impl, merge_impl
+
+class SharedConfig:
+    """
+    Config read by many threads while others update it, read-copy-update style.
+
+    Readers take snapshot(), an immutable FrozenConfig which stays consistent however long they hold it,
+    without taking a lock. Writers are serialized and change a private working config, which is frozen
+    and published by swapping a single reference once the write completes. Sub-configs the write did not
+    touch keep their frozen views, so publishing costs the size of the change, not of the config.
+    """
+    def __init__(self, _config: Optional['config_impl.Config'] = None):
+        r""" Shares a config.
+            Args:
+                _config (config_impl.Config, optional):
+                    Initial contents, copied. Defaults to an empty config.
+        """
+        # Only ever touched under the lock, readers see its frozen views.
+        self._config = deepcopy( _config ) if _config != None else config_impl.Config()
+        self._snapshot = self._config.freeze()
+        self._version = 0
+        self._lock = threading.Lock()
+        # Thread holding the lock, so a write block calling back into this config fails instead of deadlocking.
+        self._owner: Optional[int] = None
+
+    @property
+    def version(self) -> int:
+        """ Number of writes published so far.
+        """
+        return self._version
+
+    def snapshot(self) -> 'frozen_impl.FrozenConfig':
+        """ Returns the latest published version, it never changes. Take one per unit of work and read from it.
+        """
+        return self._snapshot
+
+    def copy(self) -> 'config_impl.Config':
+        """ Returns a mutable copy of the latest published version.
+        """
+        with self._locked():
+            return self._config.copy()
+
+    @contextmanager
+    def write(self) -> Iterator['config_impl.Config']:
+        r""" Serializes writers and publishes what they change.
+            Yields:
+                draft (config_impl.Config):
+                    The working config to change in place. Its changes are published when the block exits,
+                    and rolled back if the block raises. Do not keep it past the block.
+                    Snapshots share leaf values with it, assign new lists and dicts instead of changing them in place.
+            Raises:
+                RuntimeError:
+                    Raised if the block calls write() or copy() of this SharedConfig again, writes do not nest.
+        """
+        with self._locked():
+            # Copy-on-write, so only what the block changes is copied. Keeps the config's class and its own leaves.
+            backup = self._config.copy()
+            try:
+                yield self._config
+            except BaseException:
+                self._config = backup
+                raise
+            snapshot = self._config.freeze()
+            # Readers load this reference once per snapshot, the swap is atomic.
+            self._snapshot = snapshot
+            self._version += 1
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """ Holds the writer lock.
+        """
+        if self._owner == threading.get_ident():
+            raise RuntimeError( 'SharedConfig.write() blocks cannot call write() or copy() of the same SharedConfig' )
+        with self._lock:
+            self._owner = threading.get_ident()
+            try:
+                yield
+            finally:
+                self._owner = None
+
+    def update_with_kwargs(self, kwargs: Dict[str, Any]):
+        """ Sets the top level values in kwargs and publishes them, see Config.update_with_kwargs.
+        """
+        with self.write() as draft:
+            draft.update_with_kwargs( kwargs )
+
+    def set_path(self, path: str, value: Any):
+        """ Stores value under a dotted path and publishes it, see Config.set_path.
+        """
+        with self.write() as draft:
+            draft.set_path( path, value )
+
+    def merge(self, *others: Any) -> 'merge_impl.ChangeSet':
+        """ Merges configs or dicts and publishes the result, see Config.merge.
+        """
+        with self.write() as draft:
+            return draft.merge( *others )
+
+    def apply_patch(self, patch: 'merge_impl.Patch') -> 'merge_impl.ChangeSet':
+        """ Applies a patch and publishes the result, see Config.apply_patch.
+        """
+        with self.write() as draft:
+            return draft.apply_patch( patch )
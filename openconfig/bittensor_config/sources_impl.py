@@ -0,0 +1,166 @@
+"""
+Layered resolution of config values, defaults < file < environment < command line, recording where each value came from.
+"""
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import os
+from typing import Any, Callable, Dict, Mapping, Optional, Set, Tuple
+
+# Sources of a value, from the lowest precedence to the highest.
+DEFAULT = 'default'
+FILE = 'file'
+ENV = 'env'
+CLI = 'cli'
+SOURCES = ( DEFAULT, FILE, ENV, CLI )
+
+class Environment:
+    """
+    Snapshot of the environment variables, with the variables under a prefix indexed on first use.
+    """
+    def __init__(self, environ: Optional[Mapping[str, str]] = None):
+        self._vars: Dict[str, str] = dict( os.environ if environ == None else environ )
+        # Copy of the mapping behind os.environ when the snapshot was taken, see is_current().
+        self._raw: Optional[Dict[Any, Any]] = dict( _raw_environ() ) if environ == None else None
+        # ( prefix, ignore_case ) -> { name without the prefix: value }
+        self._prefixes: Dict[Tuple[str, bool], Dict[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len( self._vars )
+
+    def is_current(self) -> bool:
+        """ Returns true if no variable of os.environ was set, changed or removed since the snapshot was taken.
+        """
+        # Unchanged values are the same objects, so this is one pass of identity checks.
+        return self._raw == _raw_environ()
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """ Returns the value of the variable name, or default if it was not set.
+        """
+        return self._vars.get( name, default )
+
+    def with_prefix(self, prefix: str, ignore_case: bool = False) -> Dict[str, str]:
+        r""" Returns the variables whose names start with prefix, keyed by the rest of their name.
+            Args:
+                prefix (str):
+                    Prefix of the names, for example 'BT_WALLET_'.
+                ignore_case (bool):
+                    If True, names are matched and returned upper cased.
+            Returns:
+                variables (Dict[str, str]):
+                    Values keyed by name without the prefix, in environment order. Do not modify.
+        """
+        key = ( prefix, ignore_case )
+        variables = self._prefixes.get( key )
+        if variables == None:
+            if ignore_case:
+                prefix = prefix.upper()
+                variables = { name.upper()[len( prefix ):]: value for name, value in self._vars.items() if name.upper().startswith( prefix ) }
+            else:
+                variables = { name[len( prefix ):]: value for name, value in self._vars.items() if name.startswith( prefix ) }
+            self._prefixes[key] = variables
+        return variables
+
+
+_environment: Optional[Environment] = None
+
+def _raw_environ() -> Mapping[Any, Any]:
+    """ Returns the mapping os.environ keeps its variables in, os.environ itself where it has none.
+    """
+    return getattr( os.environ, '_data', os.environ )
+
+def environment() -> Environment:
+    r""" Returns the process wide snapshot of the environment, taken again whenever os.environ changed since.
+        Returns:
+            environment (Environment):
+                Snapshot of os.environ.
+    """
+    global _environment
+    snapshot = _environment
+    if snapshot == None or not snapshot.is_current():
+        snapshot = _environment = Environment()
+    return snapshot
+
+def refresh_environment() -> Environment:
+    """ Takes a new snapshot of the environment and returns it.
+    """
+    global _environment
+    _environment = Environment()
+    return _environment
+
+def env_key( dest: str ) -> str:
+    """ Returns the environment variable name of a destination without its prefix, 'wallet.name' is WALLET_NAME.
+    """
+    return dest.upper().replace( '.', '_' ).replace( '-', '_' )
+
+def resolve(
+        values: Dict[str, Any],
+        explicit: Set[str],
+        file: Optional[Dict[str, Any]] = None,
+        env_prefix: Optional[str] = None,
+        convert: Optional[Callable[[str, Any], Any]] = None,
+        exclude: Optional[Set[str]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    r""" Resolves every destination through the layers in one pass, the highest layer holding a value wins.
+        Args:
+            values (Dict[str, Any]):
+                Parsed values keyed by destination, parser defaults for those not set on the command line.
+            explicit (Set[str]):
+                Destinations set on the command line.
+            file (Dict[str, Any], optional):
+                Values loaded from the config file, keyed by destination.
+            env_prefix (str, optional):
+                If set, the variable env_prefix + env_key( dest ) overrides the file and the defaults for dest.
+            convert (Callable[[str, Any], Any], optional):
+                Converts a string from the file or the environment to the type of its destination.
+            exclude (Set[str], optional):
+                Destinations the environment does not set, such as config() reads itself.
+        Returns:
+            values (Dict[str, Any]):
+                Resolved values keyed by destination, file keys no parser destination knows included.
+            sources (Dict[str, str]):
+                Source of each value, one of SOURCES, keyed by destination.
+    """
+    env = environment().with_prefix( env_prefix ) if env_prefix else {}
+    file = file or {}
+    exclude = exclude or ()
+    resolved = {}
+    sources = {}
+    for dest, value in values.items():
+        source = DEFAULT
+        if dest in explicit:
+            source = CLI
+        elif env and env_key( dest ) in env and dest not in exclude:
+            try:
+                value = convert( dest, env[env_key( dest )] ) if convert else env[env_key( dest )]
+            except Exception as e:
+                raise ValueError( 'Invalid value in environment variable {}: {}'.format( env_prefix + env_key( dest ), e ) )
+            source = ENV
+        elif dest in file:
+            value = file[dest]
+            if convert and isinstance( value, str ):
+                value = convert( dest, value )
+            source = FILE
+        resolved[dest] = value
+        sources[dest] = source
+
+    # Keys of the file no argument knows about, config() has always kept them.
+    for dest, value in file.items():
+        if dest not in resolved:
+            resolved[dest] = value
+            sources[dest] = FILE
+    return resolved, sources
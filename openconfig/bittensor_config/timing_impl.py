@@ -0,0 +1,201 @@
+"""
+Opt-in timing of the phases of config(), reported to pluggable sinks.
+"""
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from . import sources_impl
+
+# Enables timing for the whole process: '1' or 'stderr' writes JSON lines to stderr, 'log' logs them,
+# any other value is the path of a JSON lines file to append to. Unset, empty or '0' disables it.
+# Read from the environment snapshot, see sources_impl.environment().
+TIMING_ENV = 'BT_CONFIG_TIMING'
+
+class Timings:
+    """
+    Time spent in each phase of one config() call.
+    """
+    __slots__ = ( 'phases', 'total', 'timestamp' )
+
+    def __init__(self, phases: Dict[str, float], total: float, timestamp: float):
+        # Phase name -> seconds, in the order the phases ran. Phases which did not run are missing.
+        self.phases = phases
+        # Seconds from the start of the call to the end of its last phase.
+        self.total = total
+        # Wall clock time the call started at, as time.time().
+        self.timestamp = timestamp
+
+    def __repr__(self) -> str:
+        return 'Timings({})'.format( ', '.join( '{}={:.6f}'.format( *item ) for item in self.phases.items() ) )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """ Returns the timings as a JSON serializable dict.
+        """
+        return { 'timestamp': self.timestamp, 'total': self.total, 'phases': dict( self.phases ) }
+
+
+Sink = Callable[[Timings], None]
+
+class LoggingSink:
+    """
+    Logs the timings of each call on one line.
+    """
+    def __init__(self, logger: Optional[Any] = None, level: Optional[int] = None):
+        r""" Creates the sink.
+            Args:
+                logger (logging.Logger, optional):
+                    Logger to use, defaults to the 'bittensor_config' logger.
+                level (int, optional):
+                    Level to log at, defaults to logging.INFO.
+        """
+        # logging is only imported by processes which log timings.
+        import logging
+        self.logger = logger if logger != None else logging.getLogger( 'bittensor_config' )
+        self.level = level if level != None else logging.INFO
+
+    def __call__(self, timings: Timings):
+        self.logger.log( self.level, 'config() took %.2f ms: %s', timings.total * 1e3,
+            ', '.join( '{} {:.2f} ms'.format( name, seconds * 1e3 ) for name, seconds in timings.phases.items() ) )
+
+
+class JsonLinesSink:
+    """
+    Writes the timings of each call as one JSON object per line, see Timings.to_dict().
+    """
+    def __init__(self, target: Union[str, IO[str]]):
+        r""" Creates the sink.
+            Args:
+                target (Union[str, IO[str]]):
+                    Path of the file to append to, or an open text stream.
+        """
+        self.target = target
+        self._lock = threading.Lock()
+
+    def __call__(self, timings: Timings):
+        line = json.dumps( timings.to_dict() ) + '\n'
+        with self._lock:
+            if isinstance( self.target, str ):
+                # A single append per line, processes sharing the file do not interleave.
+                with open( os.path.expanduser( self.target ), 'a' ) as f:
+                    f.write( line )
+            else:
+                self.target.write( line )
+                self.target.flush()
+
+
+class Timer:
+    """
+    Records the phases of one config() call, created by start() only while timing is enabled.
+    """
+    __slots__ = ( 'sinks', 'phases', 'timestamp', '_start', '_last' )
+
+    def __init__(self, sinks: Tuple[Sink, ...]):
+        self.sinks = sinks
+        self.phases: Dict[str, float] = {}
+        self.timestamp = time.time()
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, phase: str):
+        """ Ends phase, which started when the previous phase ended.
+        """
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get( phase, 0.0 ) + now - self._last
+        self._last = now
+
+    def finish(self):
+        """ Delivers the timings to the sinks. Errors in a sink are printed, never raised into config().
+        """
+        timings = Timings( self.phases, self._last - self._start, self.timestamp )
+        for sink in self.sinks:
+            try:
+                sink( timings )
+            except Exception as e:
+                print('Error in config timing sink: {}'.format(e))
+
+
+# Sinks enabled by timing() in the current thread or task.
+_sinks: contextvars.ContextVar = contextvars.ContextVar( 'bittensor_config_timing_sinks', default = () )
+
+# Environment snapshot and value of TIMING_ENV the sink below was made for.
+_env_snapshot: Optional['sources_impl.Environment'] = None
+_env_value: Optional[str] = None
+_env_sink: Optional[Sink] = None
+
+def start() -> Optional[Timer]:
+    r""" Starts timing a config() call.
+        Returns:
+            timer (Optional[Timer]):
+                None unless timing is enabled, by TIMING_ENV or timing().
+    """
+    sinks = _sinks.get()
+    env_sink = _environment_sink()
+    if env_sink != None:
+        sinks = sinks + ( env_sink, )
+    if not sinks:
+        return None
+    return Timer( sinks )
+
+@contextmanager
+def timing( sink: Optional[Sink] = None ) -> Iterator[List[Timings]]:
+    r""" Times the config() calls made in the block, by this thread or task.
+        Args:
+            sink (Callable[[Timings], None], optional):
+                Also called with the timings of each call, for example a LoggingSink or JsonLinesSink.
+        Yields:
+            timings (List[Timings]):
+                Timings of the calls made so far in the block.
+    """
+    collected: List[Timings] = []
+    def collect( timings: Timings ):
+        collected.append( timings )
+        if sink != None:
+            sink( timings )
+    token = _sinks.set( _sinks.get() + ( collect, ) )
+    try:
+        yield collected
+    finally:
+        _sinks.reset( token )
+
+def _environment_sink() -> Optional[Sink]:
+    """ Returns the sink TIMING_ENV asks for, made again only when the variable changes.
+    """
+    global _env_snapshot, _env_value, _env_sink
+    snapshot = sources_impl.environment()
+    if snapshot is _env_snapshot:
+        return _env_sink
+    _env_snapshot = snapshot
+    value = snapshot.get( TIMING_ENV )
+    if value != _env_value:
+        if not value or value == '0':
+            sink = None
+        elif value in ( '1', 'stderr' ):
+            sink = JsonLinesSink( sys.stderr )
+        elif value == 'log':
+            sink = LoggingSink()
+        else:
+            sink = JsonLinesSink( value )
+        _env_value, _env_sink = value, sink
+    return _env_sink
@@ -0,0 +1,291 @@
+"""
+Reloads --config files into a live Config when they change, notifying subscribers per dotted path.
+"""
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import config_impl, loader_impl, merge_impl, sources_impl
+
+Callback = Callable[['config_impl.Config', 'merge_impl.ChangeSet'], None]
+
+class ConfigWatcher:
+    """
+    Watches YAML config files and merges them into a live Config whenever they change.
+    Values set on the command line or by environment variables keep precedence over the files, as they do in config().
+    Keys removed from a file keep their last value.
+
+    Changes are picked up by calling poll(), or in the background after start(). The background thread
+    waits on inotify where the platform has it and otherwise polls the files every poll_interval seconds.
+    Subscribers run on the thread which picked up the change.
+    """
+    def __init__(
+            self,
+            _config: 'config_impl.Config',
+            paths: Optional[Iterable[str]] = None,
+            poll_interval: float = 1.0,
+            use_inotify: Optional[bool] = None
+        ):
+        r""" Creates a watcher for a live config.
+            Args:
+                _config (config_impl.Config):
+                    Config the files are merged into.
+                paths (Iterable[str], optional):
+                    Files to watch. Defaults to the --config file the config was loaded with, if any.
+                poll_interval (float):
+                    Seconds between checks when polling, and the longest stop() waits for the background thread.
+                use_inotify (bool, optional):
+                    Whether to wait on inotify. Defaults to True where it is available.
+        """
+        self.config = _config
+        self.poll_interval = poll_interval
+        self.use_inotify = sys.platform.startswith('linux') if use_inotify == None else use_inotify
+        # realpath -> identity of the file when it was last merged, None while it is missing.
+        self._files: Dict[str, Optional[Tuple[int, int, int]]] = {}
+        self._subscribers: List[Tuple[str, Callback]] = []
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._inotify: Optional[_Inotify] = None
+
+        if paths == None:
+            paths = []
+            if isinstance( _config.get( 'config' ), str ):
+                # Resolved as config() resolves --config.
+                paths.append( os.path.expanduser( str( os.getcwd() ) + '/' + _config.get( 'config' ) ) )
+        for path in paths:
+            self.add_file( path )
+
+    def __enter__(self) -> 'ConfigWatcher':
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def add_file(self, path: str):
+        """ Starts watching path. The config is assumed to hold its current contents already.
+        """
+        realpath = os.path.realpath( path )
+        with self._lock:
+            self._files[realpath] = _identity( realpath )
+            if self._inotify != None:
+                try:
+                    self._inotify.add_directory( os.path.dirname( realpath ) )
+                except OSError:
+                    pass
+
+    def subscribe(self, path: str, callback: Callback) -> Callback:
+        r""" Registers callback to run after a reload changed any leaf at or below path.
+            Args:
+                path (str):
+                    Dotted path of the subtree to follow, '' follows the whole config.
+                callback (Callable[[Config, ChangeSet], None]):
+                    Called with the config and the changes of the reload.
+            Returns:
+                callback (Callable[[Config, ChangeSet], None]):
+                    The passed callback, so subscribe can be used as a decorator.
+        """
+        with self._lock:
+            self._subscribers.append( ( path, callback ) )
+        return callback
+
+    def unsubscribe(self, path: str, callback: Callback):
+        """ Removes a callback registered with subscribe().
+        """
+        with self._lock:
+            self._subscribers.remove( ( path, callback ) )
+
+    def poll(self) -> 'merge_impl.ChangeSet':
+        r""" Reloads every watched file which changed since it was last merged.
+            Returns:
+                changes (merge_impl.ChangeSet):
+                    Every leaf the reloads added or changed.
+        """
+        return self._check( list( self._files ) )
+
+    def start(self) -> 'ConfigWatcher':
+        """ Starts picking up changes in a background daemon thread.
+        """
+        if self._thread == None:
+            self._stop.clear()
+            self._thread = threading.Thread( target = self._run, name = 'ConfigWatcher', daemon = True )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """ Stops the background thread, waiting for it to finish.
+        """
+        if self._thread != None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        inotify = None
+        if self.use_inotify:
+            try:
+                inotify = _Inotify()
+                with self._lock:
+                    for directory in { os.path.dirname( realpath ) for realpath in self._files }:
+                        inotify.add_directory( directory )
+                    self._inotify = inotify
+            except OSError:
+                if inotify != None:
+                    inotify.close()
+                inotify = None
+        try:
+            # Changes made before the watch was in place.
+            self.poll()
+            while not self._stop.is_set():
+                if inotify != None:
+                    changed = inotify.read( self.poll_interval )
+                    self._check( list( self._files ) if changed == None else [ path for path in changed if path in self._files ] )
+                elif not self._stop.wait( self.poll_interval ):
+                    self.poll()
+        finally:
+            if inotify != None:
+                with self._lock:
+                    self._inotify = None
+                inotify.close()
+
+    def _check(self, realpaths: List[str]) -> 'merge_impl.ChangeSet':
+        """ Reloads the files in realpaths which changed, then notifies the subscribers once.
+        """
+        with self._lock:
+            added, removed, changed = set(), set(), set()
+            for realpath in realpaths:
+                identity = _identity( realpath )
+                if identity == None or identity == self._files.get( realpath ):
+                    continue
+                changes = self._reload( realpath )
+                self._files[realpath] = identity
+                if changes != None:
+                    added |= changes.added
+                    removed |= changes.removed
+                    changed |= changes.changed
+            changes = merge_impl.ChangeSet( added, removed, changed )
+            if changes:
+                self._notify( changes )
+            return changes
+
+    def _reload(self, realpath: str) -> Optional['merge_impl.ChangeSet']:
+        """ Merges the current contents of the file into the config.
+        """
+        try:
+            contents = loader_impl.load_config_file( realpath )
+        except Exception as e:
+            print('Error in reloading: {} keeping the previous config'.format(e))
+            return None
+        if not isinstance( contents, dict ):
+            return None
+        is_set = self.config.get( '__is_set' ) or {}
+        sources = self.config.get( '__sources' )
+        values = {
+            path: value for path, value in merge_impl.fold( self.config, [ contents ] ).items()
+                if not is_set.get( path ) and ( sources == None or sources.get( path ) not in ( sources_impl.ENV, sources_impl.CLI ) )
+        }
+        changes = merge_impl.apply( self.config, values, () )
+        if sources != None:
+            sources.update( ( path, sources_impl.FILE ) for path in values )
+        return changes
+
+    def _notify(self, changes: 'merge_impl.ChangeSet'):
+        for path, callback in list( self._subscribers ):
+            if changes.affects( path ):
+                try:
+                    callback( self.config, changes )
+                except Exception as e:
+                    print('Error in config subscriber for {}: {}'.format( path or 'config', e ))
+
+
+def _identity( realpath: str ) -> Optional[Tuple[int, int, int]]:
+    """ Returns what identifies the current version of a file, None if it is missing.
+    """
+    try:
+        file_stat = os.stat( realpath )
+    except OSError:
+        return None
+    return ( file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size )
+
+
+class _Inotify:
+    """
+    Minimal inotify binding through libc, watching directories so files replaced by a rename are seen as well.
+    """
+    _IN_ATTRIB = 0x00000004
+    _IN_CLOSE_WRITE = 0x00000008
+    _IN_MOVED_TO = 0x00000080
+    _IN_CREATE = 0x00000100
+    _IN_Q_OVERFLOW = 0x00004000
+    # Writes are picked up once the writer closes the file, not halfway through.
+    _MASK = _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+    # struct inotify_event { int wd; uint32_t mask; uint32_t cookie; uint32_t len; char name[]; }
+    _EVENT = struct.Struct( 'iIII' )
+
+    def __init__(self):
+        try:
+            libc = ctypes.CDLL( ctypes.util.find_library( 'c' ), use_errno = True )
+            init = libc.inotify_init1
+        except ( OSError, AttributeError ) as e:
+            raise OSError( 'inotify is not available: {}'.format( e ) )
+        fd = init( os.O_NONBLOCK | os.O_CLOEXEC )
+        if fd < 0:
+            raise OSError( ctypes.get_errno(), 'inotify_init1 failed' )
+        self._libc = libc
+        self.fd = fd
+        # watch descriptor -> directory
+        self._directories: Dict[int, str] = {}
+
+    def add_directory(self, directory: str):
+        wd = self._libc.inotify_add_watch( self.fd, os.fsencode( directory ), self._MASK )
+        if wd < 0:
+            raise OSError( ctypes.get_errno(), 'inotify_add_watch failed for {}'.format( directory ) )
+        self._directories[wd] = directory
+
+    def read(self, timeout: float) -> Optional[List[str]]:
+        """ Waits up to timeout seconds for events, returning the paths they name or None if events were lost.
+        """
+        ready, _, _ = select.select( [ self.fd ], [], [], timeout )
+        if not ready:
+            return []
+        try:
+            data = os.read( self.fd, 64 * 1024 )
+        except BlockingIOError:
+            return []
+        paths = []
+        offset = 0
+        while offset + self._EVENT.size <= len( data ):
+            wd, mask, _, length = self._EVENT.unpack_from( data, offset )
+            name = data[ offset + self._EVENT.size : offset + self._EVENT.size + length ].rstrip( b'\0' )
+            offset += self._EVENT.size + length
+            if mask & self._IN_Q_OVERFLOW:
+                return None
+            directory = self._directories.get( wd )
+            if directory != None and name:
+                paths.append( os.path.join( directory, os.fsdecode( name ) ) )
+        return paths
+
+    def close(self):
+        os.close( self.fd )
@@ -17,12 +17,27 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
+import copy
+import json
+import os
+import pickle
 import pytest
+import subprocess
+import sys
+import tempfile
+import threading
 import unittest
+from typing import List, Tuple
+from unittest.mock import patch
 
 import argparse
+import yaml
+from copy import deepcopy
 
-from bittensor_config import Config, config
+from bittensor_config import Argument, ArgumentRegistry, Config, ConfigWatcher, DefaultConfig, Deferred, Field, InterpolationError, InvalidConfig, Schema, config, timing
+from bittensor_config import handoff_impl, loader_impl, timing_impl
+from bittensor_config.config_impl import PathLayout
+import bittensor_config as bittensor_config_module
 
 class TestConfig(unittest.TestCase):
 
@@ -67,6 +82,1080 @@ class TestConfig(unittest.TestCase):
         with pytest.raises(SystemExit):
             config( parser, strict=True, args=incorrect_args + ["--strict"] )
 
-        
+
+    def _is_set_parser(self) -> argparse.ArgumentParser:
+        """ Returns a parser with options, a flag and a run sub-command. """
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--neuron.name", default="default")
+        parser.add_argument("--neuron.port", type=int, default=8091)
+        parser.add_argument("--flag", action='store_true')
+        subparsers = parser.add_subparsers(dest='command')
+        run_parser = subparsers.add_parser('run')
+        run_parser.add_argument("--run.steps", type=int, default=10)
+        run_parser.add_argument("--run.mode", default="fast")
+        return parser
+
+    def test_is_set(self):
+        _config = config( self._is_set_parser(), args=["--neuron.name", "default", "run", "--run.steps", "10"] )
+        assert _config.neuron.name == "default"
+        assert _config.neuron.port == 8091
+        assert _config.run.steps == 10
+        assert _config.run.mode == "fast"
+        # Values equal to their defaults still count as set when passed.
+        assert _config.is_set("neuron.name")
+        assert _config.is_set("run.steps")
+        assert _config.is_set("command")
+        assert not _config.is_set("neuron.port")
+        assert not _config.is_set("run.mode")
+        assert not _config.is_set("flag")
+
+    def test_is_set_without_command(self):
+        _config = config( self._is_set_parser(), args=["--flag"] )
+        assert _config.is_set("flag")
+        assert not _config.is_set("command")
+        assert _config.command == None
+
+    def test_is_set_positional_default(self):
+        parser = argparse.ArgumentParser()
+        parser.add_argument("name", nargs='?', default="default")
+
+        assert not config( parser, args=[] ).is_set("name")
+        assert config( parser, args=["other"] ).is_set("name")
+
+    def test_parser_not_modified(self):
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--neuron.name", default="default")
+        subparsers = parser.add_subparsers(dest='command')
+        subparsers.add_parser('run').add_argument("--run.mode", default="fast")
+
+        config( parser, args=["--neuron.name", "other", "run", "--run.mode", "slow"] )
+        _config = config( parser, args=["run"] )
+        assert _config.neuron.name == "default"
+        assert _config.run.mode == "fast"
+        assert _config['__is_set'] == { 'command': True }
+
+    def _frozen(self):
+        """ Returns a config with wallet.name set on the command line, and its frozen view. """
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--wallet.name", default="default")
+        parser.add_argument("--wallet.hotkey", default="default")
+        parser.add_argument("--items", default=3, type=int)
+        _config = config( parser, args=["--wallet.name", "mywallet"] )
+        return _config, _config.freeze()
+
+    def test_freeze(self):
+        _, frozen = self._frozen()
+        assert frozen.wallet.name == "mywallet"
+        assert frozen['wallet']['hotkey'] == "default"
+        assert frozen.does_not_exist == None
+
+    def test_freeze_item_access(self):
+        _, frozen = self._frozen()
+        # Keys shadowing methods stay reachable by item access.
+        assert frozen['items'] == 3
+
+    def test_freeze_is_set(self):
+        _, frozen = self._frozen()
+        assert frozen.is_set("wallet.name")
+        assert not frozen.is_set("wallet.hotkey")
+
+    def test_freeze_is_read_only(self):
+        _, frozen = self._frozen()
+        with pytest.raises(AttributeError):
+            frozen.wallet.name = "other"
+
+    def test_thaw(self):
+        _config, frozen = self._frozen()
+        thawed = frozen.thaw()
+        assert isinstance( thawed, Config )
+        assert thawed == _config
+        thawed.wallet.name = "other"
+        assert frozen.wallet.name == "mywallet"
+
+    def _config_file(self, text: str) -> str:
+        """ Returns the path of a config.yaml holding text, removed after the test. """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup( directory.cleanup )
+        path = os.path.join( directory.name, 'config.yaml' )
+        with open( path, 'w' ) as f:
+            f.write( text )
+        return path
+
+    def _rewrite(self, path: str, text: str):
+        """ Replaces the contents of path, with a newer modification time even on coarse clocks. """
+        with open( path, 'w' ) as f:
+            f.write( text )
+        os.utime( path, ns=( 0, os.stat( path ).st_mtime_ns + 1 ) )
+
+    def test_config_file_cache(self):
+        path = self._config_file( "neuron.name: from_file\nneuron.ports: [1, 2]\n" )
+        loader_impl.clear_cache()
+        with patch( 'yaml.load', wraps=yaml.load ) as mock_load:
+            first = loader_impl.load_config_file( path )
+            second = loader_impl.load_config_file( path )
+            assert mock_load.call_count == 1
+        assert first == second == { 'neuron.name': 'from_file', 'neuron.ports': [1, 2] }
+
+    def test_config_file_cache_returns_copies(self):
+        path = self._config_file( "neuron.name: from_file\nneuron.ports: [1, 2]\n" )
+        loader_impl.clear_cache()
+        loader_impl.load_config_file( path )['neuron.ports'].append( 3 )
+        assert loader_impl.load_config_file( path )['neuron.ports'] == [1, 2]
+
+    def test_config_file_cache_sees_changes(self):
+        path = self._config_file( "neuron.name: from_file\n" )
+        loader_impl.clear_cache()
+        loader_impl.load_config_file( path )
+        self._rewrite( path, "neuron.name: changed\n" )
+        assert loader_impl.load_config_file( path ) == { 'neuron.name': 'changed' }
+
+    def test_config_file_values(self):
+        path = self._config_file( "neuron.name: from_file\n" )
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--neuron.name", default="default")
+        _config = config( parser, args=["--config", os.path.relpath( path )] )
+        assert _config.neuron.name == "from_file"
+        assert not _config.is_set("neuron.name")
+
+    def test_config_file_pickle_cache_skips_yaml(self):
+        path = self._config_file( "neuron.name: from_file\n" )
+        loader_impl.clear_cache()
+        loader_impl.load_config_file( path, pickle_cache=True )
+        # A cold process loads the pickle without parsing the YAML.
+        loader_impl.clear_cache()
+        with patch( 'yaml.load' ) as mock_load:
+            assert loader_impl.load_config_file( path, pickle_cache=True ) == { 'neuron.name': 'from_file' }
+            mock_load.assert_not_called()
+
+    def test_config_file_pickle_cache(self):
+        path = self._config_file( "neuron.name: from_file\n" )
+        loader_impl.clear_cache()
+        assert loader_impl.load_config_file( path, pickle_cache=True ) == { 'neuron.name': 'from_file' }
+        assert os.path.exists( loader_impl.pickle_cache_path( path ) )
+
+    def _cow_source(self) -> Config:
+        source = Config()
+        source.wallet = Config()
+        source.wallet.name = "default"
+        source.neuron = Config()
+        source.neuron.ports = [ 8091 ]
+        return source
+
+    def test_copy_on_write(self):
+        source = self._cow_source()
+        _copy = source.copy()
+        # Nothing below the root is copied until it is reached.
+        assert dict.__getitem__( _copy, 'neuron' ) is dict.__getitem__( source, 'neuron' )
+
+    def test_copy_on_write_copy_writes(self):
+        source = self._cow_source()
+        _copy = source.copy()
+        _copy.wallet.name = "other"
+        _copy.neuron.ports.append( 8092 )
+        assert source.wallet.name == "default"
+        assert source.neuron.ports == [ 8091 ]
+
+    def test_copy_on_write_source_writes(self):
+        source = self._cow_source()
+        _copy = source.copy()
+        source.wallet.name = "changed"
+        assert _copy.wallet.name == "default"
+        assert _copy == _copy.copy()
+
+    def test_copy_on_write_dict_copies(self):
+        # Shallow dict copies of a copy hold its own sub-configs, not the shared ones.
+        def _update( target, _copy ):
+            target.update( _copy )
+            return target
+        escapes = [
+            lambda _copy: dict( _copy ),
+            lambda _copy: { **_copy },
+            lambda _copy: _update( {}, _copy ),
+            lambda _copy: _update( Config(), _copy ),
+        ]
+        source = self._cow_source()
+        for escape in escapes:
+            _copy = source.copy()
+            escape( _copy )['wallet']['name'] = "leak"
+            assert source.wallet.name == "default"
+            assert _copy.wallet.name == "leak"
+
+    def test_copy_on_write_settles(self):
+        source = self._cow_source()
+        _copy = source.copy()
+        _copy.wallet.name = "settled"
+        _copy.items()
+        # A config which shares nothing reads and writes as a plain dict again.
+        assert not _copy._hooked and source.wallet.name == "default"
+
+    def test_deepcopy(self):
+        source = Config()
+        source.wallet = Config()
+        source.wallet.name = "default"
+        source['__is_set'] = { 'wallet.name': True }
+
+        _copy = deepcopy( source )
+        _copy.wallet.name = "other"
+        _copy['__is_set']['wallet.name'] = False
+        assert source.wallet.name == "default"
+        assert source.is_set( 'wallet.name' )
+
+    def _path_config(self) -> Config:
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--neuron.axon.port", type=int, default=8091)
+        parser.add_argument("--neuron.name", type=str, default="miner")
+        parser.add_argument("--netuid", type=int, default=1)
+        return config(parser, args=[])
+
+    def test_get_path(self):
+        bittensor_config = self._path_config()
+        assert bittensor_config.get_path( 'neuron.axon.port' ) == 8091
+        assert bittensor_config.get_path( 'neuron.axon' ) is bittensor_config.neuron.axon
+        assert bittensor_config.get_path( 'neuron.missing', 'x' ) == 'x'
+
+    def test_to_flat_dict(self):
+        assert self._path_config().to_flat_dict() == {
+            'neuron.axon.port': 8091, 'neuron.name': "miner", 'netuid': 1, 'config': None, 'strict': False
+        }
+
+    def test_flat_index_sees_changes_below_the_root(self):
+        bittensor_config = self._path_config()
+        bittensor_config.to_flat_dict()
+        bittensor_config.neuron.axon.port = 9000
+        assert bittensor_config.get_path( 'neuron.axon.port' ) == 9000
+        del bittensor_config.neuron['name']
+        assert 'neuron.name' not in bittensor_config.to_flat_dict()
+
+    def test_set_path(self):
+        bittensor_config = self._path_config()
+        bittensor_config.set_path( 'neuron.axon.ip', '0.0.0.0' )
+        bittensor_config.set_path( 'netuid', 3 )
+        assert bittensor_config.neuron.axon.ip == '0.0.0.0'
+        assert bittensor_config.get_path( 'netuid' ) == 3
+
+    def test_from_flat_dict(self):
+        flat = self._path_config().to_flat_dict()
+        rebuilt = Config.from_flat_dict( flat )
+        assert isinstance( rebuilt.neuron.axon, Config )
+        assert rebuilt.to_flat_dict() == flat
+
+    def test_flat_index_of_a_copy(self):
+        bittensor_config = self._path_config()
+        bittensor_config.to_flat_dict()
+        # A copy indexes its own values.
+        _copy = bittensor_config.copy()
+        _copy.set_path( 'neuron.axon.port', 1 )
+        assert bittensor_config.get_path( 'neuron.axon.port' ) == 8091
+        assert _copy.get_path( 'neuron.axon.port' ) == 1
+
+    def _merged(self):
+        """ Returns a config, and the change set of merging a config and a nested dict into it. """
+        base = Config.from_flat_dict( { 'neuron.axon.port': 8091, 'neuron.name': "miner", 'netuid': 1 } )
+        first = Config.from_flat_dict( { 'neuron.axon.port': 9000, 'wallet.name': "first" } )
+        second = { 'wallet': { 'name': "second", 'hotkey': "default" }, 'netuid': 1, 'neuron': 'replaced' }
+        return base, base.merge( first, second )
+
+    def test_merge(self):
+        base, _ = self._merged()
+        assert base.wallet.name == "second"
+        assert base.wallet.hotkey == "default"
+        assert base.neuron == 'replaced'
+
+    def test_merge_changes(self):
+        _, changes = self._merged()
+        assert changes.added == { 'wallet.name', 'wallet.hotkey', 'neuron' }
+        assert changes.removed == { 'neuron.axon.port', 'neuron.name' }
+        assert changes.changed == set()
+        assert changes.affects( 'wallet' ) and not changes.affects( 'netuid' )
+
+    def test_merge_again_changes_nothing(self):
+        base, _ = self._merged()
+        assert not base.merge( { 'wallet': { 'name': "second", 'hotkey': "default" }, 'netuid': 1, 'neuron': 'replaced' } )
+
+    def _patched(self):
+        """ Returns configs a and b, and the patch from a to b. """
+        a = Config.from_flat_dict( { 'neuron.axon.port': 8091, 'neuron.name': "miner", 'netuid': 1, 'ports': [ 1, 2 ] } )
+        b = Config.from_flat_dict( { 'neuron.axon.port': 9000, 'netuid': 1, 'wallet.name': "default", 'ports': [ 1, 2 ] } )
+        return a, b, a.diff( b )
+
+    def test_diff(self):
+        _, _, patch = self._patched()
+        assert patch.values == { 'neuron.axon.port': 9000, 'wallet.name': "default" }
+        assert patch.removed == ( 'neuron.name', )
+
+    def test_apply_patch(self):
+        a, b, patch = self._patched()
+        changes = a.apply_patch( patch )
+        assert a.to_flat_dict() == b.to_flat_dict()
+        assert changes.added == { 'wallet.name' }
+        assert changes.removed == { 'neuron.name' }
+        assert changes.changed == { 'neuron.axon.port' }
+
+    def test_apply_patch_keeps_the_index(self):
+        a, _, patch = self._patched()
+        a.apply_patch( patch )
+        # The index was kept up to date rather than thrown away.
+        assert a._flat[0] == a._version
+
+    def test_apply_patch_replaces_sub_configs(self):
+        a, _, _ = self._patched()
+        # Sub-configs emptied by a patch are removed, and a leaf may replace a sub-config.
+        changes = a.apply_patch( a.diff( Config.from_flat_dict( { 'neuron': 1 } ) ) )
+        assert a.to_flat_dict() == { 'neuron': 1 }
+        assert 'wallet' not in a
+        assert changes.changed == set() and 'neuron' in changes.added
+
+    def test_merge_empty_mapping(self):
+        a = Config.from_flat_dict( { 'x': 1 } )
+        b = Config()
+        b.w = {}
+        assert a.merge( b ).added == { 'w' } and a.w == {}
+        assert a == Config._merge( Config.from_flat_dict( { 'x': 1 } ), b )
+
+    def test_merge_empty_mapping_into_a_mapping(self):
+        # Nothing is added where a mapping already is.
+        a = Config.from_flat_dict( { 'w.x': 1 } )
+        assert not a.merge( { 'w': {} } ) and a.w.x == 1
+        assert not a.merge( { 'w': {} }, { 'w': { 'x': 1 } } ) and a.w.x == 1
+
+    def test_merge_empty_mapping_after_a_leaf(self):
+        # Unless a source replaced the mapping first.
+        a = Config.from_flat_dict( { 'w.x': 1 } )
+        assert a.merge( { 'w': 2 }, { 'w': {} } ).added == { 'w' } and a.w == {}
+
+    def test_diff_apply_patch_empty_sub_config(self):
+        a = Config.from_flat_dict( { 'x': 1 } )
+        b = Config.from_flat_dict( { 'x': 1 } )
+        b.w = Config()
+        b.set_path( 'v.u', 2 )
+
+        patch = a.diff( b )
+        assert set( patch.values ) == { 'w', 'v.u' }
+        assert a.apply_patch( patch ).added == { 'w', 'v.u' }
+        assert isinstance( a.w, Config ) and a.to_flat_dict() == b.to_flat_dict()
+
+    def test_apply_patch_fills_empty_sub_config(self):
+        a = Config.from_flat_dict( { 'x': 1 } )
+        a.w = Config()
+        assert a.apply_patch( a.diff( Config.from_flat_dict( { 'x': 1, 'w.y': 3 } ) ) ).added == { 'w.y' }
+        assert a.to_flat_dict() == { 'x': 1, 'w.y': 3 }
+
+    def _watched(self):
+        """ Returns the watched config file, its config, the watcher and the changes seen by two subscribers. """
+        path = self._config_file( "neuron.name: from_file\nneuron.port: 1\nwallet:\n  name: default\n" )
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--neuron.name", default="default")
+        parser.add_argument("--neuron.port", type=int, default=0)
+        parser.add_argument("--wallet.name", default="default")
+        _config = config( parser, args=["--config", os.path.relpath( path ), "--neuron.port", "2"] )
+
+        watcher = ConfigWatcher( _config, use_inotify=False )
+        neuron_changes, wallet_changes = [], []
+        watcher.subscribe( 'neuron', lambda _, changes: neuron_changes.append( changes ) )
+        watcher.subscribe( 'wallet', lambda _, changes: wallet_changes.append( changes ) )
+        return path, _config, watcher, neuron_changes, wallet_changes
+
+    def test_watcher_poll(self):
+        _, _config, watcher, neuron_changes, _ = self._watched()
+        assert _config.neuron.name == "from_file"
+        assert not watcher.poll()
+        assert neuron_changes == []
+
+    def test_watcher_poll_reloads(self):
+        path, _config, watcher, _, _ = self._watched()
+        self._rewrite( path, "neuron.name: reloaded\nneuron.port: 3\nwallet:\n  name: default\n" )
+        assert watcher.poll().changed == { 'neuron.name' }
+        assert _config.neuron.name == "reloaded"
+
+    def test_watcher_poll_keeps_command_line_values(self):
+        path, _config, watcher, _, _ = self._watched()
+        self._rewrite( path, "neuron.name: reloaded\nneuron.port: 3\nwallet:\n  name: default\n" )
+        watcher.poll()
+        # Set on the command line, the file does not override it.
+        assert _config.neuron.port == 2
+
+    def test_watcher_poll_notifies_affected_subscribers(self):
+        path, _, watcher, neuron_changes, wallet_changes = self._watched()
+        self._rewrite( path, "neuron.name: reloaded\nneuron.port: 3\nwallet:\n  name: default\n" )
+        watcher.poll()
+        assert len( neuron_changes ) == 1 and wallet_changes == []
+
+    def test_watcher_poll_broken_file(self):
+        path, _config, watcher, _, _ = self._watched()
+        # A broken file keeps the previous config.
+        self._rewrite( path, "neuron.name: [\n" )
+        assert not watcher.poll()
+        assert _config.neuron.name == "from_file"
+
+    @pytest.mark.skipif( not sys.platform.startswith('linux'), reason="inotify is Linux only" )
+    def test_watcher_background(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join( directory, 'config.yaml' )
+            with open( path, 'w' ) as f:
+                f.write( "neuron.name: from_file\n" )
+            _config = Config.from_flat_dict( { 'neuron.name': "from_file" } )
+
+            reloaded = threading.Event()
+            with ConfigWatcher( _config, paths=[ path ], poll_interval=0.05 ) as watcher:
+                watcher.subscribe( 'neuron.name', lambda *_: reloaded.set() )
+                # Replaced by a rename, as editors do.
+                with open( path + '.tmp', 'w' ) as f:
+                    f.write( "neuron.name: reloaded\n" )
+                os.replace( path + '.tmp', path )
+                assert reloaded.wait( 5 )
+            assert _config.neuron.name == "reloaded"
+
+    def _serialized(self) -> Config:
+        """ Returns a parsed config with a name and a list of ports. """
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--neuron.name", default="miner")
+        parser.add_argument("--neuron.ports", type=int, nargs='+', default=[1, 2])
+        return config(parser, args=["--neuron.name", "validator"])
+
+    def test_serialization_cache(self):
+        bittensor_config = self._serialized()
+        expected = bittensor_config.toDict()
+        expected.pop( '__is_set' )
+        expected.pop( '__sources' )
+        assert str( bittensor_config ) == "\n" + yaml.dump( expected )
+
+    def test_serialization_cache_reused(self):
+        bittensor_config = self._serialized()
+        str( bittensor_config )
+        with patch( 'yaml.dump', wraps=yaml.dump ) as mock_dump:
+            assert str( bittensor_config ) == repr( bittensor_config )
+            mock_dump.assert_not_called()
+
+    def test_serialization_cache_sees_changes(self):
+        bittensor_config = self._serialized()
+        str( bittensor_config )
+        # Changes below the root and in place changes to lists are picked up.
+        bittensor_config.neuron.name = "miner"
+        assert "name: miner" in str( bittensor_config )
+        bittensor_config.neuron.ports.append( 3 )
+        assert "- 3" in str( bittensor_config )
+
+    def test_to_json(self):
+        bittensor_config = self._serialized()
+        assert json.loads( bittensor_config.to_json() ) == { 'neuron': { 'name': "validator", 'ports': [1, 2] }, 'config': None, 'strict': False }
+
+    def test_to_bytes(self):
+        bittensor_config = self._serialized()
+        rebuilt = Config.from_bytes( bittensor_config.to_bytes() )
+        assert rebuilt.to_flat_dict() == bittensor_config.to_flat_dict()
+        assert rebuilt.is_set( 'neuron.name' )
+
+    def test_from_bytes_invalid(self):
+        with pytest.raises( ValueError ):
+            Config.from_bytes( b'not a config' )
+
+    def _sources_parser(self) -> argparse.ArgumentParser:
+        """ Returns a parser with a string, an int and a flag option. """
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--neuron.name", default="default")
+        parser.add_argument("--neuron.port", type=int, default=0)
+        parser.add_argument("--neuron.ip", default="127.0.0.1")
+        parser.add_argument("--neuron.debug", action="store_true")
+        return parser
+
+    def _sourced(self, env_prefix: str = 'BT_') -> Config:
+        """ Returns a config with a value from each of the command line, the environment, the file and the defaults. """
+        path = self._config_file( "neuron.name: from_file\nneuron.port: 1\nneuron.ip: 0.0.0.0\n" )
+        args = ["--config", os.path.relpath( path ), "--neuron.name", "from_cli"]
+        with patch.dict( os.environ, { 'BT_NEURON_NAME': 'from_env', 'BT_NEURON_PORT': '2' } ):
+            return config( self._sources_parser(), args=args, env_prefix=env_prefix )
+
+    def test_sources(self):
+        _config = self._sourced()
+        assert _config.neuron.name == "from_cli" and _config.source_of( 'neuron.name' ) == 'cli'
+        assert _config.neuron.port == 2 and _config.source_of( 'neuron.port' ) == 'env'
+        assert _config.neuron.ip == "0.0.0.0" and _config.source_of( 'neuron.ip' ) == 'file'
+        assert _config.neuron.debug == False and _config.source_of( 'neuron.debug' ) == 'default'
+        assert _config.is_set( 'neuron.name' ) and not _config.is_set( 'neuron.port' )
+
+    def test_sources_without_prefix(self):
+        # Without a prefix the environment is not consulted.
+        _config = self._sourced( env_prefix=None )
+        assert _config.neuron.port == 1 and _config.source_of( 'neuron.port' ) == 'file'
+
+    def test_sources_missing(self):
+        assert self._sourced().source_of( 'neuron.missing' ) == None
+
+    def test_sources_kept(self):
+        _config = self._sourced()
+        assert _config.freeze().source_of( 'neuron.port' ) == 'env'
+        assert Config.from_bytes( _config.to_bytes() ).source_of( 'neuron.ip' ) == 'file'
+
+    def test_sources_hidden(self):
+        assert '__sources' not in str( self._sourced() )
+
+    def test_sources_invalid_environment_value(self):
+        with patch.dict( os.environ, { 'BT_NEURON_PORT': 'not a port' } ):
+            with pytest.raises( SystemExit ):
+                config( self._sources_parser(), args=[], env_prefix='BT_' )
+
+    def test_sources_environment_changes(self):
+        parser = self._sources_parser()
+        # Changed, removed and added variables are seen even when the number of variables stays the same.
+        with patch.dict( os.environ, { 'BT_NEURON_PORT': '3' } ):
+            assert config( parser, args=[], env_prefix='BT_' ).neuron.port == 3
+            os.environ['BT_NEURON_PORT'] = '4'
+            assert config( parser, args=[], env_prefix='BT_' ).neuron.port == 4
+            del os.environ['BT_NEURON_PORT']
+            os.environ['BT_NEURON_NAME'] = 'added'
+            _config = config( parser, args=[], env_prefix='BT_' )
+            assert _config.neuron.port == 0 and _config.neuron.name == 'added'
+
+    def test_sources_leave_config_and_strict_to_the_command_line(self):
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--neuron.name", default="default")
+        with patch.dict( os.environ, { 'BT_CONFIG': 'nope.yaml', 'BT_STRICT': '1', 'BT_NEURON_NAME': 'from_env' } ):
+            _config = config( parser, args=[], env_prefix='BT_' )
+        assert _config.config == None and _config.source_of( 'config' ) == 'default'
+        assert _config.strict == False and _config.source_of( 'strict' ) == 'default'
+        assert _config.neuron.name == 'from_env'
+
+    def test_sources_parse_flags(self):
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--neuron.debug", action="store_true")
+        parser.add_argument("--neuron.log", action="store_false")
+        for value, expected in ( ( '0', False ), ( 'false', False ), ( 'No', False ), ( '1', True ), ( 'TRUE', True ), ( 'on', True ) ):
+            with patch.dict( os.environ, { 'BT_NEURON_DEBUG': value, 'BT_NEURON_LOG': value } ):
+                _config = config( parser, args=[], env_prefix='BT_' )
+            assert _config.neuron.debug is expected and _config.neuron.log is expected
+            assert _config.source_of( 'neuron.debug' ) == 'env'
+
+    def test_sources_invalid_flag(self):
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--neuron.debug", action="store_true")
+        with patch.dict( os.environ, { 'BT_NEURON_DEBUG': 'maybe' } ):
+            with pytest.raises( SystemExit ):
+                config( parser, args=[], env_prefix='BT_' )
+
+    def _handed_off(self) -> Config:
+        """ Returns a parsed config holding a DefaultConfig. """
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--neuron.name", default="miner")
+        parser.add_argument("--neuron.ports", type=int, nargs='+', default=[1, 2])
+        bittensor_config = config(parser, args=["--neuron.name", "validator"])
+        bittensor_config.wallet = DefaultConfig( default = 'unset' )
+        bittensor_config.wallet.name = 'default'
+        return bittensor_config
+
+    def _check_rebuilt(self, rebuilt: Config, bittensor_config: Config):
+        """ Checks that rebuilt is an independent copy of bittensor_config. """
+        assert rebuilt.to_flat_dict() == bittensor_config.to_flat_dict()
+        assert rebuilt.is_set( 'neuron.name' ) and rebuilt.source_of( 'neuron.name' ) == 'cli'
+        assert type( rebuilt.wallet ) is DefaultConfig and rebuilt.wallet.missing == 'unset'
+        rebuilt.wallet.name = 'other'
+        assert rebuilt.get_path( 'wallet.name' ) == 'other' and bittensor_config.wallet.name == 'default'
+
+    def test_pickle(self):
+        bittensor_config = self._handed_off()
+        self._check_rebuilt( pickle.loads( pickle.dumps( bittensor_config ) ), bittensor_config )
+
+    def test_pickle_from_bytes(self):
+        bittensor_config = self._handed_off()
+        self._check_rebuilt( Config.from_bytes( bittensor_config.to_bytes() ), bittensor_config )
+
+    def test_shallow_copy(self):
+        bittensor_config = self._handed_off()
+        shallow = copy.copy( bittensor_config )
+        assert type( shallow ) is Config and shallow.wallet is bittensor_config.wallet
+
+    def _check_handoff(self, fd: bool, inline_limit: int, kind: str):
+        """ Hands a config to a child through the environment, and checks the child rebuilds it. """
+        bittensor_config = self._handed_off()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup( directory.cleanup )
+        environ = {}
+        with patch.object( handoff_impl, 'INLINE_LIMIT', inline_limit ), patch.object( tempfile, 'tempdir', directory.name ):
+            handoff = bittensor_config.export_for_child( fd = fd, environ = environ )
+        assert environ[handoff_impl.HANDOFF_ENV] == handoff
+        assert handoff.split( ':' )[0] == kind
+        assert Config.from_parent( environ = environ ).to_flat_dict() == bittensor_config.to_flat_dict()
+
+    def test_handoff_inline(self):
+        self._check_handoff( False, handoff_impl.INLINE_LIMIT, 'b64' )
+
+    def test_handoff_file(self):
+        self._check_handoff( False, 0, 'file' )
+
+    def test_handoff_fd(self):
+        self._check_handoff( True, 0, 'fd' )
+
+    def test_handoff_missing(self):
+        assert Config.from_parent( environ = {} ) == None
+
+    def test_handoff_invalid(self):
+        with pytest.raises( ValueError ):
+            Config.from_parent( environ = { handoff_impl.HANDOFF_ENV: 'bad:value' } )
+
+    def _schema(self) -> Schema:
+        """ Returns a schema of the neuron options. """
+        return Schema({
+            'name': Field( str, required=True ),
+            'port': Field( int, min=1, max=65535 ),
+            'mode': Field( str, choices=[ 'fast', 'safe' ], nullable=True ),
+        }, prefix='neuron' )
+
+    def _schema_config(self) -> Config:
+        """ Returns a parsed config which the schema accepts. """
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--neuron.name", default="miner")
+        parser.add_argument("--neuron.port", type=int, default=8091)
+        return config(parser, args=[])
+
+    def test_schema(self):
+        schema = self._schema()
+        bittensor_config = self._schema_config()
+        schema.validate( bittensor_config )
+        schema.validate( bittensor_config.freeze() )
+
+    def test_schema_validated_once(self):
+        schema = self._schema()
+        bittensor_config = self._schema_config()
+        schema.validate( bittensor_config )
+        # Configs with values which passed before are not checked again.
+        with patch.object( Field, 'check' ) as mock_check:
+            for _ in range( 1000 ):
+                schema.validate( bittensor_config.copy() )
+            mock_check.assert_not_called()
+
+    def test_schema_invalid_values(self):
+        schema = self._schema()
+        bittensor_config = self._schema_config()
+        for path, value in ( ( 'neuron.port', 0 ), ( 'neuron.port', True ), ( 'neuron.port', '1' ), ( 'neuron.mode', 'slow' ) ):
+            invalid = bittensor_config.copy()
+            invalid.set_path( path, value )
+            with pytest.raises( InvalidConfig, match=path ):
+                schema.validate( invalid )
+
+    def test_schema_nullable(self):
+        bittensor_config = self._schema_config()
+        bittensor_config.neuron.mode = None
+        self._schema().validate( bittensor_config )
+
+    def test_schema_required(self):
+        bittensor_config = self._schema_config()
+        del bittensor_config.neuron['name']
+        with pytest.raises( InvalidConfig, match='neuron.name: is required' ):
+            self._schema().validate( bittensor_config )
+
+    def test_schema_missing_prefix(self):
+        with pytest.raises( InvalidConfig, match='neuron is missing' ):
+            self._schema().validate( Config() )
+
+    def _imported_modules(self) -> List[str]:
+        """ Returns the modules a fresh interpreter loads when importing bittensor_config. """
+        script = "import sys; before = set( sys.modules ); import bittensor_config; print( ' '.join( set( sys.modules ) - before ) )"
+        env = dict( os.environ, PYTHONPATH=os.pathsep.join( sys.path ) )
+        return subprocess.run( [ sys.executable, '-c', script ], env=env, capture_output=True, text=True, check=True ).stdout.split()
+
+    def test_import_budget(self):
+        # The import time depends on the machine, benchmarks/bench_config.py checks it.
+        assert not { 'argparse', 'munch', 'yaml' } & set( self._imported_modules() )
+
+    def test_import_budget_modules(self):
+        with open( os.path.join( os.path.dirname( __file__ ), 'import_budget.json' ) ) as f:
+            budget = json.load( f )
+        modules = self._imported_modules()
+        assert len( modules ) <= budget['modules'], modules
+
+    def test_lazy_names(self):
+        # Names still resolve, on first access.
+        assert bittensor_config_module.Config is Config and 'Config' in dir( bittensor_config_module )
+
+    def test_lazy_names_missing(self):
+        with pytest.raises( AttributeError ):
+            bittensor_config_module.missing
+
+    def _shared(self):
+        """ Returns a shared parsed config. """
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--neuron.name", default="miner")
+        parser.add_argument("--neuron.port", type=int, default=0)
+        parser.add_argument("--wallet.name", default="default")
+        return config(parser, args=[]).share()
+
+    def test_shared_config(self):
+        shared = self._shared()
+        first = shared.snapshot()
+        assert first.neuron.port == 0 and shared.version == 0
+
+        # Readers never see a version with the two values apart.
+        stop = threading.Event()
+        torn = []
+        def read():
+            while not stop.is_set():
+                snapshot = shared.snapshot()
+                if snapshot.neuron.port != snapshot.neuron.get( 'mirror', 0 ):
+                    torn.append( snapshot )
+        readers = [ threading.Thread( target=read ) for _ in range( 4 ) ]
+        for reader in readers:
+            reader.start()
+        for port in range( 1, 200 ):
+            with shared.write() as draft:
+                draft.neuron.port = port
+                draft.neuron.mirror = port
+        stop.set()
+        for reader in readers:
+            reader.join()
+        assert torn == [] and shared.version == 199
+
+    def test_shared_config_snapshots(self):
+        shared = self._shared()
+        first = shared.snapshot()
+        with shared.write() as draft:
+            draft.neuron.port = 1
+        # Snapshots are never changed, untouched subtrees keep their frozen views.
+        assert first.neuron.port == 0
+        assert shared.snapshot().wallet is first.wallet
+
+    def test_shared_config_merge(self):
+        shared = self._shared()
+        changes = shared.merge( { 'neuron': { 'name': 'validator' } } )
+        assert changes.changed == { 'neuron.name' } and shared.snapshot().neuron.name == 'validator'
+
+    def test_shared_config_update(self):
+        shared = self._shared()
+        shared.update_with_kwargs( { 'strict': True } )
+        shared.set_path( 'wallet.name', 'other' )
+        assert shared.snapshot().strict == True and shared.snapshot().wallet.name == 'other'
+
+    def test_shared_config_failed_write(self):
+        shared = self._shared()
+        # A failed write is rolled back and not published.
+        published = shared.snapshot()
+        with pytest.raises( RuntimeError ):
+            with shared.write() as draft:
+                draft.neuron.port = -1
+                raise RuntimeError()
+        assert shared.snapshot() is published and shared.copy().neuron.port == 0
+
+    def test_shared_config_rollback(self):
+        # Rolling back keeps the config's class and the values from before the write.
+        class NeuronConfig( DefaultConfig ):
+            pass
+        initial = NeuronConfig()
+        initial.neuron = Config()
+        initial.neuron.ports = [ 1 ]
+        shared = initial.share()
+        with pytest.raises( RuntimeError ):
+            with shared.write() as draft:
+                draft.neuron.ports.append( 2 )
+                raise RuntimeError()
+        restored = shared.copy()
+        assert type( restored ) is NeuronConfig and restored.neuron.ports == [ 1 ]
+        with shared.write() as draft:
+            draft.neuron.ports.append( 3 )
+        assert shared.snapshot().neuron.ports == [ 1, 3 ]
+
+    def test_shared_config_nested_write(self):
+        shared = self._shared()
+        # Writes do not nest, calling back in raises instead of deadlocking.
+        with pytest.raises( RuntimeError ):
+            with shared.write():
+                shared.set_path( 'neuron.name', 'nested' )
+        with shared.write() as draft:
+            draft.neuron.name = 'after'
+        assert shared.snapshot().neuron.name == 'after'
+
+    def _registry(self) -> ArgumentRegistry:
+        """ Returns a registry with neuron and logging arguments. """
+        registry = ArgumentRegistry()
+        registry.register( 'neuron', [ Argument( 'neuron.name', default='miner' ), Argument( 'neuron.port', type=int, default=8091 ) ] )
+        registry.register( 'logging', [ Argument( 'logging.debug', action='store_true' ) ] )
+        return registry
+
+    def test_argument_registry(self):
+        registry = self._registry()
+        parser = registry.parser()
+        assert registry.parser( [ 'neuron', 'logging' ] ) is parser
+        with patch.object( argparse.ArgumentParser, 'add_argument' ) as mock_add_argument:
+            first = config( parser, args=[ '--neuron.port', '1' ] )
+            second = config( parser, args=[ '--logging.debug' ] )
+            mock_add_argument.assert_not_called()
+        assert first.neuron.port == 1 and first.is_set( 'neuron.port' ) and not first.logging.debug
+        assert second.neuron.port == 8091 and second.logging.debug and first.to_flat_dict().keys() == second.to_flat_dict().keys()
+
+    def test_argument_registry_prefix(self):
+        prefixed = self._registry().parser( [ 'neuron' ], prefix='miner' )
+        assert config( prefixed, args=[ '--miner.neuron.name', 'other' ] ).miner.neuron.name == 'other'
+
+    def test_argument_registry_keeps_own_options(self):
+        # Options a parser already has are kept, not re-registered.
+        own = argparse.ArgumentParser()
+        own.add_argument( '--neuron.name', default='own' )
+        self._registry().add_args( own, 'neuron' )
+        assert config( own, args=[] ).neuron.name == 'own'
+
+    def test_argument_registry_register_again(self):
+        registry = self._registry()
+        parser = registry.parser()
+        # Registering again replaces the arguments and the parsers built from them.
+        registry.register( 'neuron', [ Argument( 'neuron.name', default='validator' ) ] )
+        assert registry.parser() is not parser and config( registry.parser(), args=[] ).neuron.name == 'validator'
+
+    def _path_layout(self) -> PathLayout:
+        """ Returns a layout compiled for leaves, nested leaves, a leaf with children and a dict value. """
+        return PathLayout( [ 'a', 'b.c', 'b.d.e', 'x', 'x.y', 'b.f', 'b.z' ] )
+
+    def _check_layout(self, layout: PathLayout, flat: dict) -> Tuple[Config, Config]:
+        """ Checks that the layout fills flat as set_paths() would, returns the filled and the expected config. """
+        expected = Config()
+        expected.set_paths( flat )
+        filled = Config()
+        layout.fill( filled, flat )
+        assert filled.to_flat_dict() == expected.to_flat_dict() and str( filled ) == str( expected )
+        assert list( filled.keys() ) == list( expected.keys() )
+        return filled, expected
+
+    def test_path_layout(self):
+        flat = { 'a': 1, 'b.c': 2, 'b.d.e': 3, 'x': 4, 'x.y': 5, 'b.f': { 'g': 6 }, 'extra.h': 7, 'b.z': 8 }
+        filled, expected = self._check_layout( self._path_layout(), flat )
+        assert list( filled.b.keys() ) == list( expected.b.keys() )
+
+    def test_path_layout_unknown_paths(self):
+        layout = self._path_layout()
+        # Paths the layout was not compiled with are compiled when filled, and placed as set_paths() would.
+        for flat in ( { 'a': 1, 'extra.h': 2, 'extra.i.j': 3 }, { 'extra': { 'k': 1 }, 'extra.h': 2, 'a': 3 } ):
+            self._check_layout( layout, flat )
+        assert 'extra.i.j' in layout.slots
+
+    def test_path_layout_through_a_leaf(self):
+        layout = self._path_layout()
+        self._check_layout( layout, { 'a': 1, 'a.q': 2 } )
+        # Except paths through a known leaf.
+        assert 'a.q' not in layout.slots
+
+    def _timed_parser(self) -> argparse.ArgumentParser:
+        """ Returns a parser, with timing turned off in the environment for the rest of the test. """
+        environ = patch.dict( os.environ )
+        environ.start()
+        self.addCleanup( environ.stop )
+        os.environ.pop( timing_impl.TIMING_ENV, None )
+        parser = argparse.ArgumentParser()
+        parser.add_argument( '--neuron.port', type=int, default=8091 )
+        return parser
+
+    def test_timing_disabled(self):
+        self._timed_parser()
+        # Disabled, config() does not even start a timer.
+        assert timing_impl.start() == None
+
+    def test_timing(self):
+        parser = self._timed_parser()
+        config_file = self._config_file( 'neuron:\n  port: 1\n' )
+        calls = []
+        with timing( sink=calls.append ) as timings:
+            config( parser, args=[ '--config', config_file ] )
+            config( parser, args=[] )
+        assert timing_impl.start() == None
+        assert calls == timings and len( timings ) == 2
+        assert list( timings[0].phases ) == [ 'prepare', 'parse', 'load_file', 'resolve', 'split_params', 'is_set' ]
+        assert 'load_file' not in timings[1].phases
+        assert abs( sum( timings[0].phases.values() ) - timings[0].total ) < 1e-6
+
+    def test_timing_parser_error(self):
+        parser = self._timed_parser()
+        # A call which exits through parser.error() still delivers its timings.
+        with timing() as failed:
+            with pytest.raises( SystemExit ):
+                config( parser, args=[ '--unknown' ], strict=True )
+        assert len( failed ) == 1 and list( failed[0].phases ) == [ 'prepare', 'parse' ]
+
+    def test_timing_environment(self):
+        parser = self._timed_parser()
+        # The environment variable enables a JSON lines file for the whole process.
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup( directory.cleanup )
+        lines_file = os.path.join( directory.name, 'timings.jsonl' )
+        os.environ[timing_impl.TIMING_ENV] = lines_file
+        config( parser, args=[] )
+        config( parser, args=[] )
+        # Changing the value turns it off again.
+        os.environ[timing_impl.TIMING_ENV] = '0'
+        config( parser, args=[] )
+        with open( lines_file ) as f:
+            lines = [ json.loads( line ) for line in f ]
+        assert len( lines ) == 2 and list( lines[0]['phases'] ) == [ 'prepare', 'parse', 'resolve', 'split_params', 'is_set' ]
+
+    def _deferred(self):
+        """ Returns a config with a deferred wallet.full_path, and the wallet names it was computed for. """
+        calls = []
+        def wallet_path( wallet ):
+            calls.append( wallet.name )
+            return os.path.join( wallet.path, wallet.name )
+        _config = Config.from_flat_dict( { 'wallet.path': '/wallets', 'wallet.name': 'default', 'wallet.hotkey': 'default' } )
+        _config.wallet.full_path = Deferred( wallet_path, depends = [ 'path', 'name' ] )
+        return _config, calls
+
+    def test_deferred(self):
+        _config, calls = self._deferred()
+        assert _config.wallet.full_path == '/wallets/default' and _config.get_path( 'wallet.full_path' ) == '/wallets/default'
+        assert _config.wallet['full_path'] == _config.wallet.get( 'full_path' ) and len( calls ) == 1
+
+    def test_deferred_dependencies(self):
+        _config, calls = self._deferred()
+        _config.wallet.full_path
+        # Only changes to a dependency compute it again.
+        _config.wallet.hotkey = 'other'
+        assert _config.wallet.full_path == '/wallets/default' and len( calls ) == 1
+        _config.wallet.name = 'mywallet'
+        assert _config.to_flat_dict()['wallet.full_path'] == '/wallets/mywallet' and len( calls ) == 2
+
+    def test_deferred_serialized(self):
+        _config, _ = self._deferred()
+        # Serialized and frozen forms hold the value.
+        assert 'full_path: /wallets/default' in str( _config ) and json.loads( _config.to_json() )['wallet']['full_path'] == '/wallets/default'
+        assert _config.freeze().wallet.full_path == '/wallets/default'
+        assert Config.from_bytes( _config.to_bytes() ).wallet.full_path == '/wallets/default'
+
+    def test_deferred_copies(self):
+        _config, _ = self._deferred()
+        # Copies keep computing it.
+        for _copy in ( deepcopy( _config ), _config.copy() ):
+            _copy.wallet.name = 'copied'
+            assert _copy.wallet.full_path == '/wallets/copied' and _config.wallet.full_path == '/wallets/default'
+
+    def test_deferred_copies_of_different_values(self):
+        _config, _ = self._deferred()
+        _config.wallet.full_path
+        # Copies taken with different dependency values each compute their own.
+        first = _config.copy()
+        _config.wallet.name = 'changed'
+        second = _config.copy()
+        assert second.wallet.full_path == '/wallets/changed' and first.wallet.full_path == '/wallets/default'
+
+    def test_deferred_shallow_copy(self):
+        _config, _ = self._deferred()
+        shallow = copy.copy( _config.wallet )
+        shallow.name = 'shallow'
+        assert shallow.full_path == '/wallets/shallow' and _config.wallet.full_path == '/wallets/default'
+
+    def _interpolated(self) -> Config:
+        """ Returns a config whose logging and axon values refer to other values. """
+        return Config.from_flat_dict( {
+            'wallet.path': '~/.bittensor/wallets', 'wallet.name': 'default', 'axon.port': 8091,
+            'logging.dir': '${wallet.path}/${wallet.name}/logs', 'logging.file': '${logging.dir}/miner.log',
+            'axon.external_port': '${axon.port}', 'axon.address': '0.0.0.0:${axon.port}', 'literal': '$${axon.port}'
+        } )
+
+    def test_interpolation(self):
+        _config = self._interpolated()
+        assert _config.interpolate( 'logging.file' ) == '~/.bittensor/wallets/default/logs/miner.log'
+        assert _config.interpolate( 'axon.external_port' ) == 8091
+
+    def test_interpolation_literal_and_default(self):
+        _config = self._interpolated()
+        assert _config.interpolate( 'literal' ) == '${axon.port}'
+        assert _config.interpolate( 'missing', 'default' ) == 'default' and _config.interpolate( 'wallet' ) is _config.wallet
+
+    def test_interpolation_dependents(self):
+        _config = self._interpolated()
+        # Only the dependents of a changed value are resolved again.
+        address = _config.interpolate( 'axon.address' )
+        _config.wallet.name = 'miner'
+        assert _config.interpolate( 'logging.file' ) == '~/.bittensor/wallets/miner/logs/miner.log'
+        assert _config.interpolate( 'axon.address' ) is address
+
+    def test_interpolation_merge(self):
+        _config = self._interpolated()
+        _config.interpolate( 'axon.address' )
+        _config.merge( { 'axon': { 'port': 9000 } } )
+        assert _config.interpolate( 'axon.address' ) == '0.0.0.0:9000' and _config.interpolate( 'logging.dir' ) == '~/.bittensor/wallets/default/logs'
+
+    def test_interpolated(self):
+        _config = self._interpolated()
+        resolved = _config.interpolated()
+        assert resolved.logging.file == '~/.bittensor/wallets/default/logs/miner.log' and resolved.axon.external_port == 8091
+        assert _config.logging.file == '${logging.dir}/miner.log'
+
+    def test_interpolation_cycle(self):
+        _config = self._interpolated()
+        _config.a = '${b}'
+        _config.b = 'x${a}'
+        with pytest.raises( InterpolationError, match = 'cycle: a -> b -> a' ):
+            _config.interpolate( 'a' )
+
+    def test_interpolation_missing(self):
+        _config = self._interpolated()
+        _config.b = '${missing}'
+        with pytest.raises( InterpolationError, match = 'missing' ):
+            _config.interpolated()
+
+    def _fingerprinted(self) -> dict:
+        """ Returns the flat values of a config with string, int, list and dict leaves. """
+        return { 'wallet.name': 'default', 'wallet.hotkey': 'default', 'axon.port': 8091, 'axon.ips': [ '0.0.0.0' ], 'limits': { 'b': 1.0, 'a': None } }
+
+    def test_fingerprint(self):
+        flat = self._fingerprinted()
+        _config = Config.from_flat_dict( flat )
+        fingerprint = _config.fingerprint()
+        # Independent of key order and the is_set map.
+        assert Config.from_flat_dict( dict( reversed( list( flat.items() ) ) ) ).fingerprint() == fingerprint
+        _config['__is_set'] = { 'axon.port': True }
+        assert _config.fingerprint() == fingerprint
+
+    def test_fingerprint_other_process(self):
+        flat = self._fingerprinted()
+        script = "from bittensor_config import Config; print( Config.from_flat_dict( {!r} ).fingerprint() )".format( flat )
+        env = dict( os.environ, PYTHONPATH=os.pathsep.join( sys.path ), PYTHONHASHSEED='1' )
+        assert subprocess.run( [ sys.executable, '-c', script ], env=env, capture_output=True, text=True, check=True ).stdout.strip() == Config.from_flat_dict( flat ).fingerprint()
+
+    def test_fingerprint_changed_subtree(self):
+        _config = Config.from_flat_dict( self._fingerprinted() )
+        fingerprint = _config.fingerprint()
+        # Only the changed sub-config and the root are hashed again, other subtrees keep their digest.
+        wallet = _config.subtree_fingerprint( 'wallet' )
+        axon_digest = _config.axon._fingerprint
+        _config.axon.port = 8092
+        assert _config.fingerprint() != fingerprint and _config.subtree_fingerprint( 'wallet' ) == wallet
+        assert _config.axon._fingerprint is not axon_digest and _config.wallet._fingerprint[0] == _config.wallet._version
+        _config.set_path( 'axon.port', 8091 )
+        assert _config.fingerprint() == fingerprint
+
+    def test_fingerprint_types(self):
+        # Values of different types differ.
+        assert Config.from_flat_dict( { 'axon.port': '8091' } ).fingerprint() != Config.from_flat_dict( { 'axon.port': 8091 } ).fingerprint()
+
+    def test_subtree_fingerprint(self):
+        _config = Config.from_flat_dict( self._fingerprinted() )
+        # Leaves and missing paths have fingerprints too.
+        assert _config.subtree_fingerprint( 'axon.port' ) != _config.subtree_fingerprint( 'wallet.name' )
+        assert _config.subtree_fingerprint( 'missing' ) == None
+
+    def _mutable_leaves(self) -> Config:
+        """ Returns a config with a list leaf, a dict leaf and a sub-config of primitives only. """
+        return Config.from_flat_dict( { 'axon.ips': [ '0.0.0.0' ], 'axon.port': 8091, 'limits': { 'a': 1 }, 'wallet.name': 'default' } )
+
+    def test_fingerprint_mutable_leaf(self):
+        _config = self._mutable_leaves()
+        fingerprint = _config.fingerprint()
+        # Changed in place, without a new version.
+        _config.axon.ips.append( '127.0.0.1' )
+        assert _config.fingerprint() != fingerprint
+        assert _config.fingerprint() == Config.from_flat_dict( _config.to_flat_dict() ).fingerprint()
+        _config.axon.ips.pop()
+        assert _config.fingerprint() == fingerprint
+
+    def test_fingerprint_mutable_dict_leaf(self):
+        _config = self._mutable_leaves()
+        fingerprint = _config.fingerprint()
+        _config.limits['a'] = True
+        assert _config.fingerprint() != fingerprint and _config.subtree_fingerprint( 'limits' ) != None
+        _config.limits['a'] = 1
+        assert _config.fingerprint() == fingerprint
+
+    def test_fingerprint_primitive_leaves(self):
+        _config = self._mutable_leaves()
+        _config.fingerprint()
+        wallet = _config.wallet._fingerprint
+        _config.axon.ips.append( '127.0.0.1' )
+        _config.fingerprint()
+        # Sub-configs of primitives only are not checked again.
+        assert _config.wallet._fingerprint is wallet
+
 if __name__ == "__main__":
     unittest.main()
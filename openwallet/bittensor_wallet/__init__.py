@@ -21,14 +21,17 @@ __version__ = "0.0.0"
 __ss58_format__ = 42 # Bittensor ss58 format
 
 import argparse
-import copy
-import os
 from typing import Optional
 
 import bittensor_config
 
 from .wallet_impl import Wallet as Wallet, WalletConfig as WalletConfig
 from ._keyfile import Keyfile as Keyfile, KeyFileError as KeyFileError, keyfile as keyfile, serialized_keypair_to_keyfile_data as serialized_keypair_to_keyfile_data
+from ._keyfile import KeypairCache as KeypairCache, keypair_cache as keypair_cache
+from ._keyfile import WriteBatch as WriteBatch
+from ._keyfile import KeyfileStat as KeyfileStat
+from ._keyfile import LegacyKeyfileReport as LegacyKeyfileReport, legacy_keyfile_report as legacy_keyfile_report
+from ._keyfile import UnlockResult as UnlockResult, unlock_keyfiles as unlock_keyfiles
 from .keypair_impl import Keypair as Keypair
 from . import utils as utils
 
@@ -59,7 +62,8 @@ class wallet:
         """
         if config == None:
             config = wallet.config()
-        config = copy.deepcopy( config )
+        # Copy-on-write, only the wallet subtree we override is cloned.
+        config = config.copy()
         config.wallet.name = name if name != None else config.wallet.name
         config.wallet.hotkey = hotkey if hotkey != None else config.wallet.hotkey
         config.wallet.path = path if path != None else config.wallet.path
@@ -77,49 +81,50 @@ class wallet:
         """ Get config from the argument parser
         Return: bittensor_config.config object
         """
-        parser = argparse.ArgumentParser()
-        wallet.add_args( parser )
-        return bittensor_config.config( parser )
+        # Built once per process from the registered wallet arguments.
+        parser = bittensor_config.registry.parser( [ 'wallet' ] )
+        # BT_WALLET_NAME, BT_WALLET_HOTKEY and BT_WALLET_PATH override the defaults, as in add_defaults.
+        # --config and --strict are not taken from the environment.
+        return bittensor_config.config( parser, env_prefix = 'BT_' )
 
     @classmethod
     def help(cls):
         """ Print help to stdout
         """
-        parser = argparse.ArgumentParser()
-        cls.add_args( parser )
+        parser = bittensor_config.registry.parser( [ 'wallet' ] )
         print (cls.__new__.__doc__)
         parser.print_help()
 
     @classmethod
     def add_args(cls, parser: argparse.ArgumentParser, prefix: str = None ):
-        """ Accept specific arguments from parser
+        """ Accept specific arguments from parser, as registered in bittensor_config.registry.
+            Options the parser already has are left as they are.
         """
-        prefix_str = '' if prefix == None else prefix + '.'
-        try:
-            parser.add_argument('--' + prefix_str + 'wallet.name', required=False, default=cls.defaults.name, help='''The name of the wallet to unlock for running bittensor (name mock is reserved for mocking this wallet)''')
-            parser.add_argument('--' + prefix_str + 'wallet.hotkey', required=False, default=cls.defaults.hotkey, help='''The name of wallet's hotkey.''')
-            parser.add_argument('--' + prefix_str + 'wallet.path', required=False, default=cls.defaults.path, help='''The path to your bittensor wallets''')
-        
-        except argparse.ArgumentError as e:
-            pass
+        bittensor_config.registry.add_args( parser, 'wallet', prefix )
 
 
     @classmethod
     def add_defaults(cls, defaults: bittensor_config.Config, prefix: str = 'wallet' ) -> None:
         """ Adds parser defaults to object, optionally using enviroment variables.
         """
+        env = bittensor_config.environment().with_prefix( 'BT_WALLET_' )
         default_config = WalletConfig()
-        default_config.name = os.getenv('BT_WALLET_NAME') if os.getenv('BT_WALLET_NAME') != None else cls.defaults.name
-        default_config.hotkey = os.getenv('BT_WALLET_HOTKEY') if os.getenv('BT_WALLET_HOTKEY') != None else cls.defaults.hotkey
-        default_config.path = os.getenv('BT_WALLET_PATH') if os.getenv('BT_WALLET_PATH') != None else cls.defaults.path
+        default_config.name = env.get( 'NAME', cls.defaults.name )
+        default_config.hotkey = env.get( 'HOTKEY', cls.defaults.hotkey )
+        default_config.path = env.get( 'PATH', cls.defaults.path )
 
         setattr( defaults, prefix, default_config )
 
     @classmethod
     def check_config(cls, config: 'bittensor_config.Config' ):
-        """ Check config for wallet name/hotkey/path/hotkeys/sort_by
+        """ Check config for wallet name/hotkey/path, see WalletConfig.schema.
+            Raises bittensor_config.InvalidConfig if the config does not match.
         """
-        assert 'wallet' in config
-        assert isinstance(config.wallet.name, str)
-        assert isinstance(config.wallet.hotkey, str ) or config.wallet.hotkey == None # Optional
-        assert isinstance(config.wallet.path, str)
+        WalletConfig.schema.validate( config )
+
+
+bittensor_config.registry.register( 'wallet', [
+    bittensor_config.Argument( 'wallet.name', required=False, default=wallet.defaults.name, help='''The name of the wallet to unlock for running bittensor (name mock is reserved for mocking this wallet)''' ),
+    bittensor_config.Argument( 'wallet.hotkey', required=False, default=wallet.defaults.hotkey, help='''The name of wallet's hotkey.''' ),
+    bittensor_config.Argument( 'wallet.path', required=False, default=wallet.defaults.path, help='''The path to your bittensor wallets''' ),
+])
@@ -15,7 +15,12 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
+from .batch_impl import WriteBatch as WriteBatch
+from .cache_impl import KeypairCache as KeypairCache, keypair_cache as keypair_cache
 from .keyfile_impl import Keyfile as Keyfile, KeyFileError as KeyFileError, serialized_keypair_to_keyfile_data as serialized_keypair_to_keyfile_data
+from .keyfile_impl import KeyfileStat as KeyfileStat
+from .keyfile_impl import LegacyKeyfileReport as LegacyKeyfileReport, legacy_keyfile_report as legacy_keyfile_report
+from .unlock_impl import UnlockResult as UnlockResult, unlock_keyfiles as unlock_keyfiles
 
 class keyfile (object):
     """ Factory for a bittensor on device keypair
@@ -0,0 +1,72 @@
+""" Helpers for the asyncio counterparts of the blocking keyfile calls.
+"""
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+import contextvars
+import functools
+import weakref
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# Event loop -> key -> task of the work in flight for that key.
+_inflight: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Task]]' = weakref.WeakKeyDictionary()
+
+async def coalesce( key: Hashable, work: Callable[[], Awaitable[Any]] ) -> Any:
+    r""" Awaits work(), unless work for the same key is already in flight on this event loop, then awaits that instead.
+        Every awaiter gets the same result or exception. An awaiter which is cancelled does not cancel the
+        work, the others still wait for it.
+        Args:
+            key ( Hashable ):
+                What the work computes.
+            work ( Callable[[], Awaitable[Any]] ):
+                Started if no work for key is in flight.
+        Returns:
+            result ( Any ):
+                What the work returned.
+    """
+    loop = asyncio.get_running_loop()
+    inflight = _inflight.setdefault( loop, {} )
+    task = inflight.get( key )
+    if task == None:
+        task = loop.create_task( work() )
+        inflight[key] = task
+        task.add_done_callback( lambda done: _forget( inflight, key, done ) )
+    return await asyncio.shield( task )
+
+
+def _forget( inflight: Dict[Hashable, 'asyncio.Task'], key: Hashable, task: 'asyncio.Task' ):
+    if inflight.get( key ) is task:
+        del inflight[key]
+    # Retrieved, so an exception nobody waits for any more is not logged.
+    if not task.cancelled():
+        task.exception()
+
+
+async def run( executor: Optional[Executor], function: Callable[..., Any], *args: Any ) -> Any:
+    r""" Returns function( *args ), called in executor.
+        Args:
+            executor ( Executor, optional ):
+                Thread or process pool, None for the event loop's default thread pool. A process pool
+                needs function and args to be picklable.
+    """
+    if executor == None or isinstance( executor, ThreadPoolExecutor ):
+        # Threads see the caller's context variables, so writes join the caller's WriteBatch.
+        function = functools.partial( contextvars.copy_context().run, function, *args )
+        args = ()
+    return await asyncio.get_running_loop().run_in_executor( executor, function, *args )
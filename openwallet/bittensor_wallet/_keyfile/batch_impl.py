@@ -0,0 +1,173 @@
+""" Atomic keyfile writes, and batches of them made durable together.
+"""
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from . import cache_impl
+
+# The batch writes of this thread or task join, if any.
+_current: 'ContextVar[Optional[WriteBatch]]' = ContextVar( 'bittensor_wallet_write_batch', default = None )
+
+def write( path: str, data: bytes ):
+    r""" Atomically replaces the file under path with data, readers see either the old or the new data.
+        The data is written to a temporary file created readable by this user only, synced, renamed over
+        path and the directory is synced. Inside a WriteBatch, the rename waits for the batch to commit.
+        Args:
+            path ( str ):
+                File to write, a symlink is followed.
+            data ( bytes ):
+                Its new contents.
+        Raises:
+            OSError:
+                Raised if the file cannot be written.
+    """
+    path = os.path.realpath( path )
+    temp_path = _write_temp( path, data )
+    batch = _current.get()
+    if batch != None:
+        batch._add( path, temp_path )
+    else:
+        _commit( [ ( path, temp_path ) ] )
+
+def staged( path: str ) -> bool:
+    r""" Returns True if path was written in the current WriteBatch and is waiting for it to commit.
+        Such a keyfile is not on disk yet, but is about to be.
+        Args:
+            path ( str ):
+                Keyfile path, a symlink is followed.
+        Returns:
+            staged ( bool ):
+                True if a write of path is pending.
+    """
+    batch = _current.get()
+    if batch == None:
+        return False
+    with batch._lock:
+        return os.path.realpath( path ) in batch._pending
+
+
+class WriteBatch( object ):
+    """ Groups keyfile writes into one transaction, see Wallet.batch().
+
+        Inside the with block, each written keyfile is staged in a synced temporary file. When the block exits,
+        the staged files are renamed over their keyfiles and each directory holding them is synced once,
+        rather than once per keyfile. If the block raises, nothing is renamed and the staged files are removed.
+        If a rename fails while committing, the keyfiles renamed before it keep their new contents and the
+        remaining staged files are removed, the batch is not rolled back.
+        Keyfiles written in the block keep their old contents on disk until it exits. A batch started inside
+        another one joins it. Writes from asyncio tasks started in the block join it, those of other threads do not.
+    """
+    def __init__( self ):
+        # keyfile path -> staged temporary file, in the order they were written.
+        self._pending: 'OrderedDict[str, str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._token = None
+
+    def __len__( self ) -> int:
+        return len( self._pending )
+
+    def __enter__( self ) -> 'WriteBatch':
+        outer = _current.get()
+        if outer != None:
+            return outer
+        self._token = _current.set( self )
+        return self
+
+    def __exit__( self, exc_type, exc_value, traceback ):
+        if self._token == None:
+            # Joined an outer batch, which commits.
+            return
+        _current.reset( self._token )
+        self._token = None
+        with self._lock:
+            pending = list( self._pending.items() )
+            self._pending.clear()
+        if exc_type != None:
+            _discard( temp_path for _, temp_path in pending )
+        else:
+            _commit( pending )
+
+    def _add( self, path: str, temp_path: str ):
+        with self._lock:
+            replaced = self._pending.pop( path, None )
+            self._pending[path] = temp_path
+        if replaced != None:
+            _discard( [ replaced ] )
+
+
+def _write_temp( path: str, data: bytes ) -> str:
+    """ Returns a synced temporary file holding data, next to path so the rename does not cross filesystems.
+    """
+    # mkstemp creates the file with mode 0600.
+    fd, temp_path = tempfile.mkstemp( prefix = '.' + os.path.basename( path ) + '.', suffix = '.tmp', dir = os.path.dirname( path ) )
+    try:
+        with os.fdopen( fd, 'wb' ) as file:
+            file.write( data )
+            file.flush()
+            os.fsync( file.fileno() )
+    except BaseException:
+        _discard( [ temp_path ] )
+        raise
+    return temp_path
+
+def _commit( pending: List[Tuple[str, str]] ):
+    """ Renames the temporary files over their paths, then syncs their directories.
+        Renames are not undone: if one fails, those before it stay applied and the rest are discarded.
+    """
+    directories = []
+    try:
+        for index, ( path, temp_path ) in enumerate( pending ):
+            os.replace( temp_path, path )
+            # Keypairs unlocked from the previous contents are stale.
+            cache_impl.keypair_cache.purge( path )
+            directory = os.path.dirname( path )
+            if directory not in directories:
+                directories.append( directory )
+    except BaseException:
+        _discard( temp_path for _, temp_path in pending[index:] )
+        raise
+    finally:
+        for directory in directories:
+            _fsync_directory( directory )
+
+def _discard( temp_paths ):
+    for temp_path in temp_paths:
+        try:
+            os.remove( temp_path )
+        except OSError:
+            pass
+
+def _fsync_directory( directory: str ):
+    """ Makes the renames in directory durable. Skipped where directories cannot be opened, as on Windows.
+    """
+    try:
+        fd = os.open( directory, os.O_RDONLY )
+    except OSError:
+        return
+    try:
+        os.fsync( fd )
+    except OSError:
+        pass
+    finally:
+        os.close( fd )
@@ -0,0 +1,223 @@
+""" Process wide cache of unlocked keypairs, keyed by the identity of the keyfile they were read from.
+"""
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from .. import keypair_impl
+
+# ( realpath, inode, mtime in ns, size ), any write to the file changes it.
+Identity = Tuple[str, int, int, int]
+
+def identity( path: str ) -> Optional[Identity]:
+    """ Returns the identity of the file under path, None if it is missing.
+    """
+    realpath = os.path.realpath( path )
+    try:
+        file_stat = os.stat( realpath )
+    except OSError:
+        return None
+    return ( realpath, file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size )
+
+
+class _Secret:
+    """ A secret str or bytes value, held in a buffer which can be overwritten.
+    """
+    __slots__ = ( 'buffer', 'is_str' )
+
+    def __init__( self, value: Any ):
+        self.is_str = isinstance( value, str )
+        self.buffer = bytearray( value.encode() if self.is_str else value )
+
+    def reveal( self ) -> Any:
+        return self.buffer.decode() if self.is_str else bytes( self.buffer )
+
+    def clear( self ):
+        self.buffer[:] = b'\0' * len( self.buffer )
+
+
+def _password_digest( salt: bytes, password: str ) -> bytes:
+    return hmac.new( salt, password.encode(), hashlib.sha256 ).digest()
+
+
+class _Entry:
+    """ What rebuilds an unlocked keypair, its secrets in buffers cleared on eviction.
+    """
+    __slots__ = ( 'ss58_address', 'public_key', 'ss58_format', 'crypto_type', 'secrets', 'expires', 'salt', 'password_digest' )
+
+    def __init__( self, keypair: 'keypair_impl.Keypair', expires: Optional[float], password: Optional[str] ):
+        self.ss58_address = keypair.ss58_address
+        self.public_key = keypair.public_key
+        self.ss58_format = keypair.ss58_format
+        self.crypto_type = keypair.crypto_type
+        # attribute -> secret, for the secrets the keypair holds.
+        self.secrets = {
+            name: _Secret( getattr( keypair, name ) ) for name in ( 'private_key', 'seed_hex', 'mnemonic' )
+                if isinstance( getattr( keypair, name, None ), ( str, bytes ) )
+        }
+        self.expires = expires
+        # Salted digest of the password the keypair was unlocked with, None if it is not known.
+        self.salt = os.urandom( 16 )
+        self.password_digest = _password_digest( self.salt, password ) if password != None else None
+
+    def unlocks_with( self, password: str ) -> bool:
+        """ Returns True if the keypair was unlocked with password.
+        """
+        return self.password_digest != None and hmac.compare_digest( self.password_digest, _password_digest( self.salt, password ) )
+
+    def keypair( self ) -> 'keypair_impl.Keypair':
+        """ Returns a new keypair, without deriving it again.
+        """
+        secrets = { name: secret.reveal() for name, secret in self.secrets.items() }
+        keypair = keypair_impl.Keypair(
+            ss58_address = self.ss58_address,
+            public_key = self.public_key,
+            private_key = secrets.get( 'private_key' ),
+            ss58_format = self.ss58_format,
+            seed_hex = secrets.get( 'seed_hex' ),
+            crypto_type = self.crypto_type
+        )
+        keypair.mnemonic = secrets.get( 'mnemonic' )
+        return keypair
+
+    def clear( self ):
+        for secret in self.secrets.values():
+            secret.clear()
+        self.secrets = {}
+
+
+class KeypairCache:
+    """ Unlocked keypairs shared by every Keyfile of the process, so each keyfile is decrypted once.
+
+        Disabled until enable() is called. Entries are keyed by the keyfile's real path, inode, modification
+        time and size, a keyfile which is written again is decrypted again. A cached keypair is handed out
+        without asking for the password, enable the cache only in processes trusted with the unlocked keys.
+        A caller which does pass a password only gets the keypair if it is the one it was unlocked with, a salted
+        digest of which is kept with the entry.
+        Each read returns a new Keypair, the cache keeps the secrets in its own buffers which are overwritten
+        with zeros when an entry is evicted. Copies handed out are not cleared, Python strings and bytes cannot be.
+    """
+    def __init__( self ):
+        self.enabled = False
+        self.ttl: Optional[float] = None
+        self.max_size = 0
+        self._entries: 'OrderedDict[Identity, _Entry]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__( self ) -> int:
+        return len( self._entries )
+
+    def enable( self, ttl: Optional[float] = 300.0, max_size: int = 16 ):
+        r""" Starts caching unlocked keypairs.
+            Args:
+                ttl ( float, optional ):
+                    Seconds an entry is kept after it was unlocked, None to keep it until evicted otherwise.
+                max_size ( int ):
+                    Most keypairs kept, the least recently read is evicted first.
+        """
+        with self._lock:
+            self.ttl = ttl
+            self.max_size = max_size
+            self.enabled = True
+            self._evict()
+
+    def disable( self ):
+        """ Stops caching and purges every entry.
+        """
+        self.enabled = False
+        self.purge()
+
+    def get( self, file_identity: Identity, password: Optional[str] = None ) -> Optional['keypair_impl.Keypair']:
+        r""" Returns the keypair unlocked from the keyfile with this identity, None if it is not cached.
+            Args:
+                file_identity ( Identity ):
+                    Identity of the keyfile, see identity().
+                password ( str, optional ):
+                    If set, None is returned unless the keypair was unlocked with this password.
+            Returns:
+                keypair ( Optional[Keypair] ):
+                    A new Keypair with the cached keys.
+        """
+        with self._lock:
+            entry = self._entries.get( file_identity )
+            if entry == None:
+                return None
+            if entry.expires != None and entry.expires <= time.monotonic():
+                del self._entries[file_identity]
+                entry.clear()
+                return None
+            if password != None and not entry.unlocks_with( password ):
+                return None
+            self._entries.move_to_end( file_identity )
+            return entry.keypair()
+
+    def put( self, file_identity: Identity, keypair: 'keypair_impl.Keypair', password: Optional[str] = None ):
+        r""" Caches a keypair unlocked from the keyfile with this identity, if the cache is enabled.
+            Args:
+                file_identity ( Identity ):
+                    Identity of the keyfile, taken before it was read.
+                keypair ( Keypair ):
+                    Keypair read from it.
+                password ( str, optional ):
+                    Password it was unlocked with, None if the keyfile is not encrypted or the password is not known.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            expires = time.monotonic() + self.ttl if self.ttl != None else None
+            old = self._entries.pop( file_identity, None )
+            if old != None:
+                old.clear()
+            self._entries[file_identity] = _Entry( keypair, expires, password )
+            self._evict()
+
+    def purge( self, path: Optional[str] = None ) -> int:
+        r""" Evicts cached keypairs, clearing their secrets.
+            Args:
+                path ( str, optional ):
+                    If set, only the keypairs of the keyfile under path are evicted.
+            Returns:
+                purged ( int ):
+                    Number of keypairs evicted.
+        """
+        realpath = os.path.realpath( os.path.expanduser( path ) ) if path != None else None
+        with self._lock:
+            purged = [ key for key in self._entries if realpath == None or key[0] == realpath ]
+            for key in purged:
+                self._entries.pop( key ).clear()
+        return len( purged )
+
+    def _evict( self ):
+        """ Evicts the expired entries, then the least recently read ones beyond max_size. Called with the lock held.
+        """
+        now = time.monotonic()
+        for key in [ key for key, entry in self._entries.items() if entry.expires != None and entry.expires <= now ]:
+            self._entries.pop( key ).clear()
+        while len( self._entries ) > max( self.max_size, 0 ):
+            _, entry = self._entries.popitem( last = False )
+            entry.clear()
+
+
+# Process wide cache every Keyfile reads through.
+keypair_cache = KeypairCache()
@@ -22,9 +22,11 @@ import base64
 import json
 import stat
 import getpass
-from typing import Optional
+from concurrent.futures import Executor
+from typing import List, Optional
 from pathlib import Path
 
+import bittensor_config
 from ansible_vault import Vault
 from ansible.parsing.vault import AnsibleVaultError
 from cryptography.exceptions import InvalidSignature, InvalidKey
@@ -37,6 +39,10 @@ from substrateinterface.utils.ss58 import ss58_encode
 from termcolor import colored
 
 from .. import keypair_impl
+from . import async_impl, batch_impl, cache_impl
+
+# If set to 1, true or yes, keyfiles in the legacy format are re-encrypted in the vault format when unlocked.
+UPGRADE_LEGACY_ENV = "BT_UPGRADE_LEGACY_KEYFILES"
 
 class KeyFileError(Exception):
     """ Error thrown when the keyfile is corrupt, non-writable, nno-readable or the password used to decrypt is invalid.
@@ -196,17 +202,81 @@ def encrypt_keyfile_data ( keyfile_data:bytes, password: str = None ) -> bytes:
 
 
 def get_coldkey_password_from_environment(coldkey_name: str) -> Optional[str]:
-
-    for env_var in os.environ:
-        if (
-            env_var.upper().startswith("BT_COLD_PW_")
-            and env_var.upper().endswith(coldkey_name.upper())
-        ):
-            return os.getenv(env_var)
+    """ Returns the password in the first BT_COLD_PW_* environment variable ending in the coldkey name, if any.
+        Only the BT_COLD_PW_* variables of the process wide environment snapshot are searched.
+    """
+    for name, password in bittensor_config.environment().with_prefix( "BT_COLD_PW_", ignore_case = True ).items():
+        if ( "BT_COLD_PW_" + name ).endswith( coldkey_name.upper() ):
+            return password
 
     return None
 
 
+def password_to_decrypt( password: Optional[str] = None, coldkey_name: Optional[str] = None ) -> str:
+    """ Returns the password to decrypt a keyfile with: password if set, else the one in the environment for
+        the coldkey, else the one the user enters.
+    """
+    if coldkey_name is not None and password is None:
+        password = get_coldkey_password_from_environment(coldkey_name)
+    return getpass.getpass("Enter password to unlock key: ") if password is None else password
+
+
+def upgrade_legacy_from_environment() -> bool:
+    """ Returns true if the UPGRADE_LEGACY_ENV variable of the process wide environment snapshot asks for upgrades.
+    """
+    return ( bittensor_config.environment().get( UPGRADE_LEGACY_ENV ) or '' ).lower() in ( '1', 'true', 'yes' )
+
+
+class LegacyKeyfileReport( object ):
+    """ Keyfiles still in the legacy format under a wallet path, see legacy_keyfile_report().
+    """
+    def __init__( self, path: str, scanned: int, legacy: List[str] ):
+        self.path = path
+        # Number of files read.
+        self.scanned = scanned
+        # Paths of the legacy keyfiles.
+        self.legacy = legacy
+
+    def __len__( self ) -> int:
+        return len( self.legacy )
+
+    def __str__( self ) -> str:
+        return "{} of {} keyfiles under {} use the legacy format".format( len( self.legacy ), self.scanned, self.path )
+
+    def __repr__( self ):
+        return self.__str__()
+
+
+def legacy_keyfile_report( path: str = '~/.bittensor/wallets/' ) -> LegacyKeyfileReport:
+    """ Finds the keyfiles under a wallet path still encrypted in the legacy format, which takes seconds to unlock.
+        They are upgraded when unlocked with Keyfile.get_keypair( upgrade_legacy = True ) or BT_UPGRADE_LEGACY_KEYFILES=1.
+        Args:
+            path ( str, optional ):
+                Directory of the wallets, searched recursively.
+        Returns:
+            report (LegacyKeyfileReport):
+                The legacy keyfiles and the number of files read.
+    """
+    root = os.path.expanduser( path )
+    scanned = 0
+    legacy = []
+    for directory, _, filenames in os.walk( root ):
+        for filename in filenames:
+            file_path = os.path.join( directory, filename )
+            try:
+                with os.fdopen( os.open( file_path, _READ_FLAGS ), 'rb' ) as file:
+                    if not stat.S_ISREG( os.fstat( file.fileno() ).st_mode ):
+                        # A FIFO, socket or device is no keyfile.
+                        continue
+                    head = file.read( 6 )
+            except OSError:
+                continue
+            scanned += 1
+            if keyfile_data_is_encrypted_legacy( head ):
+                legacy.append( file_path )
+    return LegacyKeyfileReport( root, scanned, sorted( legacy ) )
+
+
 def decrypt_keyfile_data(keyfile_data: bytes, password: str = None, coldkey_name: Optional[str] = None) -> bytes:
     """ Decrypts passed keyfile data using ansible vault.
         Args:
@@ -221,11 +291,8 @@ def decrypt_keyfile_data(keyfile_data: bytes, password: str = None, coldkey_name
             KeyFileError:
                 Raised if the file is corrupted or if the password is incorrect.
     """
-    if coldkey_name is not None and password is None:
-        password = get_coldkey_password_from_environment(coldkey_name)
-
     try:
-        password = getpass.getpass("Enter password to unlock key: ") if password is None else password
+        password = password_to_decrypt( password, coldkey_name )
         # Ansible decrypt.
         if keyfile_data_is_encrypted_ansible( keyfile_data ):
             vault = Vault( password )
@@ -251,17 +318,104 @@ def decrypt_keyfile_data(keyfile_data: bytes, password: str = None, coldkey_name
         decrypted_keyfile_data = json.dumps( decrypted_keyfile_data ).encode()
     return decrypted_keyfile_data
 
+def _unlock_keyfile_data( keyfile_data: bytes, password: Optional[str] ) -> 'keypair_impl.Keypair':
+    """ Returns the keypair in keyfile data, decrypting it first if it is encrypted. At module level so process pools can run it.
+    """
+    if keyfile_data_is_encrypted( keyfile_data ):
+        keyfile_data = decrypt_keyfile_data( keyfile_data, password )
+    return deserialize_keypair_from_keyfile_data( keyfile_data )
+
+# Bytes read to tell the format of a keyfile, as long as the longest prefix.
+_HEADER_SIZE = 14
+
+# Opening a FIFO for reading waits for a writer, unless non-blocking. No effect on regular files.
+_READ_FLAGS = os.O_RDONLY | getattr( os, 'O_NONBLOCK', 0 )
+
+class KeyfileStat( object ):
+    """ What one open and fstat of a keyfile tell about it, see Keyfile.stat().
+    """
+    __slots__ = ( 'path', 'exists', 'readable', 'format', 'size', 'mtime_ns', '_identity', '_writable' )
+
+    def __init__( self, path: str, file_stat: Optional[os.stat_result], readable: bool, header: Optional[bytes] ):
+        self.path = path
+        self.exists = file_stat != None and stat.S_ISREG( file_stat.st_mode )
+        self.readable = self.exists and readable
+        # 'ansible', 'legacy' or 'plain', None if the file cannot be read.
+        self.format: Optional[str] = None
+        if self.readable and header != None:
+            if keyfile_data_is_encrypted_ansible( header ):
+                self.format = 'ansible'
+            elif keyfile_data_is_encrypted_legacy( header ):
+                self.format = 'legacy'
+            else:
+                self.format = 'plain'
+        self.size = file_stat.st_size if self.exists else None
+        self.mtime_ns = file_stat.st_mtime_ns if self.exists else None
+        self._identity = _stat_identity( file_stat )
+        self._writable: Optional[bool] = None
+
+    @classmethod
+    def of( cls, path: str ) -> 'KeyfileStat':
+        """ Returns the snapshot of the file under path, from one open, fstat and header read.
+        """
+        try:
+            fd = os.open( path, _READ_FLAGS )
+        except OSError:
+            # Missing, or not readable by this user.
+            try:
+                return cls( path, os.stat( path ), False, None )
+            except OSError:
+                return cls( path, None, False, None )
+        try:
+            file_stat = os.fstat( fd )
+            header = os.read( fd, _HEADER_SIZE ) if stat.S_ISREG( file_stat.st_mode ) else None
+        finally:
+            os.close( fd )
+        return cls( path, file_stat, True, header )
+
+    @property
+    def encrypted( self ) -> bool:
+        return self.format in ( 'ansible', 'legacy' )
+
+    @property
+    def writable( self ) -> bool:
+        """ True if this user may write the file, checked the first time it is asked for.
+        """
+        if self._writable == None:
+            self._writable = os.access( self.path, os.W_OK )
+        return self._writable
+
+    def is_current( self, file_stat: Optional[os.stat_result] ) -> bool:
+        """ Returns true if file_stat, of the same path, shows the file was not changed since the snapshot.
+        """
+        return _stat_identity( file_stat ) == self._identity
+
+    def __repr__( self ) -> str:
+        return "KeyfileStat({}, exists={}, readable={}, format={})".format( self.path, self.exists, self.readable, self.format )
+
+
+def _stat_identity( file_stat: Optional[os.stat_result] ) -> Optional[tuple]:
+    """ Changes whenever the file is replaced, written or has its permissions changed.
+    """
+    if file_stat == None:
+        return None
+    return ( file_stat.st_mode, file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ctime_ns )
+
+
 class Keyfile( object ):
     """ Defines an interface for a subtrate interface keypair stored on device.
     """
     def __init__( self, path: str ):
         self.path = os.path.expanduser(path)
         self.name = Path(self.path).parent.stem
+        # Last snapshot of the file, see stat().
+        self._stat: Optional[KeyfileStat] = None
 
     def __str__(self):
-        if not self.exists_on_device():
+        snapshot = self.stat()
+        if not snapshot.exists:
             return "Keyfile (empty, {})>".format( self.path )
-        if self.is_encrypted():
+        if snapshot.encrypted:
             return "Keyfile (encrypted, {})>".format( self.path )
         else:
             return "Keyfile (decrypted, {})>".format( self.path )
@@ -330,11 +484,14 @@ class Keyfile( object ):
             keyfile_data = encrypt_keyfile_data( keyfile_data, password )
         self._write_keyfile_data_to_file( keyfile_data, overwrite = overwrite )
 
-    def get_keypair(self, password: str = None) -> 'keypair_impl.Keypair':
+    def get_keypair(self, password: str = None, upgrade_legacy: Optional[bool] = None) -> 'keypair_impl.Keypair':
         """ Returns the keypair from path, decrypts data if the file is encrypted.
             Args:
                 password ( str, optional ):
                     Optional password used to decrypt file. If None, asks for user input.
+                upgrade_legacy ( bool, optional ):
+                    If True, a file in the legacy format is re-encrypted in the vault format with the same password
+                    once it is unlocked. Defaults to the BT_UPGRADE_LEGACY_KEYFILES environment variable.
             Returns:
                 keypair (keypair_impl.Keypair):
                     Keypair stored under path.
@@ -343,10 +500,119 @@ class Keyfile( object ):
                     Raised if the file does not exists, is not readable, writable
                     corrupted, or if the password is incorrect.
         """
+        # Once enabled, keypairs unlocked before are returned without asking for the password again,
+        # or if a password is passed, only when it is the one they were unlocked with.
+        cache = cache_impl.keypair_cache
+        file_identity = cache_impl.identity( self.path ) if cache.enabled else None
+        if file_identity != None:
+            keypair = cache.get( file_identity, password )
+            if keypair != None:
+                return keypair
         keyfile_data = self._read_keyfile_data_from_file()
-        if keyfile_data_is_encrypted( keyfile_data ):
+        if keyfile_data_is_encrypted( keyfile_data ) and file_identity != None:
+            # Known before decrypting, so the cache can keep its digest.
+            password = password_to_decrypt( password, self.name )
+        if keyfile_data_is_encrypted_legacy( keyfile_data ) and ( upgrade_legacy if upgrade_legacy != None else upgrade_legacy_from_environment() ):
+            keyfile_data = self._upgrade_legacy( keyfile_data, password )
+        elif keyfile_data_is_encrypted( keyfile_data ):
             keyfile_data = decrypt_keyfile_data(keyfile_data, password, coldkey_name=self.name)
-        return deserialize_keypair_from_keyfile_data( keyfile_data )
+        keypair = deserialize_keypair_from_keyfile_data( keyfile_data )
+        # Only cached if the file was not replaced while it was read.
+        if file_identity != None and cache_impl.identity( self.path ) == file_identity:
+            cache.put( file_identity, keypair, password )
+        return keypair
+
+    async def aget_keypair( self, password: str = None, upgrade_legacy: Optional[bool] = None, executor: Optional[Executor] = None ) -> 'keypair_impl.Keypair':
+        """ Asyncio counterpart of get_keypair(), which does not block the event loop.
+            File reads and password prompts run in the event loop's default thread pool, decryption and
+            derivation in executor. Concurrent calls for the same path and password share one unlock.
+            Args:
+                password ( str, optional ):
+                    Optional password used to decrypt file. If None, asks for user input.
+                upgrade_legacy ( bool, optional ):
+                    See get_keypair().
+                executor ( Executor, optional ):
+                    Thread or process pool for decryption and derivation, defaults to the event loop's thread pool.
+            Returns:
+                keypair (keypair_impl.Keypair):
+                    Keypair stored under path.
+            Raises:
+                KeyFileError:
+                    Raised if the file does not exists, is not readable, writable
+                    corrupted, or if the password is incorrect.
+        """
+        key = ( 'get_keypair', self.path, password, upgrade_legacy )
+        return await async_impl.coalesce( key, lambda: self._aget_keypair( password, upgrade_legacy, executor ) )
+
+    async def _aget_keypair( self, password: Optional[str], upgrade_legacy: Optional[bool], executor: Optional[Executor] ) -> 'keypair_impl.Keypair':
+        cache = cache_impl.keypair_cache
+        file_identity = await async_impl.run( None, cache_impl.identity, self.path ) if cache.enabled else None
+        if file_identity != None:
+            keypair = cache.get( file_identity, password )
+            if keypair != None:
+                return keypair
+        keyfile_data = await async_impl.run( None, self._read_keyfile_data_from_file )
+        if keyfile_data_is_encrypted( keyfile_data ) and password == None:
+            password = await async_impl.run( None, password_to_decrypt, password, self.name )
+        if keyfile_data_is_encrypted_legacy( keyfile_data ) and ( upgrade_legacy if upgrade_legacy != None else upgrade_legacy_from_environment() ):
+            # Rewrites the file, so it runs with the file I/O.
+            keyfile_data = await async_impl.run( None, self._upgrade_legacy, keyfile_data, password )
+            keypair = await async_impl.run( executor, deserialize_keypair_from_keyfile_data, keyfile_data )
+        else:
+            keypair = await async_impl.run( executor, _unlock_keyfile_data, keyfile_data, password )
+        # Only cached if the file was not replaced while it was read.
+        if file_identity != None and await async_impl.run( None, cache_impl.identity, self.path ) == file_identity:
+            cache.put( file_identity, keypair, password )
+        return keypair
+
+    async def aset_keypair( self, keypair: 'keypair_impl.Keypair', encrypt: bool = True, overwrite: bool = False, password: str = None, executor: Optional[Executor] = None ):
+        """ Asyncio counterpart of set_keypair(), which does not block the event loop.
+            File writes and password prompts run in the event loop's default thread pool, encryption in executor.
+            Args:
+                keypair (Keypair):
+                    Keypair to store under path.
+                encrypt ( bool, optional, default = True ):
+                    If True, encrypts file under path.
+                overwrite ( bool, optional, default = True ):
+                    If True, forces overwrite of current file.
+                password ( str, optional ):
+                    Optional password used to encrypt file. If None, asks for user input.
+                executor ( Executor, optional ):
+                    Thread or process pool for encryption, defaults to the event loop's thread pool.
+            Raises:
+                KeyFileError:
+                    Raised if the file does not exists, is not readable, or writable.
+        """
+        keyfile_data = serialized_keypair_to_keyfile_data( keypair )
+        if encrypt:
+            if password == None:
+                password = await async_impl.run( None, ask_password_to_encrypt )
+            keyfile_data = await async_impl.run( executor, encrypt_keyfile_data, keyfile_data, password )
+
+        def write():
+            self.make_dirs()
+            self._write_keyfile_data_to_file( keyfile_data, overwrite = overwrite )
+        await async_impl.run( None, write )
+
+    def _upgrade_legacy( self, keyfile_data: bytes, password: str = None ) -> bytes:
+        """ Decrypts legacy keyfile data read from path, then replaces the file with the data encrypted in the vault format.
+            The file is left as it is if it changed since it was read, or cannot be replaced.
+            Returns:
+                decrypted_data (bytes):
+                    Decrypted data.
+            Raises:
+                KeyFileError:
+                    Raised if the password is incorrect.
+        """
+        password = password_to_decrypt( password, self.name )
+        decrypted_keyfile_data = decrypt_keyfile_data( keyfile_data, password )
+        try:
+            if self._read_keyfile_data_from_file() == keyfile_data:
+                self._write_keyfile_data_to_file( encrypt_keyfile_data( decrypted_keyfile_data, password ), overwrite = True )
+                print( "Upgraded legacy keyfile {} to the vault format".format( self.path ) )
+        except ( OSError, KeyFileError ) as e:
+            print( colored( "Could not upgrade legacy keyfile {}: {}".format( self.path, e ), 'red' ) )
+        return decrypted_keyfile_data
 
     def make_dirs( self ):
         """ Makes directories for path.
@@ -355,15 +621,36 @@ class Keyfile( object ):
         if not os.path.exists( directory ):
             os.makedirs( directory )
 
+    def stat( self, refresh: bool = False ) -> 'KeyfileStat':
+        """ Returns a snapshot of the file under path: whether it exists, is readable and writable, and its format.
+            The snapshot is taken with one open, fstat and header read, then kept until the file is changed,
+            which a single stat call checks.
+            Args:
+                refresh ( bool, optional ):
+                    If True, takes a new snapshot without checking the last one.
+            Returns:
+                snapshot (KeyfileStat):
+                    State of the file.
+        """
+        snapshot = self._stat
+        if snapshot != None and not refresh:
+            try:
+                file_stat = os.stat( self.path )
+            except OSError:
+                file_stat = None
+            if snapshot.is_current( file_stat ):
+                return snapshot
+        snapshot = KeyfileStat.of( self.path )
+        self._stat = snapshot
+        return snapshot
+
     def exists_on_device( self ) -> bool:
         """ Returns true if the file exists on the device.
             Returns:
                 on_device (bool):
                     True if the file is on device.
         """
-        if not os.path.isfile( self.path ):
-            return False
-        return True
+        return self.stat().exists
 
     def is_readable( self ) -> bool:
         """ Returns true if the file under path is readable.
@@ -371,11 +658,7 @@ class Keyfile( object ):
                 readable (bool):
                     True if the file is readable.
         """
-        if not self.exists_on_device():
-            return False
-        if not os.access( self.path , os.R_OK ):
-            return False
-        return True
+        return self.stat().readable
 
     def is_writable( self ) -> bool:
         """ Returns true if the file under path is writable.
@@ -383,9 +666,7 @@ class Keyfile( object ):
                 writable (bool):
                     True if the file is writable.
         """
-        if os.access(self.path, os.W_OK):
-            return True
-        return False
+        return self.stat().writable
 
     def is_encrypted ( self ) -> bool:
         """ Returns true if the file under path is encrypted.
@@ -393,11 +674,7 @@ class Keyfile( object ):
                 encrypted (bool):
                     True if the file is encrypted.
         """
-        if not self.exists_on_device():
-            return False
-        if not self.is_readable():
-            return False
-        return keyfile_data_is_encrypted( self._read_keyfile_data_from_file() )
+        return self.stat().encrypted
 
     def _may_overwrite ( self ) -> bool:
         choice = input("File {} already exists. Overwrite ? (y/N) ".format( self.path ))
@@ -457,12 +734,20 @@ class Keyfile( object ):
                 KeyFileError:
                     Raised if the file does not exists or is not readable.
         """
-        if not self.exists_on_device():
+        # One open for the checks and the read, which also refreshes the snapshot.
+        try:
+            with os.fdopen( os.open( self.path, _READ_FLAGS ), 'rb' ) as file:
+                file_stat = os.fstat( file.fileno() )
+                data = file.read() if stat.S_ISREG( file_stat.st_mode ) else None
+        except PermissionError:
+            if os.path.isfile( self.path ):
+                raise KeyFileError( "Keyfile at: {} is not readable".format( self.path ))
             raise KeyFileError( "Keyfile at: {} is not a file".format( self.path ))
-        if not self.is_readable():
-            raise KeyFileError( "Keyfile at: {} is not readable".format( self.path ))
-        with open( self.path , 'rb') as file:
-            data = file.read()
+        except OSError:
+            raise KeyFileError( "Keyfile at: {} is not a file".format( self.path ))
+        if data == None:
+            raise KeyFileError( "Keyfile at: {} is not a file".format( self.path ))
+        self._stat = KeyfileStat( self.path, file_stat, True, data[:_HEADER_SIZE] )
         return data
 
     def _write_keyfile_data_to_file ( self, keyfile_data:bytes, overwrite: bool = False ):
@@ -476,13 +761,11 @@ class Keyfile( object ):
                 KeyFileError:
                     Raised if the file is not writable or the user returns No to overwrite prompt.
         """
-        # Check overwrite.
-        if self.exists_on_device() and not overwrite:
+        # Check overwrite, a keyfile written earlier in the current batch exists though not on disk yet.
+        if ( self.exists_on_device() or batch_impl.staged( self.path ) ) and not overwrite:
             if not self._may_overwrite():
                 raise KeyFileError( "Keyfile at: {} is not writeable".format( self.path ) )
-        with open(self.path, "wb") as keyfile:
-            keyfile.write( keyfile_data )
-        # Set file permissions.
-        os.chmod(self.path, stat.S_IRUSR | stat.S_IWUSR)
+        # Atomic: a crash leaves either the old or the new keyfile, never a truncated one.
+        batch_impl.write( self.path, keyfile_data )
 
     
\ No newline at end of file
@@ -0,0 +1,158 @@
+""" Unlocks many keyfiles at once, in a pool of processes.
+"""
+# The MIT License (MIT)
+# Copyright © 2023 Opentensor Technologies
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Iterable, Iterator, Optional, Sequence, Union
+
+from .. import keypair_impl
+from . import cache_impl, keyfile_impl
+
+# A password per keyfile, in the same order, or a function returning the password of a keyfile.
+Passwords = Union[Sequence[Optional[str]], Callable[['keyfile_impl.Keyfile'], Optional[str]]]
+
+class UnlockResult( object ):
+    """ Outcome of unlocking one keyfile, see unlock_keyfiles().
+    """
+    __slots__ = ( 'keyfile', 'keypair', 'error' )
+
+    def __init__( self, keyfile: 'keyfile_impl.Keyfile', keypair: Optional['keypair_impl.Keypair'] = None, error: Optional[Exception] = None ):
+        self.keyfile = keyfile
+        # The unlocked keypair, None if unlocking failed.
+        self.keypair = keypair
+        # Why unlocking failed, None if it succeeded.
+        self.error = error
+
+    @property
+    def ok( self ) -> bool:
+        return self.error == None
+
+    def __repr__( self ) -> str:
+        if self.ok:
+            return "UnlockResult({}, {})".format( self.keyfile.path, self.keypair.ss58_address )
+        return "UnlockResult({}, error={!r})".format( self.keyfile.path, self.error )
+
+
+def password_from_environment( keyfile: 'keyfile_impl.Keyfile' ) -> Optional[str]:
+    """ Returns the password of the keyfile's coldkey in the BT_COLD_PW_* environment variables, if any.
+    """
+    return keyfile_impl.get_coldkey_password_from_environment( keyfile.name )
+
+
+def unlock_keyfiles(
+        keyfiles: Iterable['keyfile_impl.Keyfile'],
+        passwords: Optional[Passwords] = None,
+        max_workers: Optional[int] = None,
+        upgrade_legacy: Optional[bool] = None
+    ) -> Iterator[UnlockResult]:
+    r""" Decrypts and deserializes keyfiles in a pool of processes, yielding each result as soon as it is ready.
+        Every keyfile yields one result, a keyfile which fails to unlock yields its error and the others go on.
+        Keypairs in the keypair cache are yielded without unlocking them again, the others are added to it
+        if it is enabled. Passwords are never asked for, an encrypted keyfile without one fails.
+        Args:
+            keyfiles ( Iterable[Keyfile] ):
+                Keyfiles to unlock.
+            passwords ( Sequence[Optional[str]] or Callable[[Keyfile], Optional[str]], optional ):
+                Password of each keyfile, in the same order, or a function returning it.
+                Defaults to the BT_COLD_PW_* environment variables, see password_from_environment().
+            max_workers ( int, optional ):
+                Most processes unlocking at once, defaults to the number of CPUs. With one,
+                keyfiles are unlocked in this process, one after another.
+            upgrade_legacy ( bool, optional ):
+                Passed to Keyfile.get_keypair().
+        Returns:
+            results ( Iterator[UnlockResult] ):
+                One result per keyfile, in the order they finish.
+        Raises:
+            ValueError:
+                Raised if there are not as many passwords as keyfiles.
+    """
+    keyfiles = list( keyfiles )
+    if passwords == None:
+        passwords = password_from_environment
+    if callable( passwords ):
+        passwords = [ passwords( keyfile ) for keyfile in keyfiles ]
+    elif len( passwords ) != len( keyfiles ):
+        raise ValueError( "Got {} passwords for {} keyfiles".format( len( passwords ), len( keyfiles ) ) )
+    max_workers = ( os.cpu_count() or 1 ) if max_workers == None else max_workers
+    if max_workers < 1:
+        raise ValueError( "max_workers must be at least 1, got {}".format( max_workers ) )
+    return _unlock_keyfiles( keyfiles, passwords, max_workers, upgrade_legacy )
+
+
+def _unlock_keyfiles(
+        keyfiles: Sequence['keyfile_impl.Keyfile'],
+        passwords: Sequence[Optional[str]],
+        max_workers: int,
+        upgrade_legacy: Optional[bool]
+    ) -> Iterator[UnlockResult]:
+    """ Yields the results of unlock_keyfiles(), once its arguments are checked.
+    """
+    # Cached keypairs first, they need no work.
+    cache = cache_impl.keypair_cache
+    pending = []
+    for keyfile, password in zip( keyfiles, passwords ):
+        file_identity = cache_impl.identity( keyfile.path ) if cache.enabled else None
+        keypair = cache.get( file_identity, password ) if file_identity != None else None
+        if keypair != None:
+            yield UnlockResult( keyfile, keypair )
+        else:
+            pending.append( ( keyfile, password, file_identity ) )
+
+    if min( max_workers, len( pending ) ) <= 1:
+        for keyfile, password, _ in pending:
+            try:
+                yield UnlockResult( keyfile, _unlock( keyfile.path, password, upgrade_legacy ) )
+            except Exception as e:
+                yield UnlockResult( keyfile, error = e )
+        return
+
+    with ProcessPoolExecutor( max_workers = min( max_workers, len( pending ) ), initializer = _init_worker ) as executor:
+        futures = { executor.submit( _unlock, keyfile.path, password, upgrade_legacy ): ( keyfile, password, file_identity ) for keyfile, password, file_identity in pending }
+        try:
+            for future in as_completed( futures ):
+                keyfile, password, file_identity = futures[future]
+                try:
+                    keypair = future.result()
+                except Exception as e:
+                    yield UnlockResult( keyfile, error = e )
+                    continue
+                # Only cached if the file was not replaced while it was read.
+                if file_identity != None and cache_impl.identity( keyfile.path ) == file_identity:
+                    cache.put( file_identity, keypair, password )
+                yield UnlockResult( keyfile, keypair )
+        finally:
+            # If the caller stopped reading, the keyfiles not started yet are left locked.
+            for future in futures:
+                future.cancel()
+
+
+def _init_worker():
+    """ Runs first in each worker. Workers only unlock for the parent process, which caches the results.
+    """
+    cache_impl.keypair_cache.disable()
+
+
+def _unlock( path: str, password: Optional[str], upgrade_legacy: Optional[bool] ) -> 'keypair_impl.Keypair':
+    """ Returns the keypair under path, without asking for a password.
+    """
+    keyfile = keyfile_impl.Keyfile( path )
+    if password == None and keyfile.is_encrypted():
+        raise keyfile_impl.KeyFileError( "No password to unlock {}".format( path ) )
+    return keyfile.get_keypair( password, upgrade_legacy = upgrade_legacy )
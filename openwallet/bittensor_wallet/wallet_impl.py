@@ -20,6 +20,7 @@
 # DEALINGS IN THE SOFTWARE.
 
 import os
+from concurrent.futures import Executor
 from typing import Optional, Union, Tuple, Dict, overload, Any, TypedDict
 import bittensor_config
 
@@ -28,7 +29,7 @@ from termcolor import colored
 
 from . import __ss58_format__
 from .utils import is_valid_bittensor_address_or_public_key, get_ss58_format
-from ._keyfile import Keyfile, keyfile
+from ._keyfile import Keyfile, WriteBatch, keyfile
 
 
 def display_mnemonic_msg( keypair : Keypair, key_type : str ):
@@ -60,6 +61,13 @@ class WalletConfig(bittensor_config.DefaultConfig):
         "path": '~/.bittensor/wallets/'
     }
 
+    # Checked by wallet.check_config() against the 'wallet' subtree of a config.
+    schema: bittensor_config.Schema = bittensor_config.Schema({
+        "name": bittensor_config.Field( str, required = True ),
+        "hotkey": bittensor_config.Field( str, nullable = True ), # Optional
+        "path": bittensor_config.Field( str, required = True ),
+    }, prefix = 'wallet' )
+
     def __init__(self, name: str = None, hotkey: str = None, path: str = None, **kwargs):
         super().__init__(
             loaded_config=None,
@@ -86,6 +94,9 @@ class Wallet():
     The coldkey must be used to stake and unstake funds from a running node. The hotkey, on the other hand, is only used
     for suscribing and setting weights from running code. Hotkeys are linked to coldkeys through the metagraph.
     """
+    # ( ( path, name, hotkey ), keyfiles ), see _keyfiles().
+    _keyfile_cache: Optional[Tuple[Tuple[str, str, str], Dict[str, 'Keyfile']]] = None
+
     def __init__(
         self,
         name:str,
@@ -141,24 +152,48 @@ class Wallet():
         self.create_new_hotkey( n_words = 12, use_password = hotkey_use_password )
         return self
 
+    def _keyfiles(self) -> Dict[str, 'Keyfile']:
+        """ Returns the keyfiles of the wallet, resolved once and again only after path, name or hotkey change.
+        """
+        key = ( self.path, self.name, self.hotkey_str )
+        cached = self._keyfile_cache
+        if cached == None or cached[0] != key:
+            wallet_path = os.path.expanduser(os.path.join(self.path, self.name))
+            cached = self._keyfile_cache = ( key, {
+                'hotkey': keyfile( path = os.path.join(wallet_path, "hotkeys", self.hotkey_str) ),
+                'coldkey': keyfile( path = os.path.join(wallet_path, "coldkey") ),
+                'coldkeypub': Keyfile( path = os.path.join(wallet_path, "coldkeypub.txt") ),
+            } )
+        return cached[1]
+
     @property
     def hotkey_file(self) -> 'Keyfile':
-
-        wallet_path = os.path.expanduser(os.path.join(self.path, self.name))
-        hotkey_path = os.path.join(wallet_path, "hotkeys", self.hotkey_str)
-        return keyfile( path = hotkey_path )
+        return self._keyfiles()['hotkey']
 
     @property
     def coldkey_file(self) -> 'Keyfile':
-        wallet_path = os.path.expanduser(os.path.join(self.path, self.name))
-        coldkey_path = os.path.join(wallet_path, "coldkey")
-        return keyfile( path = coldkey_path )
+        return self._keyfiles()['coldkey']
 
     @property
     def coldkeypub_file(self) -> 'Keyfile':
-        wallet_path = os.path.expanduser(os.path.join(self.path, self.name))
-        coldkeypub_path = os.path.join(wallet_path, "coldkeypub.txt")
-        return Keyfile( path = coldkeypub_path )
+        return self._keyfiles()['coldkeypub']
+
+    @staticmethod
+    def batch() -> 'WriteBatch':
+        r""" Returns a transaction for many keyfile writes, made durable together when it exits.
+            Keyfiles written inside the with block, by this wallet or any other, are renamed into place when the
+            block exits, with one directory sync per directory instead of one per keyfile. If the block raises,
+            none of them are written.
+
+                with wallet.batch():
+                    for index in range( 1000 ):
+                        bittensor_wallet.wallet( name = 'miners', hotkey = str( index ) ).create_new_hotkey( use_password = False )
+
+            Returns:
+                batch (WriteBatch):
+                    Context manager grouping the writes.
+        """
+        return WriteBatch()
 
     def set_hotkey(self, keypair: 'Keypair', encrypt: bool = False, overwrite: bool = False) -> 'Keyfile':
         self._hotkey = keypair
@@ -223,6 +258,52 @@ class Wallet():
             self._coldkeypub = self.coldkeypub_file.keypair
         return self._coldkeypub
 
+    async def aload_hotkey(self, password: str = None, executor: Optional[Executor] = None) -> 'Keypair':
+        r""" Asyncio counterpart of the hotkey property, unlocks the hotkey without blocking the event loop.
+            Args:
+                password ( str, optional ):
+                    Password of an encrypted hotkey. If None, asks for user input.
+                executor ( Executor, optional ):
+                    Thread or process pool for decryption and derivation, see Keyfile.aget_keypair().
+            Returns:
+                hotkey (Keypair):
+                    hotkey loaded from config arguments.
+            Raises:
+                KeyFileError: Raised if the file is corrupt of non-existent, or the password is incorrect.
+        """
+        if self._hotkey == None:
+            self._hotkey = await self.hotkey_file.aget_keypair( password = password, executor = executor )
+        return self._hotkey
+
+    async def aload_coldkey(self, password: str = None, executor: Optional[Executor] = None) -> 'Keypair':
+        r""" Asyncio counterpart of the coldkey property, unlocks the coldkey without blocking the event loop.
+            Args:
+                password ( str, optional ):
+                    Password of the coldkey. If None, taken from BT_COLD_PW_* or asked for.
+                executor ( Executor, optional ):
+                    Thread or process pool for decryption and derivation, see Keyfile.aget_keypair().
+            Returns:
+                coldkey (Keypair):
+                    coldkey loaded from config arguments.
+            Raises:
+                KeyFileError: Raised if the file is corrupt of non-existent, or the password is incorrect.
+        """
+        if self._coldkey == None:
+            self._coldkey = await self.coldkey_file.aget_keypair( password = password, executor = executor )
+        return self._coldkey
+
+    async def aload_coldkeypub(self) -> 'Keypair':
+        r""" Asyncio counterpart of the coldkeypub property, loads the coldkeypub without blocking the event loop.
+            Returns:
+                coldkeypub (Keypair):
+                    coldkeypub loaded from config arguments.
+            Raises:
+                KeyFileError: Raised if the file is corrupt of non-existent.
+        """
+        if self._coldkeypub == None:
+            self._coldkeypub = await self.coldkeypub_file.aget_keypair()
+        return self._coldkeypub
+
     def create_coldkey_from_uri(self, uri:str, use_password: bool = True, overwrite:bool = False) -> 'Wallet':
         """ Creates coldkey from suri string, optionally encrypts it with the user's inputed password.
             Args:
@@ -17,17 +17,22 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
+import argparse
+import asyncio
 import os
 import pytest
 import shutil
 import time
 import unittest
+from concurrent.futures import ProcessPoolExecutor
 from unittest.mock import patch
 
+import bittensor_config
+import bittensor_wallet
 from bittensor_wallet.keypair_impl import Keypair
 from bittensor_wallet.wallet_impl import Wallet
 from bittensor_wallet._keyfile import Keyfile, keyfile
-from bittensor_wallet._keyfile.keyfile_impl import validate_password, ask_password_to_encrypt, decrypt_keyfile_data, KeyFileError
+from bittensor_wallet._keyfile.keyfile_impl import validate_password, ask_password_to_encrypt, decrypt_keyfile_data, get_coldkey_password_from_environment, KeyFileError
 
 class TestWallet(unittest.TestCase):
 
@@ -114,19 +119,94 @@ class TestWallet(unittest.TestCase):
             mock_wallet.regenerate_hotkey(seed=seed_str_bad)
 
 
+class TestWalletConfig(unittest.TestCase):
+
+    def test_wallet_does_not_modify_config(self):
+        config = bittensor_wallet.wallet.config()
+        config.wallet.name = 'mywallet'
+        _wallet = bittensor_wallet.wallet( config = config, name = 'other', hotkey = 'myhotkey' )
+        assert _wallet.name == 'other'
+        assert _wallet.hotkey_str == 'myhotkey'
+        assert _wallet.config.wallet.name == 'other'
+        assert config.wallet.name == 'mywallet'
+        assert config.wallet.hotkey == 'default'
+
+    def test_wallet_config_reads_only_wallet_variables(self):
+        with patch.dict( os.environ, { 'BT_CONFIG': 'nope.yaml', 'BT_STRICT': '0', 'BT_WALLET_HOTKEY': 'from_env' } ):
+            config = bittensor_wallet.wallet.config()
+        assert config.config == None and config.strict == False
+        assert config.source_of( 'strict' ) == 'default' and config.source_of( 'wallet.hotkey' ) == 'env'
+
+    def test_wallet_environment(self):
+        with patch.dict( os.environ, { 'BT_WALLET_NAME': 'from_env', 'BT_COLD_PW_FROM_ENV': 'password' } ):
+            config = bittensor_wallet.wallet.config()
+            assert config.wallet.name == 'from_env'
+            assert config.source_of( 'wallet.name' ) == 'env'
+            assert config.source_of( 'wallet.hotkey' ) == 'default'
+
+            defaults = bittensor_wallet.wallet.config()
+            bittensor_wallet.wallet.add_defaults( defaults )
+            assert defaults.wallet.name == 'from_env'
+            assert defaults.wallet.hotkey == bittensor_wallet.wallet.defaults.hotkey
+
+            assert get_coldkey_password_from_environment( 'from_env' ) == 'password'
+            assert get_coldkey_password_from_environment( 'other' ) == None
+            os.environ['BT_COLD_PW_FROM_ENV'] = 'changed'
+            assert get_coldkey_password_from_environment( 'from_env' ) == 'changed'
+            del os.environ['BT_COLD_PW_FROM_ENV']
+            os.environ['BT_COLD_PW_OTHER'] = 'other'
+            assert get_coldkey_password_from_environment( 'from_env' ) == None
+            assert get_coldkey_password_from_environment( 'other' ) == 'other'
+
+    def test_wallet_args(self):
+        # Built once from the registered arguments, then reused.
+        assert bittensor_config.registry.parser( [ 'wallet' ] ) is bittensor_config.registry.parser( [ 'wallet' ] )
+        parser = argparse.ArgumentParser()
+        bittensor_wallet.wallet.add_args( parser, prefix = 'miner' )
+        bittensor_wallet.wallet.add_args( parser, prefix = 'miner' )
+        config = bittensor_config.config( parser, args = [ '--miner.wallet.name', 'mywallet' ] )
+        assert config.miner.wallet.name == 'mywallet'
+        assert config.miner.wallet.hotkey == bittensor_wallet.wallet.defaults.hotkey
+
+    def test_keyfile_paths_cached(self):
+        _wallet = Wallet( name = 'mywallet', path = '~/.bittensor/wallets/', hotkey = 'myhotkey' )
+        hotkey_file = _wallet.hotkey_file
+        assert hotkey_file.path == os.path.expanduser( '~/.bittensor/wallets/mywallet/hotkeys/myhotkey' )
+        assert _wallet.hotkey_file is hotkey_file and _wallet.coldkey_file is _wallet.coldkey_file
+        # Resolved again once the wallet points elsewhere.
+        _wallet.hotkey_str = 'other'
+        assert _wallet.hotkey_file.path.endswith( 'hotkeys/other' )
+        _wallet.name = 'otherwallet'
+        assert _wallet.coldkeypub_file.path == os.path.expanduser( '~/.bittensor/wallets/otherwallet/coldkeypub.txt' )
+
+    def test_check_config(self):
+        config = bittensor_wallet.wallet.config()
+        bittensor_wallet.wallet.check_config( config )
+        config.wallet.hotkey = None
+        bittensor_wallet.wallet.check_config( config )
+        config.wallet.name = 1
+        with pytest.raises( bittensor_config.InvalidConfig ):
+            bittensor_wallet.wallet.check_config( config )
+        with pytest.raises( bittensor_config.InvalidConfig ):
+            bittensor_wallet.wallet( config = config, name = 'mywallet', path = 2 )
+        del config['wallet']
+        with pytest.raises( bittensor_config.InvalidConfig ):
+            bittensor_wallet.wallet.check_config( config )
+
+
 class TestKeyFiles(unittest.TestCase):
 
     def setUp(self) -> None:
         self.root_path = f"/tmp/pytest{time.time()}"
         os.makedirs(self.root_path)
 
-        self.create_keyfile()
+        self.keyfile = self.create_keyfile()
 
     def tearDown(self) -> None:
         shutil.rmtree(self.root_path)
 
     def create_keyfile(self):
-        keyfile = keyfile(path=os.path.join(self.root_path, "keyfile"))
+        keyfile = Keyfile(path=os.path.join(self.root_path, "keyfile"))
 
         mnemonic = Keypair.generate_mnemonic(12)
         alice = Keypair.create_from_mnemonic(mnemonic)
@@ -138,7 +218,7 @@ class TestKeyFiles(unittest.TestCase):
         return keyfile
 
     def test_create(self):
-        keyfile = keyfile(path=os.path.join(self.root_path, "keyfile"))
+        keyfile = Keyfile(path=os.path.join(self.root_path, "keyfile"))
 
         mnemonic = Keypair.generate_mnemonic( 12 )
         alice = Keypair.create_from_mnemonic(mnemonic)
@@ -168,7 +248,7 @@ class TestKeyFiles(unittest.TestCase):
 
     def test_legacy_coldkey(self):
         legacy_filename = os.path.join(self.root_path, "coldlegacy_keyfile")
-        keyfile = keyfile (path = legacy_filename)
+        keyfile = Keyfile (path = legacy_filename)
         keyfile.make_dirs()
         keyfile_data = b'0x32939b6abc4d81f02dff04d2b8d1d01cc8e71c5e4c7492e4fa6a238cdca3512f'
         with open(legacy_filename, "wb") as keyfile_obj:
@@ -219,7 +299,7 @@ class TestKeyFiles(unittest.TestCase):
             assert ask_password_to_encrypt() == 'asdury3294y'
 
     def test_overwriting(self):
-        keyfile = keyfile (path = os.path.join(self.root_path, "keyfile"))
+        keyfile = Keyfile (path = os.path.join(self.root_path, "keyfile"))
         alice = Keypair.create_from_uri ('/Alice')
         keyfile.set_keypair(alice, encrypt=True, overwrite=True, password = 'thisisafakepassword')
         bob = Keypair.create_from_uri ('/Bob')
@@ -239,3 +319,265 @@ class TestKeyFiles(unittest.TestCase):
 
     def test_keyfile_mock_func(self):
         file = keyfile.mock()
+
+    def test_keypair_cache(self):
+        cache = bittensor_wallet.keypair_cache
+        path = self.keyfile.path
+        bob = Keypair.create_from_uri( '/Bob' )
+        cache.enable( ttl = 60, max_size = 1 )
+        try:
+            first = Keyfile( path ).get_keypair( password = 'thisisafakepassword' )
+            with patch( 'bittensor_wallet._keyfile.keyfile_impl.decrypt_keyfile_data' ) as decrypt:
+                # Another keyfile for the same file, unlocked without decrypting it again.
+                second = Keyfile( path ).get_keypair()
+                assert Keyfile( path ).get_keypair( password = 'thisisafakepassword' ).ss58_address == bob.ss58_address
+                decrypt.assert_not_called()
+            assert second is not first and second.public_key == bob.public_key
+            # A password which is passed must be the one the keypair was unlocked with.
+            with pytest.raises( KeyFileError ):
+                Keyfile( path ).get_keypair( password = 'wrongpassword' )
+            assert not any( entry.unlocks_with( 'wrongpassword' ) for entry in cache._entries.values() )
+
+            # Writing the file evicts its keypairs and clears their secrets.
+            seeded = Keypair.create_from_seed( '0x' + '11' * 32 )
+            Keyfile( path ).set_keypair( seeded, encrypt = True, overwrite = True, password = 'thisisafakepassword' )
+            assert Keyfile( path ).get_keypair( password = 'thisisafakepassword' ).seed_hex == seeded.seed_hex
+            secret = next( iter( cache._entries.values() ) ).secrets['seed_hex'].buffer
+            Keyfile( path ).set_keypair( bob, encrypt = True, overwrite = True, password = 'thisisafakepassword' )
+            assert len( cache ) == 0 and not any( secret )
+            assert Keyfile( path ).get_keypair( password = 'thisisafakepassword' ).ss58_address == bob.ss58_address
+
+            # Least recently read first beyond max_size, then after the ttl.
+            other = os.path.join( self.root_path, 'hotkey' )
+            Keyfile( other ).set_keypair( bob, encrypt = False, overwrite = True )
+            Keyfile( other ).get_keypair()
+            assert len( cache ) == 1 and next( iter( cache._entries ) )[0] == os.path.realpath( other )
+            assert cache.purge( other ) == 1 and len( cache ) == 0
+            cache.enable( ttl = 0, max_size = 1 )
+            Keyfile( other ).get_keypair()
+            assert cache.get( bittensor_wallet._keyfile.cache_impl.identity( other ) ) == None and len( cache ) == 0
+        finally:
+            cache.disable()
+
+    def test_upgrade_legacy_keyfile(self):
+        import base64
+        from cryptography.fernet import Fernet
+        from cryptography.hazmat.backends import default_backend
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+        def fast_kdf( **kwargs ):
+            # The legacy 10M iterations take seconds.
+            kwargs['iterations'] = 1000
+            return PBKDF2HMAC( **kwargs )
+
+        # Next to the keyfile setUp wrote, which the reports should not count.
+        root = os.path.join( self.root_path, 'wallets' )
+        alice = Keypair.create_from_uri( '/Alice' )
+        with patch( 'bittensor_wallet._keyfile.keyfile_impl.PBKDF2HMAC', fast_kdf ):
+            serialized = bittensor_wallet.serialized_keypair_to_keyfile_data( alice )
+            key = bittensor_wallet._keyfile.keyfile_impl.PBKDF2HMAC(
+                algorithm = hashes.SHA256(), salt = b"Iguesscyborgslikemyselfhaveatendencytobeparanoidaboutourorigins", length = 32, iterations = 10000000, backend = default_backend()
+            ).derive( b'thisisafakepassword' )
+            legacy = Fernet( base64.urlsafe_b64encode( key ) ).encrypt( serialized )
+            paths = [ os.path.join( root, 'wallet', 'coldkey' ), os.path.join( root, 'wallet', 'hotkeys', 'default' ) ]
+            for path in paths:
+                os.makedirs( os.path.dirname( path ), exist_ok = True )
+                with open( path, 'wb' ) as file:
+                    file.write( legacy )
+            with open( os.path.join( root, 'wallet', 'coldkeypub.txt' ), 'w' ) as file:
+                file.write( 'public' )
+
+            report = bittensor_wallet.legacy_keyfile_report( root )
+            assert report.scanned == 3 and report.legacy == sorted( paths ) and len( report ) == 2
+
+            # Left as it is unless asked.
+            assert Keyfile( paths[0] ).get_keypair( password = 'thisisafakepassword' ).ss58_address == alice.ss58_address
+            assert Keyfile( paths[0] ).is_encrypted() and len( bittensor_wallet.legacy_keyfile_report( root ) ) == 2
+
+            # A wrong password leaves the file as it is.
+            with pytest.raises( KeyFileError ):
+                Keyfile( paths[0] ).get_keypair( password = 'wrongpassword', upgrade_legacy = True )
+            assert len( bittensor_wallet.legacy_keyfile_report( root ) ) == 2
+
+            keyfile = Keyfile( paths[0] )
+            assert keyfile.get_keypair( password = 'thisisafakepassword', upgrade_legacy = True ).ss58_address == alice.ss58_address
+            with open( paths[0], 'rb' ) as file:
+                assert file.read().startswith( b'$ANSIBLE_VAULT' )
+            assert os.stat( paths[0] ).st_mode & 0o777 == 0o600
+            assert keyfile.get_keypair( password = 'thisisafakepassword' ).ss58_address == alice.ss58_address
+            assert bittensor_wallet.legacy_keyfile_report( root ).legacy == paths[1:]
+            assert sorted( os.listdir( os.path.dirname( paths[0] ) ) ) == [ 'coldkey', 'coldkeypub.txt', 'hotkeys' ]
+
+            # Or through the environment.
+            with patch.dict( os.environ, { 'BT_UPGRADE_LEGACY_KEYFILES': '1' } ):
+                Keyfile( paths[1] ).get_keypair( password = 'thisisafakepassword' )
+            assert len( bittensor_wallet.legacy_keyfile_report( root ) ) == 0
+
+    def test_unlock_keyfiles(self):
+        keypairs = [ Keypair.create_from_uri( uri ) for uri in ( '/Alice', '/Bob', '/Charlie' ) ]
+        keyfiles = [ Keyfile( os.path.join( self.root_path, 'wallet{}'.format( i ), 'coldkey' ) ) for i in range( 5 ) ]
+        keyfiles[0].set_keypair( keypairs[0], encrypt = True, overwrite = True, password = 'thisisafakepassword' )
+        keyfiles[1].set_keypair( keypairs[1], encrypt = False, overwrite = True )
+        keyfiles[2].set_keypair( keypairs[2], encrypt = True, overwrite = True, password = 'thisisafakepassword' )
+        keyfiles[3].set_keypair( keypairs[2], encrypt = True, overwrite = True, password = 'thisisafakepassword' )
+        # keyfiles[4] is missing.
+        passwords = [ 'thisisafakepassword', None, 'wrongpassword', None, None ]
+
+        with pytest.raises( ValueError ):
+            bittensor_wallet.unlock_keyfiles( keyfiles, passwords[:2] )
+        for max_workers in ( 1, 3 ):
+            results = { result.keyfile.path: result for result in bittensor_wallet.unlock_keyfiles( keyfiles, passwords, max_workers = max_workers ) }
+            assert len( results ) == 5
+            assert results[keyfiles[0].path].ok and results[keyfiles[0].path].keypair.public_key == keypairs[0].public_key
+            assert results[keyfiles[1].path].keypair.ss58_address == keypairs[1].ss58_address
+            # Per file errors, without asking for a password.
+            for keyfile in keyfiles[2:]:
+                assert not results[keyfile.path].ok and isinstance( results[keyfile.path].error, KeyFileError )
+
+        # Passwords from the environment by default, cached in this process.
+        cache = bittensor_wallet.keypair_cache
+        cache.enable()
+        try:
+            with patch.dict( os.environ, { 'BT_COLD_PW_WALLET3': 'thisisafakepassword' } ):
+                results = list( bittensor_wallet.unlock_keyfiles( keyfiles[1:4], max_workers = 2 ) )
+            assert [ result.ok for result in sorted( results, key = lambda result: result.keyfile.path ) ] == [ True, False, True ]
+            assert len( cache ) == 2
+            with patch( 'bittensor_wallet._keyfile.unlock_impl.ProcessPoolExecutor' ) as executor:
+                assert all( result.ok for result in bittensor_wallet.unlock_keyfiles( [ keyfiles[1], keyfiles[3] ], max_workers = 2 ) )
+                executor.assert_not_called()
+        finally:
+            cache.disable()
+
+    def test_async_keyfile(self):
+        from bittensor_wallet._keyfile import keyfile_impl
+
+        async def main( root ):
+            alice = Keypair.create_from_uri( '/Alice' )
+            coldkey = Keyfile( os.path.join( root, 'wallet', 'coldkey' ) )
+            await coldkey.aset_keypair( alice, encrypt = True, overwrite = True, password = 'thisisafakepassword' )
+            assert coldkey.is_encrypted()
+
+            # Concurrent awaiters of the same key share one unlock.
+            with patch.object( keyfile_impl, '_unlock_keyfile_data', wraps = keyfile_impl._unlock_keyfile_data ) as unlock:
+                keypairs = await asyncio.gather( *[ Keyfile( coldkey.path ).aget_keypair( password = 'thisisafakepassword' ) for _ in range( 5 ) ] )
+                assert unlock.call_count == 1 and all( keypair.ss58_address == alice.ss58_address for keypair in keypairs )
+                with pytest.raises( KeyFileError ):
+                    await asyncio.gather( coldkey.aget_keypair( password = 'thisisafakepassword' ), coldkey.aget_keypair( password = 'wrongpassword' ) )
+                assert unlock.call_count == 3
+
+            # Derivation in a process pool.
+            with ProcessPoolExecutor( 1 ) as executor:
+                assert ( await coldkey.aget_keypair( password = 'thisisafakepassword', executor = executor ) ).public_key == alice.public_key
+
+            _wallet = bittensor_wallet.wallet( name = 'wallet', path = root )
+            await _wallet.hotkey_file.aset_keypair( alice, encrypt = False, overwrite = True )
+            assert ( await _wallet.aload_hotkey() ).ss58_address == alice.ss58_address
+            assert await _wallet.aload_hotkey() is _wallet.hotkey
+            assert ( await _wallet.aload_coldkey( password = 'thisisafakepassword' ) ).ss58_address == alice.ss58_address
+
+        asyncio.run( main( self.root_path ) )
+
+    def test_atomic_keyfile_writes(self):
+        from bittensor_wallet._keyfile import batch_impl
+        alice = Keypair.create_from_uri( '/Alice' )
+        bob = Keypair.create_from_uri( '/Bob' )
+        hotkeys = os.path.join( self.root_path, 'wallet', 'hotkeys' )
+        keyfile = Keyfile( os.path.join( hotkeys, 'default' ) )
+        keyfile.set_keypair( alice, encrypt = False, overwrite = True )
+        assert os.stat( keyfile.path ).st_mode & 0o777 == 0o600 and os.listdir( hotkeys ) == [ 'default' ]
+
+        # A failed write leaves the old keyfile.
+        with patch( 'os.replace', side_effect = OSError( 'disk full' ) ):
+            with pytest.raises( OSError ):
+                keyfile.set_keypair( bob, encrypt = False, overwrite = True )
+        assert keyfile.get_keypair().ss58_address == alice.ss58_address and os.listdir( hotkeys ) == [ 'default' ]
+
+        # One directory sync for the whole batch, the keyfiles appear when it exits.
+        with patch.object( batch_impl, '_fsync_directory', wraps = batch_impl._fsync_directory ) as fsync_directory:
+            with Wallet.batch() as batch:
+                for index in range( 5 ):
+                    bittensor_wallet.wallet( name = 'wallet', hotkey = str( index ), path = self.root_path ).set_hotkey( alice, overwrite = True )
+                keyfile.set_keypair( bob, encrypt = False, overwrite = True )
+                with bittensor_wallet.WriteBatch() as inner:
+                    assert inner is batch
+                assert len( batch ) == 6 and not os.path.exists( os.path.join( hotkeys, '0' ) )
+                assert keyfile.get_keypair().ss58_address == alice.ss58_address
+            assert fsync_directory.call_count == 1
+        assert sorted( os.listdir( hotkeys ) ) == [ '0', '1', '2', '3', '4', 'default' ]
+        assert keyfile.get_keypair().ss58_address == bob.ss58_address
+
+        # Nothing is written if the batch raises.
+        with pytest.raises( ValueError ):
+            with Wallet.batch():
+                keyfile.set_keypair( alice, encrypt = False, overwrite = True )
+                Keyfile( os.path.join( hotkeys, 'other' ) ).set_keypair( alice, encrypt = False, overwrite = True )
+                raise ValueError()
+        assert sorted( os.listdir( hotkeys ) ) == [ '0', '1', '2', '3', '4', 'default' ]
+        assert keyfile.get_keypair().ss58_address == bob.ss58_address
+
+        # A keyfile written earlier in the batch is not overwritten without asking.
+        staged = Keyfile( os.path.join( hotkeys, 'staged' ) )
+        with Wallet.batch():
+            staged.set_keypair( alice, encrypt = False, overwrite = False )
+            with patch( 'builtins.input', return_value = 'n' ) as ask:
+                with pytest.raises( KeyFileError ):
+                    staged.set_keypair( bob, encrypt = False, overwrite = False )
+                ask.assert_called_once()
+        assert staged.get_keypair().ss58_address == alice.ss58_address
+
+        # Renames before a failed one are kept, the remaining staged files are removed.
+        replace = os.replace
+        def replace_once( source, target ):
+            if os_replace.call_count > 1:
+                raise OSError( 'disk full' )
+            replace( source, target )
+        with patch( 'os.replace', side_effect = replace_once ) as os_replace:
+            with pytest.raises( OSError ):
+                with Wallet.batch():
+                    Keyfile( os.path.join( hotkeys, '0' ) ).set_keypair( bob, encrypt = False, overwrite = True )
+                    Keyfile( os.path.join( hotkeys, '1' ) ).set_keypair( bob, encrypt = False, overwrite = True )
+        assert Keyfile( os.path.join( hotkeys, '0' ) ).get_keypair().ss58_address == bob.ss58_address
+        assert Keyfile( os.path.join( hotkeys, '1' ) ).get_keypair().ss58_address == alice.ss58_address
+        assert not any( name.startswith( '.' ) for name in os.listdir( hotkeys ) )
+
+    def test_keyfile_stat(self):
+        alice = Keypair.create_from_uri( '/Alice' )
+        keyfile = Keyfile( os.path.join( self.root_path, 'coldkey' ) )
+        snapshot = keyfile.stat()
+        assert not snapshot.exists and not snapshot.readable and snapshot.format == None and str( keyfile ).startswith( 'Keyfile (empty' )
+
+        keyfile.set_keypair( alice, encrypt = False, overwrite = True )
+        snapshot = keyfile.stat()
+        assert snapshot.exists and snapshot.readable and snapshot.writable and snapshot.format == 'plain' and not snapshot.encrypted
+        assert snapshot.size == os.path.getsize( keyfile.path )
+
+        # Kept while the file is unchanged, the checks then open nothing.
+        with patch( 'os.open', wraps = os.open ) as os_open:
+            assert keyfile.stat() is snapshot
+            assert keyfile.exists_on_device() and keyfile.is_readable() and keyfile.is_writable() and not keyfile.is_encrypted()
+            assert str( keyfile ).startswith( 'Keyfile (decrypted' )
+            os_open.assert_not_called()
+        assert keyfile.stat( refresh = True ) is not snapshot
+
+        keyfile.encrypt( password = 'thisisafakepassword' )
+        assert keyfile.stat().format == 'ansible' and keyfile.is_encrypted() and str( keyfile ).startswith( 'Keyfile (encrypted' )
+        snapshot = keyfile.stat()
+        os.chmod( keyfile.path, 0o400 )
+        assert keyfile.stat() is not snapshot and keyfile.stat().mtime_ns == os.stat( keyfile.path ).st_mtime_ns
+        os.remove( keyfile.path )
+        assert not keyfile.exists_on_device()
+        with pytest.raises( KeyFileError ):
+            keyfile.get_keypair()
+        assert not Keyfile( self.root_path ).exists_on_device()
+        with pytest.raises( KeyFileError ):
+            Keyfile( self.root_path ).get_keypair()
+
+        # A FIFO is no keyfile, and opening it does not wait for a writer.
+        fifo = os.path.join( self.root_path, 'fifo' )
+        os.mkfifo( fifo )
+        assert not Keyfile( fifo ).exists_on_device() and Keyfile( fifo ).stat().format == None
+        with pytest.raises( KeyFileError ):
+            Keyfile( fifo ).get_keypair()
+        report = bittensor_wallet.legacy_keyfile_report( self.root_path )
+        assert report.scanned == 1 and len( report ) == 0